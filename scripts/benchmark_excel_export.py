@@ -0,0 +1,137 @@
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import subprocess
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.bank_statement_processor import BankStatementProcessor
+from src.schema import pounds_frame
+
+DEFAULT_SIZES = [10_000, 100_000, 500_000]
+MODES = ['legacy', 'streaming']
+
+TRANSACTION_PREFIXES = [
+    'Card Purchase GBP', 'Automated Credit', 'Inward Payment',
+    'Outward Faster Payment', 'Direct Debit', 'Account to Account Transfer'
+]
+
+
+def generate_processed_data(rows, seed=42):
+    """Build a processed_data frame with the pipeline's columns (amounts in pence)"""
+    rng = np.random.default_rng(seed)
+    py_rng = random.Random(seed)
+    paid_in = np.where(rng.random(rows) < 0.3, rng.integers(1, 200_000, rows), 0)
+    withdrawn = np.where(paid_in == 0, rng.integers(1, 50_000, rows), 0)
+    return pd.DataFrame({
+        'Date': pd.Timestamp('2020-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 1500, rows)), unit='D'),
+        'Transaction': [f"{py_rng.choice(TRANSACTION_PREFIXES)} FT{py_rng.randint(10**7, 10**8)}" for _ in range(rows)],
+        'Paid In (£)': paid_in,
+        'Withdrawn (£)': withdrawn,
+        'Balance (£)': np.cumsum(paid_in - withdrawn) + 1_000_000,
+        'Notes': '',
+        'Subcategory': [f"Category {i % 40}" for i in range(rows)],
+        'Source_Sheet': [f"Sheet_{i * 24 // rows:02d}" for i in range(rows)],
+        'Source_Row': np.arange(rows) % 5000 + 2
+    })
+
+
+def legacy_export(data, output_file):
+    """The previous export: full copy written through the regular openpyxl writer"""
+    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+        export_data = data.copy()
+        export_data['Date'] = pd.to_datetime(export_data['Date']).dt.strftime('%d/%m/%Y')
+        export_data.to_excel(writer, sheet_name='Transactions', index=False)
+        summary = pd.DataFrame([
+            ['Total Transactions', len(export_data)],
+            ['Date Range Start', export_data['Date'].min()],
+            ['Date Range End', export_data['Date'].max()],
+            ['Total Income', f"£{export_data['Paid In (£)'].sum():,.2f}"],
+            ['Total Expenses', f"£{export_data['Withdrawn (£)'].sum():,.2f}"],
+            ['Net Position', f"£{(export_data['Paid In (£)'].sum() - export_data['Withdrawn (£)'].sum()):,.2f}"]
+        ], columns=['Metric', 'Value'])
+        summary.to_excel(writer, sheet_name='Summary', index=False)
+        source_summary = export_data.groupby('Source_Sheet').agg({
+            'Transaction': 'count', 'Paid In (£)': 'sum', 'Withdrawn (£)': 'sum'
+        }).reset_index()
+        source_summary.to_excel(writer, sheet_name='Sheet_Summary', index=False)
+
+
+def _peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode, rows):
+    """Run one export in this process and return its timings and memory"""
+    data = generate_processed_data(rows)
+    if mode == 'legacy':
+        # The previous pipeline held amounts as float pounds
+        data = pounds_frame(data)
+    baseline = _peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_file = Path(temp_dir) / 'processed_statements.xlsx'
+        start = time.perf_counter()
+        if mode == 'legacy':
+            legacy_export(data, output_file)
+        else:
+            processor = BankStatementProcessor(None)
+            processor.processed_data = data
+            processor.export_to_excel(output_file)
+        elapsed = time.perf_counter() - start
+        file_size = output_file.stat().st_size
+
+    return {
+        'mode': mode,
+        'rows': rows,
+        'seconds': elapsed,
+        'rows_per_second': rows / elapsed,
+        'baseline_rss_mb': baseline,
+        'peak_rss_mb': _peak_rss_mb(),
+        'file_mb': file_size / 1024 / 1024
+    }
+
+
+def run_benchmark(sizes, modes):
+    print("\n⏱️ Excel export benchmark (each run in a fresh process)")
+    print(f"{'Mode':>10} {'Rows':>9} {'Time (s)':>9} {'Rows/s':>9} {'Peak RSS (MB)':>14} "
+          f"{'Export RSS (MB)':>16} {'File (MB)':>10}")
+
+    for rows in sizes:
+        for mode in modes:
+            completed = subprocess.run(
+                [sys.executable, __file__, '--measure', mode, str(rows)],
+                capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                print(f"{mode:>10} {rows:>9,} failed (exit code {completed.returncode})")
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            print(f"{mode:>10} {rows:>9,} {result['seconds']:>9.1f} {result['rows_per_second']:>9,.0f} "
+                  f"{result['peak_rss_mb']:>14,.0f} {result['peak_rss_mb'] - result['baseline_rss_mb']:>16,.0f} "
+                  f"{result['file_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Excel export time and peak memory")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_SIZES, help='Row counts to export')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES, help='Export paths to compare')
+    parser.add_argument('--measure', nargs=2, metavar=('MODE', 'ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        mode, rows = args.measure
+        print(json.dumps(measure(mode, int(rows))))
+    else:
+        run_benchmark(args.rows, args.modes)
@@ -0,0 +1,191 @@
+import sys
+import gzip
+import json
+import time
+import shutil
+import argparse
+import threading
+import subprocess
+import tempfile
+import ssl
+import socket
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import gspread
+from google.auth.credentials import AnonymousCredentials
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.http_session import tuned_session
+from scripts.create_test_data import generate_synthetic_statements
+
+SETUPS = ['default', 'tuned']
+DEFAULT_WORKERS = [1, 4, 16]
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Answers every GET with a values:batchGet body, behaving like the Google APIs on the wire"""
+    protocol_version = 'HTTP/1.1'  # Keep-alive
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # A new connection pays the TCP + TLS handshake round trips
+        self.server.count('connections')
+        time.sleep(self.server.handshake_seconds)
+
+    def do_GET(self):
+        # Google only compresses for clients that accept gzip and say "gzip" in their User-Agent
+        compress = ('gzip' in self.headers.get('Accept-Encoding', '') and
+                    'gzip' in self.headers.get('User-Agent', ''))
+        body = self.server.gzip_body if compress else self.server.body
+        time.sleep(self.server.rtt + len(body) / self.server.bytes_per_second)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        if compress:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count('bytes_sent', len(body))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, body, rtt, mbps, tls_dir=None):
+        """
+        Local HTTP(S) stand-in for the Sheets API
+
+        Parameters:
+        body (bytes): JSON response body served for every request
+        rtt (float): Simulated round-trip time in seconds
+        mbps (float): Simulated link bandwidth in megabits per second
+        tls_dir (Path): Directory holding cert.pem/key.pem to serve HTTPS (None for plain HTTP)
+        """
+        super().__init__(('127.0.0.1', 0), _StandInHandler)
+        self.body = body
+        self.gzip_body = gzip.compress(body)
+        self.rtt = rtt
+        # TCP handshake plus a TLS 1.2 handshake: three round trips before the first request
+        self.handshake_seconds = 3 * rtt
+        self.bytes_per_second = mbps * 1_000_000 / 8
+        self.scheme = 'http'
+        if tls_dir is not None:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(tls_dir / 'cert.pem', tls_dir / 'key.pem')
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+            self.scheme = 'https'
+        self.stats = {'connections': 0, 'bytes_sent': 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, name, amount=1):
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    @property
+    def url(self):
+        return f"{self.scheme}://127.0.0.1:{self.server_address[1]}/v4/spreadsheets/local:batchGet"
+
+
+def _self_signed_certificate(directory):
+    """Create a localhost certificate with openssl, or return None when it is not installed"""
+    if shutil.which('openssl') is None:
+        return None
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-keyout', str(directory / 'key.pem'), '-out', str(directory / 'cert.pem'),
+         '-subj', '/CN=localhost', '-addext', 'subjectAltName=IP:127.0.0.1'],
+        check=True, capture_output=True
+    )
+    return directory
+
+
+def _client(setup, workers, cert_file):
+    """gspread client as the connection built it before (default) and now (tuned)"""
+    credentials = AnonymousCredentials()
+    if setup == 'default':
+        client = gspread.authorize(credentials)
+    else:
+        client = gspread.Client(auth=credentials, session=tuned_session(credentials, pool_size=workers))
+    # Trust the stand-in's certificate rather than CA bundles or proxies from the environment
+    client.session.trust_env = False
+    client.session.verify = cert_file if cert_file is not None else True
+    return client
+
+
+def run_setup(server, setup, workers, requests_count, cert_file):
+    """Make requests_count requests over `workers` threads and return timing and traffic"""
+    client = _client(setup, workers, cert_file)
+    server.stats = {'connections': 0, 'bytes_sent': 0}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        responses = list(executor.map(lambda _: client.request('get', server.url).json(), range(requests_count)))
+    elapsed = time.perf_counter() - start
+    client.session.close()
+
+    assert all(len(response['valueRanges'][0]['values']) > 1 for response in responses)
+    return {
+        'setup': setup,
+        'workers': workers,
+        'requests': requests_count,
+        'seconds': elapsed,
+        'connections': server.stats['connections'],
+        'mb_received': server.stats['bytes_sent'] / 1024 / 1024
+    }
+
+
+def run_benchmark(workers_list, requests_count, sheet_rows, rtt, mbps):
+    sheets, _ = generate_synthetic_statements(sheet_rows, rows_per_sheet=sheet_rows)
+    name, rows = next(iter(sheets.items()))
+    body = json.dumps({'spreadsheetId': 'local', 'valueRanges': [
+        {'range': f"'{name}'!A1:G{len(rows)}", 'majorDimension': 'ROWS', 'values': rows}
+    ]}).encode('utf-8')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tls_dir = _self_signed_certificate(Path(temp_dir))
+        if tls_dir is None:
+            print("⚠️ openssl not found, the stand-in serves plain HTTP")
+        cert_file = str(tls_dir / 'cert.pem') if tls_dir is not None else None
+
+        server = StandInServer(body, rtt, mbps, tls_dir)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            print(f"\n⏱️ Sheets client transport: {requests_count} requests for a {sheet_rows:,}-row sheet "
+                  f"({len(body) / 1024:,.0f} KB, {len(server.gzip_body) / 1024:,.0f} KB gzipped), "
+                  f"{rtt * 1000:.0f} ms RTT, {mbps:g} Mbit/s, {server.scheme.upper()}")
+            print(f"{'Setup':>8} {'Workers':>8} {'Time (s)':>9} {'Req/s':>7} {'Connections':>12} {'MB received':>12}")
+            for workers in workers_list:
+                for setup in SETUPS:
+                    result = run_setup(server, setup, workers, requests_count, cert_file)
+                    print(f"{setup:>8} {workers:>8} {result['seconds']:>9.2f} "
+                          f"{requests_count / result['seconds']:>7.1f} {result['connections']:>12} "
+                          f"{result['mb_received']:>12.1f}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the default and the tuned Sheets client session against a local API stand-in"
+    )
+    parser.add_argument('--workers', type=int, nargs='+', default=DEFAULT_WORKERS, help='Concurrent requests')
+    parser.add_argument('--requests', type=int, default=48, help='Requests per run')
+    parser.add_argument('--sheet-rows', type=int, default=2_000, help='Rows in the served sheet')
+    parser.add_argument('--rtt', type=float, default=0.03, help='Simulated round-trip time (seconds)')
+    parser.add_argument('--mbps', type=float, default=50.0, help='Simulated bandwidth (Mbit/s)')
+    args = parser.parse_args()
+
+    run_benchmark(args.workers, args.requests, args.sheet_rows, args.rtt, args.mbps)
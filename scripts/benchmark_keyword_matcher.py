@@ -0,0 +1,101 @@
+import sys
+import time
+import random
+import string
+from pathlib import Path
+
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.keyword_matcher import KeywordMatcher
+
+# Benchmark sizes (transactions, keywords)
+SIZES = [
+    (1_000, 100),
+    (10_000, 500),
+    (100_000, 2_000),
+]
+NAIVE_SAMPLE_SIZE = 500  # Naive scan is timed on a sample and extrapolated
+
+TRANSACTION_PREFIXES = [
+    'Card Purchase GBP', 'Automated Credit', 'Inward Payment',
+    'Outward Faster Payment', 'Direct Debit', 'Account to Account Transfer'
+]
+
+
+def _random_word(rng, min_len=4, max_len=10):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_len, max_len)))
+
+
+def generate_keywords(count, rng):
+    """Generate a keyword mapping with `count` distinct keywords"""
+    keywords = set()
+    while len(keywords) < count:
+        keywords.add(_random_word(rng))
+    keywords = sorted(keywords)
+    subcategories = [f"Category {rng.randint(1, 40)}" for _ in keywords]
+    return pd.DataFrame({'Keyword': keywords, 'Subcategory': subcategories})
+
+
+def generate_transactions(count, keywords, rng):
+    """Generate transaction descriptions, roughly half containing a keyword"""
+    transactions = []
+    for i in range(count):
+        parts = [rng.choice(TRANSACTION_PREFIXES), f"FT{rng.randint(10**7, 10**8)}"]
+        if rng.random() < 0.5:
+            parts.append(rng.choice(keywords).upper())
+        parts.append(_random_word(rng).upper())
+        transactions.append(' '.join(parts))
+    return pd.Series(transactions)
+
+
+def naive_match(transactions, mappings_df):
+    """The previous nested-loop approach, kept for comparison"""
+    results = []
+    for transaction in transactions:
+        transaction = str(transaction).upper()
+        found = []
+        for _, mapping in mappings_df.iterrows():
+            if str(mapping['Keyword']).upper() in transaction:
+                found.append(mapping['Keyword'])
+        results.append(found)
+    return results
+
+
+def run_benchmark(seed=42):
+    rng = random.Random(seed)
+    print("\n⏱️ Keyword matcher benchmark")
+    print(f"{'Transactions':>12} {'Keywords':>9} {'Build (s)':>10} {'Match (s)':>10} "
+          f"{'Rows/s':>10} {'Naive est. (s)':>15} {'Speed-up':>9}")
+
+    for n_transactions, n_keywords in SIZES:
+        mappings_df = generate_keywords(n_keywords, rng)
+        transactions = generate_transactions(n_transactions, mappings_df['Keyword'].tolist(), rng)
+
+        start = time.perf_counter()
+        matcher = KeywordMatcher.from_mapping(mappings_df)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matched = matcher.match_series(transactions)
+        match_time = time.perf_counter() - start
+
+        sample = transactions.iloc[:NAIVE_SAMPLE_SIZE]
+        start = time.perf_counter()
+        naive = naive_match(sample, mappings_df)
+        naive_time = (time.perf_counter() - start) * n_transactions / len(sample)
+
+        # Sanity check against the naive scan on the sample
+        for expected, pattern_ids in zip(naive, matched.iloc[:NAIVE_SAMPLE_SIZE]):
+            assert expected == [matcher.keywords[i] for i in pattern_ids]
+
+        total = build_time + match_time
+        print(f"{n_transactions:>12,} {n_keywords:>9,} {build_time:>10.3f} {match_time:>10.3f} "
+              f"{n_transactions / match_time:>10,.0f} {naive_time:>15.1f} {naive_time / total:>8.0f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
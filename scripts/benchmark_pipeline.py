@@ -0,0 +1,254 @@
+import sys
+import json
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+from datetime import datetime
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.google_sheets_connection import GoogleSheetsConnection
+from src.bank_statement_processor import BankStatementProcessor
+from src.categorisation import Categorisation
+from src.deposit_categorizer import DepositCategorizer, MATCHING_MODES
+from src.stage_metrics import StageMetrics
+from src.streaming_pipeline import StreamingPipeline
+from src.fake_sheets import FakeSheetsClient, load_fixtures, write_fixtures, FIXTURE_FORMATS
+from scripts.create_test_data import generate_synthetic_statements
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_KEYWORDS = 500
+SPREADSHEET_ID = 'local-benchmark'
+KEYWORD_SHEET = 'Keyword Mapping'
+REMOVAL_RULES_FILE = project_root / 'Text_files' / 'removal_patterns.json'
+HISTORY_FILE = project_root / 'output' / 'benchmarks' / 'pipeline_history.jsonl'
+REGRESSION_THRESHOLD = 0.2  # Slowdown in rows/s against the previous run that fails the benchmark
+
+
+def build_pipeline(rows, keywords=DEFAULT_KEYWORDS, deposit_ratio=0.02, return_ratio=0.6, seed=42,
+                   fixtures=None, **client_options):
+    """
+    Wire a processor to a FakeSheetsClient serving synthetic or fixture statements
+
+    Everything above the gspread client (batching, rate limiting, retries,
+    keyword loading) is the real code path. The connection's own quota is
+    raised so only the fake server's latency, 429s and quota slow it down.
+
+    Parameters:
+    rows (int): Transactions to generate (ignored with fixtures)
+    keywords (int): Keywords in the generated mapping
+    deposit_ratio (float): Share of generated rows that are deposits
+    return_ratio (float): Share of generated deposits returned later
+    seed (int): Random seed for the generated statements
+    fixtures (str): Directory written by write_fixtures to serve instead of generating
+    **client_options: Passed to FakeSheetsClient (latency, error_rate, requests_per_minute, ...)
+
+    Returns:
+    tuple: (BankStatementProcessor, path of the sheets list file)
+    """
+    if fixtures is not None:
+        sheets = load_fixtures(fixtures)[SPREADSHEET_ID]
+        statement_names = [name for name in sheets if name != KEYWORD_SHEET]
+    else:
+        sheets, mapping_rows = generate_synthetic_statements(
+            rows, keywords=keywords, deposit_ratio=deposit_ratio, return_ratio=return_ratio, seed=seed
+        )
+        statement_names = list(sheets)
+        sheets[KEYWORD_SHEET] = mapping_rows
+
+    sheets_file = Path(tempfile.mkstemp(suffix='.txt')[1])
+    sheets_file.write_text('\n'.join(statement_names))
+
+    client = FakeSheetsClient({SPREADSHEET_ID: sheets}, **client_options)
+    connection = GoogleSheetsConnection('unused.json', requests_per_minute=600_000, burst=1_000, client=client)
+    processor = BankStatementProcessor(connection, str(REMOVAL_RULES_FILE))
+    return processor, sheets_file
+
+
+def save_fixtures(directory, rows, keywords=DEFAULT_KEYWORDS, deposit_ratio=0.02, return_ratio=0.6,
+                  format='csv'):
+    """Generate synthetic statements and store them as fixtures for later runs"""
+    sheets, mapping_rows = generate_synthetic_statements(
+        rows, keywords=keywords, deposit_ratio=deposit_ratio, return_ratio=return_ratio
+    )
+    sheets[KEYWORD_SHEET] = mapping_rows
+    return write_fixtures(directory, {SPREADSHEET_ID: sheets}, format=format)
+
+
+def measure(options):
+    """Run every pipeline stage once in this process and return the stage metrics"""
+    metrics = StageMetrics()
+    with metrics.stage('generate'):
+        processor, sheets_file = build_pipeline(
+            options['rows'], options['keywords'], options['deposit_ratio'], options['return_ratio'],
+            fixtures=options['fixtures'], latency=options['latency'], error_rate=options['error_rate'],
+            latency_per_row=options.get('latency_per_row', 0.0)
+        )
+    processor.metrics = metrics
+    categorizer = Categorisation(processor)
+
+    try:
+        if options.get('streaming'):
+            # Fetch, process and categorize overlap; there is no separate categorization stage
+            StreamingPipeline(processor, categorizer, max_workers=options['workers']).run(
+                SPREADSHEET_ID, str(sheets_file), KEYWORD_SHEET
+            )
+        else:
+            processor.process_all_statements(SPREADSHEET_ID, str(sheets_file),
+                                             max_workers=options['workers'], batch=options['batch'])
+    finally:
+        sheets_file.unlink()
+
+    if not options.get('streaming'):
+        with metrics.stage('apply_categorization') as stage:
+            stage['rows'] = len(categorizer.apply_categorization(SPREADSHEET_ID, KEYWORD_SHEET))
+
+    with metrics.stage('categorize_deposits') as stage:
+        deposit_handler = DepositCategorizer(processor, matching=options['matching'])
+        stage['rows'] = len(deposit_handler.categorize_deposits())
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with metrics.stage('export_processed_parquet') as stage:
+            processor.export_to_parquet(Path(temp_dir) / 'parquet')
+            stage['rows'] = len(processor.processed_data)
+
+    client = processor.gs_connection.client
+    summary = metrics.summary()
+    # Wall time from the first fetch to the last export, without generating the statements
+    end_to_end = sum(stage['wall_seconds'] for stage in summary['stages'] if stage['stage'] != 'generate')
+    result = {
+        **options,
+        'end_to_end_seconds': end_to_end,
+        'matched_deposits': len(deposit_handler.matched_deposits),
+        'api_requests': sum(client.calls.values()),
+        'api_throttled': client.throttled,
+        'rate_limiter': processor.gs_connection.rate_limiter.metrics(),
+        **summary
+    }
+    if options['fixtures']:
+        result['rows'] = len(processor.processed_data)
+        result['keywords'] = len(processor.gs_connection.load_keyword_mapping(SPREADSHEET_ID, KEYWORD_SHEET))
+    return result
+
+
+def _git_commit():
+    completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root,
+                               capture_output=True, text=True)
+    return completed.stdout.strip() or None
+
+
+def _previous_run(history_file, result):
+    """Latest recorded run with the same parameters"""
+    if not history_file.exists():
+        return None
+    keys = ('rows', 'keywords', 'deposit_ratio', 'return_ratio', 'matching', 'fixtures',
+            'latency', 'latency_per_row', 'error_rate', 'workers', 'batch', 'streaming')
+    previous = None
+    with open(history_file) as f:
+        for line in f:
+            run = json.loads(line)
+            if all(run.get(key) == result[key] for key in keys):
+                previous = run
+    return previous
+
+
+def _regressions(previous, result, threshold):
+    """Stages whose rows/s dropped by more than threshold since the previous run"""
+    if previous is None:
+        return []
+    before = {stage['stage']: stage.get('rows_per_second') for stage in previous['stages']}
+    slower = []
+    for stage in result['stages']:
+        old, new = before.get(stage['stage']), stage.get('rows_per_second')
+        if old and new and new < old * (1 - threshold):
+            slower.append((stage['stage'], old, new))
+    return slower
+
+
+def run_benchmark(sizes, options, history_file, threshold):
+    print("\n⏱️ Pipeline benchmark on synthetic statements (each size in a fresh process)")
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    commit = _git_commit()
+    failed = False
+
+    for rows in sizes:
+        completed = subprocess.run(
+            [sys.executable, __file__, '--measure', json.dumps({**options, 'rows': rows})],
+            capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            print(f"\n❌ {options['fixtures'] or f'{rows:,} rows'} failed (exit code {completed.returncode})")
+            print(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else '')
+            failed = True
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result = {'timestamp': datetime.now().isoformat(timespec='seconds'), 'commit': commit, **result}
+
+        print(f"\n📊 {result['rows']:,} rows, {result['keywords']:,} keywords, "
+              f"{result['matched_deposits']:,} matched deposits, {result['api_requests']:,} API requests "
+              f"({result['api_throttled']:,} throttled), peak RSS {result['peak_rss_mb']:,.0f} MB, "
+              f"{result['end_to_end_seconds']:.2f}s end to end")
+        print(f"{'Stage':>28} {'Time (s)':>9} {'Rows/s':>11} {'RSS (MB)':>9}")
+        for stage in result['stages']:
+            rate = f"{stage['rows_per_second']:,.0f}" if stage.get('rows_per_second') else '-'
+            print(f"{stage['stage']:>28} {stage['wall_seconds']:>9.2f} {rate:>11} {stage['peak_rss_mb']:>9,.0f}")
+
+        slower = _regressions(_previous_run(history_file, result), result, threshold)
+        for stage, old, new in slower:
+            print(f"⚠️ {stage} regressed: {old:,.0f} -> {new:,.0f} rows/s")
+        failed = failed or bool(slower)
+
+        with open(history_file, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+
+    print(f"\n✓ Results appended to {history_file}")
+    return not failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark every pipeline stage offline on synthetic statements and track the results"
+    )
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_SIZES, help='Transaction counts to run')
+    parser.add_argument('--keywords', type=int, default=DEFAULT_KEYWORDS, help='Keywords in the mapping')
+    parser.add_argument('--deposit-ratio', type=float, default=0.02, help='Share of rows that are deposits')
+    parser.add_argument('--return-ratio', type=float, default=0.6, help='Share of deposits returned later')
+    parser.add_argument('--matching', choices=MATCHING_MODES, default='greedy', help='Deposit matching mode')
+    parser.add_argument('--workers', type=int, default=1, help='Concurrent sheet fetches')
+    parser.add_argument('--no-batch', dest='batch', action='store_false', help='Fetch sheets one by one')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds every fake API request takes')
+    parser.add_argument('--latency-per-row', type=float, default=0.0,
+                        help='Extra seconds per row a fake read returns (transfer time)')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Overlap fetching with processing and categorization (per-sheet fetches)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Share of fake API requests rejected with 429 RESOURCE_EXHAUSTED')
+    parser.add_argument('--fixtures', help='Serve statements from this fixture directory instead of generating')
+    parser.add_argument('--save-fixtures', metavar='DIR',
+                        help='Write the generated statements for the first --rows size to DIR and exit')
+    parser.add_argument('--fixture-format', choices=FIXTURE_FORMATS, default='csv', help='Format for --save-fixtures')
+    parser.add_argument('--history', type=Path, default=HISTORY_FILE, help='JSON lines file of past runs')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='Fail when a stage is this much slower (rows/s) than the previous run')
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(json.loads(args.measure))))
+    elif args.save_fixtures:
+        directory = save_fixtures(args.save_fixtures, args.rows[0], args.keywords, args.deposit_ratio,
+                                  args.return_ratio, format=args.fixture_format)
+        print(f"✓ Fixtures written to {directory}")
+    else:
+        options = {
+            'keywords': args.keywords, 'deposit_ratio': args.deposit_ratio, 'return_ratio': args.return_ratio,
+            'matching': args.matching, 'workers': args.workers, 'batch': args.batch, 'latency': args.latency,
+            'latency_per_row': args.latency_per_row, 'streaming': args.streaming,
+            'error_rate': args.error_rate, 'fixtures': args.fixtures
+        }
+        sizes = [None] if args.fixtures else args.rows
+        ok = run_benchmark(sizes, options, args.history, args.threshold)
+        sys.exit(0 if ok else 1)
@@ -0,0 +1,72 @@
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from scripts.benchmark_pipeline import DEFAULT_KEYWORDS
+
+BENCHMARK_SCRIPT = project_root / 'scripts' / 'benchmark_pipeline.py'
+DEFAULT_SIZES = [20_000, 100_000]
+# Sequential with one batchGet, sequential with per-sheet fetches, streaming
+MODES = {
+    'batch': {'batch': True, 'streaming': False},
+    'per-sheet': {'batch': False, 'streaming': False},
+    'streaming': {'batch': False, 'streaming': True}
+}
+
+
+def measure_mode(options):
+    """Run benchmark_pipeline's measure() for one mode in a fresh process"""
+    completed = subprocess.run(
+        [sys.executable, str(BENCHMARK_SCRIPT), '--measure', json.dumps(options)],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise Exception(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else
+                        f"exit code {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(sizes, options, repeat=3):
+    print(f"\n⏱️ End-to-end latency, sequential vs streaming ({options['workers']} fetch workers, "
+          f"{options['latency'] * 1000:.0f} ms per request + {options['latency_per_row'] * 1e6:.0f} µs per row, "
+          f"best of {repeat})")
+    print(f"{'Rows':>10} {'Mode':>10} {'Total (s)':>10} {'Fetch+process (s)':>18} {'API requests':>13}")
+    for rows in sizes:
+        baseline = None
+        for mode, mode_options in MODES.items():
+            result = min((measure_mode({**options, **mode_options, 'rows': rows}) for _ in range(repeat)),
+                         key=lambda run: run['end_to_end_seconds'])
+            stages = {stage['stage']: stage['wall_seconds'] for stage in result['stages']}
+            # Everything up to combined, categorized transactions
+            front = sum(stages.get(name, 0.0) for name in
+                        ('fetch', 'process_sheet', 'combine_sheets', 'apply_categorization', 'stream_sheets'))
+            baseline = baseline or result['end_to_end_seconds']
+            speedup = baseline / result['end_to_end_seconds']
+            print(f"{rows:>10,} {mode:>10} {result['end_to_end_seconds']:>10.2f} {front:>18.2f} "
+                  f"{result['api_requests']:>13,}  ({speedup:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare end-to-end latency of the sequential and streaming pipelines on a fake Sheets API"
+    )
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_SIZES, help='Transaction counts to run')
+    parser.add_argument('--keywords', type=int, default=DEFAULT_KEYWORDS, help='Keywords in the mapping')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent sheet fetches')
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds every fake API request takes')
+    parser.add_argument('--latency-per-row', type=float, default=20e-6,
+                        help='Extra seconds per row a fake read returns (transfer time)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per mode; the fastest is reported')
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, {
+        'keywords': args.keywords, 'deposit_ratio': 0.02, 'return_ratio': 0.6, 'matching': 'greedy',
+        'workers': args.workers, 'latency': args.latency, 'latency_per_row': args.latency_per_row,
+        'error_rate': 0.0, 'fixtures': None
+    }, repeat=args.repeat)
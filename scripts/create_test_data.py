@@ -1,8 +1,10 @@
+import numpy as np
 import pandas as pd
 from google.oauth2.credentials import Credentials
 import gspread
 from pathlib import Path
 import random
+import string
 from datetime import datetime, timedelta
 
 # Constants
@@ -14,6 +16,25 @@ SHEET_NAMES = [
     # ... rest of your sheets
 ]
 
+STATEMENT_HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+# Merchants seen on the real statements, used as the first keywords of a synthetic mapping
+MERCHANT_KEYWORDS = [
+    ('tesco', 'Groceries'), ('asda', 'Groceries'), ('sainsburys', 'Groceries'), ('lidl', 'Groceries'),
+    ('aldi', 'Groceries'), ('morrisons', 'Groceries'), ('british gas', 'Utilities'), ('water plus', 'Utilities'),
+    ('edf energy', 'Utilities'), ('virgin media', 'Utilities'), ('scottish power', 'Utilities'),
+    ('anglian water', 'Utilities'), ('bt group', 'Utilities'), ('sse energy', 'Utilities'),
+    ('amazon', 'Shopping'), ('ebay', 'Shopping'), ('netflix', 'Entertainment'), ('spotify', 'Entertainment'),
+    ('disney plus', 'Entertainment'), ('shell', 'Transport'), ('tfl travel', 'Transport'),
+    ('trainline', 'Transport'), ('uber', 'Transport'), ('council tax', 'Council Tax'),
+    ('mortgage', 'Mortgage'), ('letting agent', 'Agency Fees'), ('insurance', 'Insurance'),
+    ('ground rent', 'Ground Rent'), ('maintenance', 'Maintenance'), ('contractor', 'Maintenance')
+]
+TRANSACTION_PREFIXES = [
+    'Card Purchase GBP', 'Direct Debit', 'Outward Faster Payment', 'Inward Payment', 'Automated Credit'
+]
+DEPOSIT_AMOUNTS = [50.00, 100.00]
+
 def create_controlled_dataset():
     """Create controlled test data with specific scenarios"""
     data = {
@@ -212,6 +233,115 @@ def create_controlled_dataset():
     df = pd.DataFrame(data)
     return df
 
+def generate_keyword_mapping(keywords, seed=42):
+    """
+    Build a Keyword Mapping sheet with `keywords` distinct keywords
+
+    The real merchants come first; the rest are random words spread over
+    40 synthetic subcategories.
+
+    Returns:
+    list: Sheet rows (header first) as the Sheets API returns them
+    """
+    rng = random.Random(seed)
+    mapping = dict(MERCHANT_KEYWORDS[:keywords])
+    while len(mapping) < keywords:
+        word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+        mapping.setdefault(word, f"Category {rng.randint(1, 40)}")
+    return [['Keyword', 'Subcategory']] + [[keyword, subcategory] for keyword, subcategory in mapping.items()]
+
+
+def generate_synthetic_statements(rows, keywords=100, deposit_ratio=0.02, return_ratio=0.6,
+                                  rows_per_sheet=5000, keyword_ratio=0.7, seed=42):
+    """
+    Generate realistic bank statements of any size without touching Google Sheets
+
+    Rows are spread over monthly statement sheets named like the real ones,
+    each opening with a 'Balance brought forward' line. Amounts and running
+    balances are formatted as the bank prints them. A share of the rows are
+    £50/£100 tenant deposits, and a share of those are returned on a later
+    row, so the deposit matcher has real pairs to find.
+
+    Parameters:
+    rows (int): Number of transactions
+    keywords (int): Size of the keyword mapping
+    deposit_ratio (float): Share of rows that are deposits
+    return_ratio (float): Share of deposits that are returned later
+    rows_per_sheet (int): Transactions per monthly sheet
+    keyword_ratio (float): Share of other rows whose description contains a keyword
+    seed (int): Random seed; the same arguments always give the same data
+
+    Returns:
+    tuple: (dict of sheet name -> rows with header, keyword mapping rows with header)
+    """
+    rng = np.random.default_rng(seed)
+    mapping_rows = generate_keyword_mapping(keywords, seed)
+    keyword_list = np.array([keyword.upper() for keyword, _ in mapping_rows[1:]], dtype=object)
+
+    # Descriptions: a prefix, usually a keyword, and a payment reference
+    prefixes = np.array(TRANSACTION_PREFIXES, dtype=object)[rng.integers(0, len(TRANSACTION_PREFIXES), rows)]
+    merchants = np.where(rng.random(rows) < keyword_ratio,
+                         keyword_list[rng.integers(0, len(keyword_list), rows)], 'PAYMENT')
+    references = rng.integers(10**7, 10**8, rows).astype(str).astype(object)
+    transactions = prefixes + ' ' + merchants + ' FT' + references
+
+    # Amounts in pence: a quarter are money in, the rest money out
+    paid_in = np.where(rng.random(rows) < 0.25, rng.integers(1, 200_000, rows), 0)
+    withdrawn = np.where(paid_in == 0, rng.integers(1, 50_000, rows), 0)
+
+    # Deposits, and returns of the same amount a little further down
+    deposit_positions = np.flatnonzero(rng.random(rows) < deposit_ratio)
+    deposit_amounts = rng.choice(np.array(DEPOSIT_AMOUNTS) * 100, len(deposit_positions)).astype('int64')
+    tenants = rng.integers(1, 10**5, len(deposit_positions)).astype(str).astype(object)
+    return_gap = max(2, min(rows_per_sheet, rows // 10))
+    candidates = deposit_positions + rng.integers(1, return_gap, len(deposit_positions))
+    keep = ((rng.random(len(deposit_positions)) < return_ratio) & (candidates < rows)
+            & ~np.isin(candidates, deposit_positions))
+    _, first_claim = np.unique(candidates[keep], return_index=True)
+    returning = np.flatnonzero(keep)[first_claim]
+    return_positions = candidates[returning]
+
+    paid_in[deposit_positions], withdrawn[deposit_positions] = deposit_amounts, 0
+    transactions[deposit_positions] = 'DEPOSIT FROM TENANT ' + tenants
+    paid_in[return_positions], withdrawn[return_positions] = 0, deposit_amounts[returning]
+    transactions[return_positions] = 'DEPOSIT RETURN TENANT ' + tenants[returning]
+
+    opening_balance = 200_000
+    balance = opening_balance + np.cumsum(paid_in - withdrawn)
+
+    # One sheet per month, with dates in order within each sheet
+    sheet_of_row = np.arange(rows) // rows_per_sheet
+    month_starts = pd.date_range('2010-01-01', periods=sheet_of_row[-1] + 1 if rows else 0, freq='MS')
+    month_days = np.asarray(month_starts.days_in_month)
+    days = np.sort(rng.random(rows) + sheet_of_row) % 1 * month_days[sheet_of_row]
+    dates = month_starts[sheet_of_row] + pd.to_timedelta(days.astype('int64'), unit='D')
+    codes, unique_dates = pd.factorize(dates)
+    date_text = np.asarray(unique_dates.strftime('%d/%m/%Y'), dtype=object)[codes]
+
+    paid_in_text = [f"{value / 100:.2f}" if value else '' for value in paid_in]
+    withdrawn_text = [f"{value / 100:.2f}" if value else '' for value in withdrawn]
+    balance_text = [f"{value / 100:,.2f}" for value in balance]
+
+    sheets = {}
+    for sheet, month_start in enumerate(month_starts):
+        month_end = month_start + pd.offsets.MonthEnd(0)
+        name = f"{month_start:%d_%b_%Y}_to_{month_end:%d_%b_%Y}"
+        start, stop = sheet * rows_per_sheet, min((sheet + 1) * rows_per_sheet, rows)
+        brought_forward = balance[start - 1] if start else opening_balance
+        sheet_rows = [STATEMENT_HEADERS,
+                      [f"{month_start:%d/%m/%Y}", 'Balance brought forward', '', '',
+                       f"{brought_forward / 100:,.2f}", '', '']]
+        sheet_rows.extend(
+            [date, transaction, paid, out, bal, '', '']
+            for date, transaction, paid, out, bal in zip(
+                date_text[start:stop], transactions[start:stop], paid_in_text[start:stop],
+                withdrawn_text[start:stop], balance_text[start:stop]
+            )
+        )
+        sheets[name] = sheet_rows
+
+    return sheets, mapping_rows
+
 def get_random_sample():
     """Get random sample from existing sheets"""
     try:
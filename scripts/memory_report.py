@@ -0,0 +1,44 @@
+import sys
+import argparse
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from scripts.benchmark_excel_export import generate_processed_data
+from src.schema import apply_compact_schema, memory_report, pounds_frame
+
+DEFAULT_ROWS = 500_000
+
+
+def _mb(value):
+    return value / 1024 / 1024
+
+
+def run_report(rows):
+    """Compare deep memory usage of processed_data with object and compact dtypes"""
+    generated = generate_processed_data(rows)
+    # Previous layout: object text columns and float pounds
+    before = pounds_frame(generated)
+    after = apply_compact_schema(generated)
+    before_usage = memory_report(before)
+    after_usage = memory_report(after)
+
+    years = before['Date'].dt.year
+    print(f"\n📊 processed_data memory, {rows:,} rows over {years.nunique()} years "
+          f"({years.min()}-{years.max()})")
+    print(f"{'Column':>14} {'Before dtype':>14} {'After dtype':>16} {'Before (MB)':>12} {'After (MB)':>11} {'Saved':>7}")
+    for column in before_usage.index:
+        before_dtype = str(before[column].dtype) if column in before else ''
+        after_dtype = str(after[column].dtype) if column in after else ''
+        saved = 1 - after_usage[column] / before_usage[column] if before_usage[column] else 0
+        print(f"{column:>14} {before_dtype:>14} {after_dtype:>16} {_mb(before_usage[column]):>12.1f} "
+              f"{_mb(after_usage[column]):>11.1f} {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report processed_data memory before and after the compact schema")
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='Synthetic transactions to generate')
+    args = parser.parse_args()
+    run_report(args.rows)
@@ -1,18 +1,61 @@
 import pandas as pd
 from datetime import datetime
+from pathlib import Path
 import os
 
+from src.removal_rules import RemovalRules, EMPTY_ROW_REASON
+from src.date_parser import parse_date_column
+from src.excel_export import StreamingExcelWriter, format_dates
+from src.parquet_export import write_parquet
+from src.schema import MONEY_COLUMNS, PENCE_DTYPE, apply_compact_schema, parse_pence, parse_pounds, pounds_frame, to_pounds
+from src.duplicates import DUPLICATE_KEY_COLUMNS, DUPLICATE_REASON, find_duplicates
+from src.reconciliation import reconcile_balances
+from src.stage_metrics import StageMetrics
+from src.excel_export import POUNDS_FORMATTERS
+
+REMOVED_ROW_COLUMNS = [
+    'Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)',
+    'Balance (£)', 'Notes', 'Subcategory', 'Source_Sheet',
+    'Source_Row', 'Removal_Reason'
+]
+
 class BankStatementProcessor:
-    def __init__(self, gs_connection):
+    def __init__(self, gs_connection, removal_rules_file=None, reconcile=True, metrics=None):
         """
         Initialize BankStatementProcessor
         
         Parameters:
         gs_connection (GoogleSheetsConnection): Instance of GoogleSheetsConnection
+        removal_rules_file (str): Optional JSON file of removal reason -> patterns.
+            The built-in patterns are used when not given or missing.
+        reconcile (bool): Check reported balances against the amounts after combining sheets
+        metrics (StageMetrics): Stage timings for this run (a private one when not given)
         """
         self.gs_connection = gs_connection
         self.processed_data = None
-        self.removed_rows = None
+        self.reconcile = reconcile
+        self.balance_breaks = None  # Reconciliation breaks, amounts in pence
+        self.metrics = metrics or StageMetrics()
+        self.removal_rules = RemovalRules.load(removal_rules_file)
+        self.date_formats = {}  # Sheet name -> detected date format
+        self.failed_sheets = {}  # Sheet name -> fetch error
+        self.sheet_layouts = {}  # Sheet name -> header row and number of rows
+        self._removed_frames = []
+        self._removed_rows = None
+
+    @property
+    def removed_rows(self):
+        """All rows removed so far, combined once on first access"""
+        if self._removed_frames:
+            frames = [self._removed_rows] if self._removed_rows is not None else []
+            self._removed_rows = pd.concat(frames + self._removed_frames)
+            self._removed_frames = []
+        return self._removed_rows
+
+    @removed_rows.setter
+    def removed_rows(self, value):
+        self._removed_frames = []
+        self._removed_rows = value
 
     def load_sheets_list(self, sheets_file):
         """Load list of sheets to process from text file"""
@@ -25,193 +68,217 @@ class BankStatementProcessor:
 
     def process_sheet(self, worksheet_data, sheet_name):
         """Process individual bank statement worksheet"""
+        df, removed_rows = self.process_sheet_with_removed(worksheet_data, sheet_name)
+        self.add_removed_rows(removed_rows)
+        return df
+
+    def add_removed_rows(self, removed_rows):
+        """Queue a sheet's removed rows; they are combined across sheets on first access"""
+        if removed_rows is not None and not removed_rows.empty:
+            extra_columns = [col for col in removed_rows.columns if col not in REMOVED_ROW_COLUMNS]
+            self._removed_frames.append(removed_rows.reindex(columns=REMOVED_ROW_COLUMNS + extra_columns))
+
+    def record_sheet_layout(self, sheet_name, worksheet_data):
+        """Remember a sheet's header row and row count for writing results back"""
+        self.sheet_layouts[sheet_name] = {
+            'headers': list(worksheet_data[0]) if worksheet_data else [],
+            'rows': len(worksheet_data)
+        }
+
+    def process_sheet_with_removed(self, worksheet_data, sheet_name):
+        """
+        Process individual bank statement worksheet without storing removed rows
+        
+        Returns:
+        tuple: (processed DataFrame, DataFrame of removed rows with Removal_Reason)
+        """
         try:
+            self.record_sheet_layout(sheet_name, worksheet_data)
+            
             # Convert to DataFrame
             df = pd.DataFrame(worksheet_data[1:], columns=worksheet_data[0])
 
+            # Notes/Subcategory (6th and 7th columns) hold the categorization the
+            # previous run wrote back; every run starts from blank ones
+            df[df.columns[5:7]] = ''
+
             # Add source sheet column
             df['Source_Sheet'] = sheet_name  # Use the sheet name
             
-            # Initialize DataFrame for removed rows
-            removed_rows = pd.DataFrame(columns=[
-                'Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 
-                'Balance (£)', 'Notes', 'Subcategory', 'Source_Sheet',
-                'Removal_Reason'
-            ])
-            
             # Remove header row if it exists in data
             if df['Date'].iloc[0].lower() == 'date':
                 df = df.iloc[1:]
             
-            # Define removal patterns
-            removal_patterns = {
-                'Balance Forward': [
-                    'balance brought forward',
-                    'brought forward',
-                    'closing balance'
-                ],
-                'Metro Bank DD': [
-                    'direct debit metro bank y65ys7p',
-                    'direct debit metro bank'
-                ]
-            }
-            
-            # Handle rows to be removed
-            for reason, patterns in removal_patterns.items():
-                # Create mask for matching patterns
-                pattern_mask = df['Transaction'].str.lower().str.contains(
-                    '|'.join(patterns), 
-                    na=False
-                )
-                
-                # Store rows being removed
-                if pattern_mask.any():
-                    removed_df = df[pattern_mask].copy()
-                    removed_df['Removal_Reason'] = reason
-                    removed_rows = pd.concat([removed_rows, removed_df])
-                    
-                    print(f"Removing {pattern_mask.sum()} rows matching pattern: {reason}")
-                    df = df[~pattern_mask]
-            
-            # Handle empty rows
-            empty_mask = (
-                (df['Date'].isna()) |
-                (df['Date'].str.strip() == '') |
-                (df['Transaction'].isna() & df['Paid In (£)'].isna() & 
-                 df['Withdrawn (£)'].isna() & df['Balance (£)'].isna())
-            )
-            
-            if empty_mask.any():
-                removed_df = df[empty_mask].copy()
-                removed_df['Removal_Reason'] = 'Empty Row'
-                removed_rows = pd.concat([removed_rows, removed_df])
-                
-                print(f"Removing {empty_mask.sum()} empty rows")
-                df = df[~empty_mask]
+            # Label removal reasons and split kept/removed rows in one pass
+            df, removed_rows = self.removal_rules.split(df)
+            for reason, count in self.removal_rules.counts(removed_rows).items():
+                if reason == EMPTY_ROW_REASON:
+                    print(f"Removing {count} empty rows")
+                else:
+                    print(f"Removing {count} rows matching pattern: {reason}")
             
             # Rename columns to match expected format
             df.columns = ["Date", "Transaction", "Paid In (£)", "Withdrawn (£)", 
                          "Balance (£)", "Notes", "Subcategory", "Source_Sheet"]
             
-            # Convert date with multiple format handling
-            def parse_date(date_str):
-                if pd.isna(date_str) or not isinstance(date_str, str):
-                    return None
-                    
-                date_str = date_str.strip()
-                date_formats = [
-                    '%d %b %y',    # e.g., "03 Apr 23"
-                    '%d %B %Y',    # e.g., "03 April 2023"
-                    '%d/%m/%Y',    # e.g., "03/04/2023"
-                    '%d-%m-%Y',    # e.g., "03-04-2023"
-                    '%Y-%m-%d',    # e.g., "2023-04-03"
-                ]
-                
-                for date_format in date_formats:
-                    try:
-                        return pd.to_datetime(date_str, format=date_format)
-                    except:
-                        continue
-                
-                try:
-                    # Last resort: let pandas guess the format
-                    return pd.to_datetime(date_str, dayfirst=True)
-                except:
-                    return None
-
-            df['Date'] = df['Date'].apply(parse_date)
+            # Row number in the source sheet (header is row 1), kept for write-back
+            df['Source_Row'] = df.index + 2
+            removed_rows['Source_Row'] = removed_rows.index + 2
+            
+            # Parse dates with the sheet's dominant format, falling back per cell
+            df['Date'], date_format, fallback_count = parse_date_column(df['Date'])
+            self.date_formats[sheet_name] = date_format
+            print(f"Date format: {date_format or 'none detected'} "
+                  f"({fallback_count} cells needed fallback parsing)")
             
             # Handle rows with invalid dates
             invalid_dates = df['Date'].isna()
             if invalid_dates.any():
                 removed_df = df[invalid_dates].copy()
                 removed_df['Removal_Reason'] = 'Invalid Date'
-                removed_rows = pd.concat([removed_rows, removed_df])
+                removed_rows = pd.concat([removed_rows, removed_df]) if not removed_rows.empty else removed_df
                 
                 print(f"Removing {invalid_dates.sum()} rows with invalid dates")
                 df = df.dropna(subset=['Date'])
             
-            # Convert monetary columns to float
-            for col in ['Paid In (£)', 'Withdrawn (£)', 'Balance (£)']:
-                # Remove currency symbols and commas
-                df[col] = df[col].astype(str).str.replace('£', '').str.replace(',', '')
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+            # Parse monetary columns straight into integer pence
+            for col in MONEY_COLUMNS:
+                df[col] = parse_pence(df[col])
             
             # Ensure consistent dtypes
             df = df.astype({
                 'Date': 'datetime64[ns]',
                 'Transaction': str,
-                'Paid In (£)': float,
-                'Withdrawn (£)': float,
-                'Balance (£)': float,
+                'Paid In (£)': PENCE_DTYPE,
+                'Withdrawn (£)': PENCE_DTYPE,
+                'Balance (£)': PENCE_DTYPE,
                 'Notes': str,
                 'Subcategory': str,
                 'Source_Sheet': str
             })
             
-            # Store removed rows
-            if not removed_rows.empty:
-                if self.removed_rows is None:
-                    self.removed_rows = removed_rows
-                else:
-                    self.removed_rows = pd.concat([self.removed_rows, removed_rows])
+            # Compact text columns: Arrow strings and categorical labels
+            df = apply_compact_schema(df)
+            
+            # Removed rows carry float pounds, like the duplicates combine_sheets removes
+            for col in MONEY_COLUMNS:
+                if col in removed_rows.columns:
+                    removed_rows[col] = parse_pounds(removed_rows[col])
             
-            return df
+            return df, removed_rows
                 
         except Exception as e:
             raise Exception(f"Failed to process worksheet: {str(e)}")
 
-    def process_all_statements(self, spreadsheet_id, sheets_file):
+    def process_all_statements(self, spreadsheet_id, sheets_file, max_workers=4, batch=True):
+        """
+        Fetch and process every statement sheet listed in sheets_file
+        
+        Parameters:
+        spreadsheet_id (str): Google Sheets ID
+        sheets_file (str): Text file with one sheet name per line
+        max_workers (int): Number of concurrent fetch threads (1 fetches sequentially)
+        batch (bool): Fetch all sheets with one values:batchGet request when possible
+        """
         try:
             # Load sheets list
             sheets_to_process = self.load_sheets_list(sheets_file)
             print(f"Found {len(sheets_to_process)} sheets to process")
 
-            # Process each sheet
+            # Fetch all sheets; failures are collected per sheet
+            with self.metrics.stage('fetch') as stage:
+                sheet_data, self.failed_sheets = self.gs_connection.fetch_sheets(
+                    spreadsheet_id, sheets_to_process, max_workers=max_workers, batch=batch
+                )
+                stage['rows'] = sum(max(len(rows) - 1, 0) for rows in sheet_data.values())
+
+            # Process each sheet in list order
             all_data = []
             for sheet_name in sheets_to_process:
+                if sheet_name not in sheet_data:
+                    continue
                 print(f"\nProcessing sheet: {sheet_name}")
 
-                # Get worksheet
-                worksheet = self.gs_connection.get_worksheet(spreadsheet_id, sheet_name)
-                data = self.gs_connection.get_all_data(worksheet)
-
                 # Process sheet with sheet name
-                df = self.process_sheet(data, sheet_name)  # Pass sheet_name
+                with self.metrics.stage('process_sheet') as stage:
+                    df = self.process_sheet(sheet_data[sheet_name], sheet_name)
 
-                # Ensure consistent dtypes across all dataframes
-                df = df.astype({
-                    'Date': 'datetime64[ns]',
-                    'Transaction': str,
-                    'Paid In (£)': float,
-                    'Withdrawn (£)': float,
-                    'Balance (£)': float,
-                    'Notes': str,
-                    'Subcategory': str,
-                    'Source_Sheet': str
-                })
+                    # Ensure consistent dtypes across all dataframes
+                    df = apply_compact_schema(df.astype({
+                        'Date': 'datetime64[ns]',
+                        'Paid In (£)': PENCE_DTYPE,
+                        'Withdrawn (£)': PENCE_DTYPE,
+                        'Balance (£)': PENCE_DTYPE
+                    }))
+                    stage['rows'] = len(sheet_data[sheet_name]) - 1
 
                 all_data.append(df)
                 print(f"✓ Processed {len(df)} transactions from {sheet_name}")
 
-            # Combine all processed data with consistent dtypes
-            self.processed_data = pd.concat(all_data, ignore_index=True)
-
-            # Sort by date
-            self.processed_data = self.processed_data.sort_values('Date')
+            if self.failed_sheets:
+                print(f"\n⚠️ {len(self.failed_sheets)} sheet(s) could not be fetched:")
+                for sheet_name, error in self.failed_sheets.items():
+                    print(f"- {sheet_name}: {error}")
+            if not all_data:
+                raise Exception("No sheets could be fetched")
 
-            # Remove duplicates if any
-            initial_len = len(self.processed_data)
-            self.processed_data = self.processed_data.drop_duplicates()
-            if len(self.processed_data) < initial_len:
-                print(f"\nRemoved {initial_len - len(self.processed_data)} duplicate transactions")
-
-            print(f"\nTotal processed transactions: {len(self.processed_data)}")
-            return self.processed_data
+            with self.metrics.stage('combine_sheets') as stage:
+                stage['rows'] = sum(len(df) for df in all_data)
+                return self.combine_sheets(all_data)
 
         except Exception as e:
             raise Exception(f"Failed to process bank statements: {str(e)}")
 
+    def combine_sheets(self, all_data, duplicate_subset=None):
+        """
+        Combine processed sheets into processed_data, sorted by date and de-duplicated
+        
+        Duplicates (e.g. from overlapping statement periods) are moved to
+        removed_rows with Removal_Reason 'Duplicate Transaction' and the
+        Source_Sheet/Source_Row of the copy that was kept.
+        
+        Parameters:
+        all_data (list): Processed sheet DataFrames, in sheet order
+        duplicate_subset (list): Columns that identify a transaction
+            (default: Date, Transaction, amounts and Balance)
+        """
+        # Combine all processed data with consistent dtypes; categoricals with
+        # different labels per sheet concatenate to object, so re-apply the schema
+        self.processed_data = apply_compact_schema(pd.concat(all_data, ignore_index=True))
+
+        # Sort by date; a stable sort keeps sheet order within a day, so the
+        # copy from the earliest listed sheet is the one kept
+        self.processed_data = self.processed_data.sort_values('Date', kind='stable')
+
+        # Remove duplicates if any, remembering which row each one repeats
+        duplicates = find_duplicates(self.processed_data, duplicate_subset or DUPLICATE_KEY_COLUMNS)
+        is_duplicate = duplicates['Duplicate_Of'].notna()
+        if is_duplicate.any():
+            removed = pounds_frame(self.processed_data[is_duplicate])
+            removed['Removal_Reason'] = DUPLICATE_REASON
+            removed['Duplicate_Of_Sheet'] = duplicates.loc[is_duplicate, 'Duplicate_Of_Sheet']
+            removed['Duplicate_Of_Row'] = duplicates.loc[is_duplicate, 'Duplicate_Of_Row']
+            self.add_removed_rows(removed)
+            self.processed_data = self.processed_data[~is_duplicate]
+            print(f"\nRemoved {is_duplicate.sum()} duplicate transactions")
+
+        print(f"\nTotal processed transactions: {len(self.processed_data)}")
+        
+        if self.reconcile:
+            self.reconcile_balances()
+        return self.processed_data
+
+    def reconcile_balances(self):
+        """Check Balance (£) against the running total of the amounts, per sheet"""
+        self.balance_breaks = reconcile_balances(self.processed_data, self.removed_rows)
+        if self.balance_breaks.empty:
+            print("✓ Balances reconcile")
+        else:
+            print(f"⚠️ {len(self.balance_breaks)} balance break(s):")
+            for break_type, count in self.balance_breaks['Break_Type'].value_counts().items():
+                print(f"- {break_type}: {count}")
+        return self.balance_breaks
+
     def export_to_excel(self, output_file='processed_statements.xlsx'):
         """
         Export processed data to Excel with defined columns:
@@ -225,47 +292,89 @@ class BankStatementProcessor:
         - Notes: Keyword found in transaction (from keyword mapping)
         - Subcategory: Category assigned based on found keyword
         - Source_Sheet: Name of original sheet containing this transaction
+        - Source_Row: Row number of this transaction in its original sheet
+        
+        Amounts are held in pence and written in pounds. When balances were
+        reconciled, a Balance_Breaks sheet lists every break found.
         """
         if self.processed_data is None:
             raise Exception("No data has been processed yet")
         
         try:
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                # Create a copy for export
-                export_data = self.processed_data.copy()
-                
-                # Format date to DD/MM/YYYY
-                export_data['Date'] = pd.to_datetime(export_data['Date']).dt.strftime('%d/%m/%Y')
-                
-                # Write main data
-                export_data.to_excel(writer, sheet_name='Transactions', index=False)
+            data = self.processed_data
+            with StreamingExcelWriter(output_file) as writer:
+                # Stream main data, formatting dates to DD/MM/YYYY chunk by chunk
+                writer.write_frame('Transactions', data, formatters={'Date': format_dates, **POUNDS_FORMATTERS})
                 
-                # Write summary statistics
-                summary = pd.DataFrame([
-                    ['Total Transactions', len(export_data)],
-                    ['Date Range Start', export_data['Date'].min()],
-                    ['Date Range End', export_data['Date'].max()],
-                    ['Total Income', f"£{export_data['Paid In (£)'].sum():,.2f}"],
-                    ['Total Expenses', f"£{export_data['Withdrawn (£)'].sum():,.2f}"],
-                    ['Net Position', f"£{(export_data['Paid In (£)'].sum() - export_data['Withdrawn (£)'].sum()):,.2f}"]
-                ], columns=['Metric', 'Value'])
-                summary.to_excel(writer, sheet_name='Summary', index=False)
+                # Write summary statistics from column aggregates (summed in pence)
+                total_income = to_pounds(data['Paid In (£)'].sum())
+                total_expenses = to_pounds(data['Withdrawn (£)'].sum())
+                dates = pd.to_datetime(data['Date'])
+                writer.write_rows('Summary', ['Metric', 'Value'], [
+                    ['Total Transactions', len(data)],
+                    ['Date Range Start', dates.min().strftime('%d/%m/%Y') if dates.notna().any() else None],
+                    ['Date Range End', dates.max().strftime('%d/%m/%Y') if dates.notna().any() else None],
+                    ['Total Income', f"£{total_income:,.2f}"],
+                    ['Total Expenses', f"£{total_expenses:,.2f}"],
+                    ['Net Position', f"£{(total_income - total_expenses):,.2f}"]
+                ])
                 
                 # Add sheet for transactions by source
-                source_summary = export_data.groupby('Source_Sheet').agg({
+                source_summary = data.groupby('Source_Sheet', observed=True).agg({
                     'Transaction': 'count',
                     'Paid In (£)': 'sum',
                     'Withdrawn (£)': 'sum'
                 }).reset_index()
                 source_summary.columns = ['Sheet Name', 'Transaction Count', 'Total Paid In (£)', 'Total Withdrawn (£)']
                 source_summary['Net Amount (£)'] = source_summary['Total Paid In (£)'] - source_summary['Total Withdrawn (£)']
-                source_summary.to_excel(writer, sheet_name='Sheet_Summary', index=False)
+                for col in ['Total Paid In (£)', 'Total Withdrawn (£)', 'Net Amount (£)']:
+                    source_summary[col] = to_pounds(source_summary[col])
+                writer.write_frame('Sheet_Summary', source_summary)
                 
-                print(f"Data exported to {output_file}")
+                # Add reconciliation breaks (an empty sheet means balances reconcile)
+                if self.balance_breaks is not None:
+                    writer.write_frame('Balance_Breaks', pounds_frame(self.balance_breaks),
+                                       formatters={'Date': format_dates})
+                
+            print(f"Data exported to {output_file}")
                 
         except Exception as e:
             raise Exception(f"Failed to export data: {str(e)}")
 
+    def export_to_parquet(self, output_dir, partition_by='Source_Sheet'):
+        """
+        Export processed and removed rows as Parquet datasets
+        
+        Writes processed_data/ and removed_rows/ under output_dir, partitioned by
+        Source_Sheet or by month, with datetime Date, float64 amounts and
+        categorical Subcategory.
+        
+        Parameters:
+        output_dir (str): Directory to write the datasets into
+        partition_by (str): 'Source_Sheet' or 'month'
+        
+        Returns:
+        dict: Table name -> path written
+        """
+        if self.processed_data is None:
+            raise Exception("No data has been processed yet")
+        
+        try:
+            output_dir = Path(output_dir)
+            written = {
+                'processed_data': write_parquet(self.processed_data, output_dir / 'processed_data', partition_by)
+            }
+            if self.removed_rows is not None and not self.removed_rows.empty:
+                written['removed_rows'] = write_parquet(self.removed_rows, output_dir / 'removed_rows', partition_by)
+            if self.balance_breaks is not None and not self.balance_breaks.empty:
+                written['balance_breaks'] = write_parquet(self.balance_breaks, output_dir / 'balance_breaks.parquet')
+            
+            print(f"Parquet data exported to {output_dir}")
+            return written
+        
+        except Exception as e:
+            raise Exception(f"Failed to export Parquet data: {str(e)}")
+
     def export_removed_rows(self, output_file='removed_rows_analysis.xlsx'):
         """
         Export removed rows analysis with defined columns:
@@ -279,6 +388,7 @@ class BankStatementProcessor:
         - Notes: Any notes associated with transaction
         - Subcategory: Any category assigned
         - Source_Sheet: Original sheet name
+        - Source_Row: Row number in the original sheet
         - Removal_Reason: Why the row was removed
         """
         if self.removed_rows is None or self.removed_rows.empty:
@@ -286,31 +396,28 @@ class BankStatementProcessor:
             return
         
         try:
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                # Format date in removed rows
-                export_removed = self.removed_rows.copy()
-                export_removed['Date'] = pd.to_datetime(export_removed['Date']).dt.strftime('%d/%m/%Y')
-                
-                # Write all removed rows
-                export_removed.to_excel(writer, sheet_name='All_Removed_Rows', index=False)
+            removed = self.removed_rows
+            with StreamingExcelWriter(output_file) as writer:
+                # Write all removed rows, formatting dates as they are streamed
+                writer.write_frame('All_Removed_Rows', removed, formatters={'Date': format_dates})
                 
                 # Write removal summary by reason
-                removal_summary = export_removed['Removal_Reason'].value_counts().reset_index()
+                removal_summary = removed['Removal_Reason'].value_counts().reset_index()
                 removal_summary.columns = ['Reason', 'Count']
-                removal_summary.to_excel(writer, sheet_name='Removal_Summary', index=False)
+                writer.write_frame('Removal_Summary', removal_summary)
                 
                 # Write removal summary by sheet
-                sheet_summary = export_removed.groupby(['Source_Sheet', 'Removal_Reason']).size().reset_index()
+                sheet_summary = removed.groupby(['Source_Sheet', 'Removal_Reason']).size().reset_index()
                 sheet_summary.columns = ['Sheet', 'Reason', 'Count']
-                sheet_summary.to_excel(writer, sheet_name='Sheet_Wise_Summary', index=False)
+                writer.write_frame('Sheet_Wise_Summary', sheet_summary)
                 
                 # Write detailed summaries for each reason
-                for reason in export_removed['Removal_Reason'].unique():
-                    reason_df = export_removed[export_removed['Removal_Reason'] == reason]
+                for reason in removed['Removal_Reason'].unique():
+                    reason_df = removed[removed['Removal_Reason'] == reason]
                     sheet_name = f"{reason.replace(' ', '_')[:28]}"  # Excel sheet names limited to 31 chars
-                    reason_df.to_excel(writer, sheet_name=sheet_name, index=False)
+                    writer.write_frame(sheet_name, reason_df, formatters={'Date': format_dates})
                 
-                print(f"Removed rows analysis exported to {output_file}")
+            print(f"Removed rows analysis exported to {output_file}")
                 
         except Exception as e:
             raise Exception(f"Failed to export removed rows analysis: {str(e)}")
@@ -382,25 +489,17 @@ class BankStatementProcessor:
     def export_keyword_mapping_analysis(self, output_file='keyword_mapping_analysis.xlsx'):
         """Export keyword mapping analysis to Excel"""
         try:
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            with StreamingExcelWriter(output_file) as writer:
                 # Write transactions with matches
                 if hasattr(self, 'keyword_matches') and not self.keyword_matches.empty:
-                    self.keyword_matches.to_excel(
-                        writer, 
-                        sheet_name='Keyword_Matches',
-                        index=False
-                    )
+                    writer.write_frame('Keyword_Matches', self.keyword_matches)
                     
                     # Write multiple matches for review
                     multiple_matches = self.keyword_matches[
                         self.keyword_matches['Multiple_Matches']
-                    ].copy()
+                    ]
                     if not multiple_matches.empty:
-                        multiple_matches.to_excel(
-                            writer,
-                            sheet_name='Multiple_Matches',
-                            index=False
-                        )
+                        writer.write_frame('Multiple_Matches', multiple_matches)
                 
                 # Write uncategorized transactions
                 if hasattr(self, 'processed_data'):
@@ -408,11 +507,7 @@ class BankStatementProcessor:
                         self.processed_data['Subcategory'] == ''
                     ][['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)']]
                     if not uncategorized.empty:
-                        uncategorized.to_excel(
-                            writer,
-                            sheet_name='Uncategorized',
-                            index=False
-                        )
+                        writer.write_frame('Uncategorized', uncategorized, formatters=POUNDS_FORMATTERS)
                 
             print(f"Keyword mapping analysis exported to {output_file}")
             
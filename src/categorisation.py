@@ -1,4 +1,9 @@
 import pandas as pd
+from pathlib import Path
+from src.keyword_matcher import KeywordMatcher
+from src.excel_export import POUNDS_FORMATTERS, StreamingExcelWriter
+from src.parquet_export import write_parquet
+from src.schema import apply_compact_schema, editable_schema, to_pounds
 from src.utils.error_handler import ProcessingError, handle_error
 
 
@@ -61,43 +66,14 @@ class Categorisation:
             total_rows = len(self.data)
             print(f"\nProcessing {total_rows} transactions...")
             
-            for index, row in self.data.iterrows():
-                try:
-                    transaction = str(row['Transaction']).upper()
-                    found_keywords, found_subcategories = [], set()
-                    
-                    for _, mapping in keyword_mappings.iterrows():
-                        keyword = str(mapping['Keyword']).upper()
-                        if keyword in transaction:
-                            found_keywords.append(mapping['Keyword'])
-                            found_subcategories.add(mapping['Subcategory'])
-                    
-                    if found_keywords:
-                        self.data.at[index, 'Notes'] = ', '.join(found_keywords)
-                        self.data.at[index, 'Subcategory'] = ', '.join(found_subcategories)
-                        
-                        if len(found_subcategories) > 1:
-                            self.categorization_issues.append({
-                                'Row': index + 2,
-                                'Transaction': row['Transaction'],
-                                'Found_Keywords': ', '.join(found_keywords),
-                                'Multiple_Categories': ', '.join(found_subcategories),
-                                'Issue': 'Multiple category matches'
-                            })
-                    
-                    if (index + 1) % 100 == 0:
-                        print(f"✓ Processed {index + 1}/{total_rows} transactions")
-                
-                except Exception as e:
-                    self.categorization_issues.append({
-                        'Row': index + 2,
-                        'Transaction': row['Transaction'],
-                        'Issue': f"Processing error: {str(e)}"
-                    })
+            # Build the matcher once and scan the whole Transaction column in one pass
+            matcher = KeywordMatcher.from_mapping(keyword_mappings)
+            self.data, issues = self.categorize_frame(self.data, matcher)
+            self.categorization_issues.extend(issues)
             
             print("\n📊 Categorization Summary:")
             print(f"Total Transactions: {total_rows}")
-            categorized = len(self.data[self.data['Subcategory'].notna()])
+            categorized = int((self.data['Subcategory'].notna() & (self.data['Subcategory'] != '')).sum())
             print(f"Categorized: {categorized}")
             print(f"Uncategorized: {total_rows - categorized}")
             print(f"Issues Found: {len(self.categorization_issues)}")
@@ -108,6 +84,49 @@ class Categorisation:
             handle_error(e, "apply_categorization", "categorisation.py")
             raise
 
+    def categorize_frame(self, data, matcher):
+        """
+        Categorize a frame of transactions with a prebuilt KeywordMatcher.
+        
+        Args:
+            data (pd.DataFrame): Transactions with a Transaction column
+            matcher (KeywordMatcher): Matcher built from the keyword mapping
+        
+        Returns:
+            tuple: (categorized copy of data, list of multiple-category issues)
+        """
+        data = editable_schema(data)
+        # Notes/Subcategory read from the sheet hold the previous run's results; rows that
+        # no longer match must come out blank, not keep them
+        data['Notes'] = ''
+        data['Subcategory'] = ''
+        matches = matcher.match_series(data['Transaction'])
+        matches = matches[matches.str.len() > 0]
+        
+        notes, subcategories, issues = [], [], []
+        for index, pattern_ids in matches.items():
+            found_keywords = [matcher.keywords[i] for i in pattern_ids]
+            found_subcategories = list(dict.fromkeys(matcher.labels[i] for i in pattern_ids))
+            notes.append(', '.join(found_keywords))
+            subcategories.append(', '.join(found_subcategories))
+            
+            if len(found_subcategories) > 1:
+                issues.append({
+                    'Row': index + 2,
+                    'Transaction': data.at[index, 'Transaction'],
+                    'Found_Keywords': ', '.join(found_keywords),
+                    'Multiple_Categories': ', '.join(found_subcategories),
+                    'Issue': 'Multiple category matches'
+                })
+        
+        if len(matches):
+            data.loc[matches.index, 'Notes'] = notes
+            data.loc[matches.index, 'Subcategory'] = subcategories
+        data = apply_compact_schema(data)
+        print(f"✓ Matched {len(matches)}/{len(data)} transactions against {len(matcher)} keywords")
+        
+        return data, issues
+
     def _validate_categorization(self):
         """Validate categorization and flag issues"""
         try:
@@ -140,13 +159,14 @@ class Categorisation:
     def export_categorization_analysis(self, output_file='categorization_analysis.xlsx'):
         """Export categorization analysis to Excel"""
         try:
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                self.data.to_excel(writer, sheet_name='All_Transactions', index=False)
+            with StreamingExcelWriter(output_file) as writer:
+                writer.write_frame('All_Transactions', self.data, formatters=POUNDS_FORMATTERS)
                 
-                if not self.categorization_issues.empty:
-                    self.categorization_issues.to_excel(writer, sheet_name='Categorization_Issues', index=False)
+                issues = self._issues_frame()
+                if not issues.empty:
+                    writer.write_frame('Categorization_Issues', issues)
                 
-                category_summary = self.data.groupby('Subcategory').agg({
+                category_summary = self.data.groupby('Subcategory', observed=True).agg({
                     'Paid In (£)': 'sum',
                     'Withdrawn (£)': 'sum',
                     'Transaction': 'count'
@@ -154,9 +174,47 @@ class Categorisation:
                 
                 category_summary.columns = ['Subcategory', 'Total Paid In (£)', 'Total Withdrawn (£)', 'Transaction Count']
                 category_summary['Net Amount (£)'] = category_summary['Total Paid In (£)'] - category_summary['Total Withdrawn (£)']
-                category_summary.to_excel(writer, sheet_name='Category_Summary', index=False)
+                for col in ['Total Paid In (£)', 'Total Withdrawn (£)', 'Net Amount (£)']:
+                    category_summary[col] = to_pounds(category_summary[col])
+                writer.write_frame('Category_Summary', category_summary)
             
             print(f"Categorization analysis exported to {output_file}")
         
         except Exception as e:
-            raise Exception(f"Failed to export categorization analysis: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to export categorization analysis: {str(e)}")
+
+    def _issues_frame(self):
+        """Categorization issues as a DataFrame (apply_categorization collects a list)"""
+        if isinstance(self.categorization_issues, list):
+            return pd.DataFrame(self.categorization_issues)
+        return self.categorization_issues
+
+    def export_categorization_parquet(self, output_dir, partition_by='Source_Sheet'):
+        """
+        Export keyword match results as Parquet
+        
+        Args:
+            output_dir (str): Directory to write into
+            partition_by (str): Partitioning of the transactions dataset, 'Source_Sheet' or 'month'
+        
+        Returns:
+            dict: Table name -> path written
+        """
+        try:
+            output_dir = Path(output_dir)
+            written = {
+                'categorized_transactions': write_parquet(
+                    self.data, output_dir / 'categorized_transactions', partition_by
+                )
+            }
+            issues = self._issues_frame()
+            if not issues.empty:
+                written['categorization_issues'] = write_parquet(
+                    issues, output_dir / 'categorization_issues.parquet'
+                )
+            
+            print(f"Categorization tables exported to {output_dir}")
+            return written
+        
+        except Exception as e:
+            raise Exception(f"Failed to export categorization Parquet: {str(e)}")
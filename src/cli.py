@@ -11,8 +11,22 @@ from src.google_sheets_connection import GoogleSheetsConnection
 from src.bank_statement_processor import BankStatementProcessor
 from src.categorisation import Categorisation
 from src.deposit_categorizer import DepositCategorizer
+from src.incremental_processor import IncrementalProcessor
+from src.streaming_pipeline import StreamingPipeline
+from src.stage_metrics import StageMetrics
 from tests.run_tests import TestRunner
 
+EXPORT_FORMATS = ('xlsx', 'parquet')
+
+
+def _parse_formats(ctx, param, value):
+    """Parse a comma-separated list of export formats"""
+    formats = [fmt.strip().lower() for fmt in value.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown or not formats:
+        raise click.BadParameter(f"expected a comma-separated list of {', '.join(EXPORT_FORMATS)}")
+    return list(dict.fromkeys(formats))
+
 @click.group()
 def cli():
     """Bank Statement Processing CLI"""
@@ -20,7 +34,25 @@ def cli():
 
 @cli.command()
 @click.option('--test-mode', is_flag=True, help='Run in test mode')
-def process_all(test_mode):
+@click.option('--workers', default=4, show_default=True, help='Concurrent sheet fetches (1 = sequential)')
+@click.option('--batch/--no-batch', default=True, show_default=True,
+              help='Fetch all statement sheets with one values:batchGet request')
+@click.option('--offline', is_flag=True, help='Run the whole pipeline from the local sheet cache')
+@click.option('--no-cache', is_flag=True, help='Always download sheets instead of using the local cache')
+@click.option('--incremental', is_flag=True, help='Only re-process sheets that changed since the last run')
+@click.option('--streaming', is_flag=True,
+              help='Process and categorize each sheet as soon as it is fetched (per-sheet fetches, no batch)')
+@click.option('--deposit-matching', type=click.Choice(['greedy', 'optimal']), default='greedy', show_default=True,
+              help='Pair deposits with returns greedily by date or with the smallest total gap')
+@click.option('--format', 'formats', default='xlsx', show_default=True, callback=_parse_formats,
+              help='Export formats, comma-separated (xlsx, parquet)')
+@click.option('--partition-by', type=click.Choice(['Source_Sheet', 'month']), default='Source_Sheet',
+              show_default=True, help='Partitioning of Parquet transaction datasets')
+@click.option('--reconcile/--no-reconcile', default=True, show_default=True,
+              help='Check reported balances against the running total of the amounts')
+@click.option('--profile', is_flag=True, help='Dump cProfile stats per stage into the run directory')
+def process_all(test_mode, workers, batch, offline, no_cache, incremental, streaming, deposit_matching,
+                formats, partition_by, reconcile, profile):
     """Process all bank statements with categorization"""
     try:
         print("\n🚀 Starting bank statement processing...")
@@ -30,37 +62,81 @@ def process_all(test_mode):
         credentials_file = project_root / 'creds' / 'credentials.json'
         spreadsheet_id = "1SpBtGBfcFwTJaXfj1_6A48ffKZXSRMLAHHn0fvqrWHo"
         sheets_list_file = project_root / 'Text_files' / 'Column_uniformity_sheets_to_update.txt'
+        removal_rules_file = project_root / 'Text_files' / 'removal_patterns.json'
+        cache_dir = None if no_cache and not offline else project_root / '.cache' / 'sheets'
+        processed_store_dir = project_root / '.cache' / 'processed'
         
         # Create output directory
         output_dir = project_root / 'output' / f'run_{timestamp}'
         output_dir.mkdir(parents=True, exist_ok=True)
+        metrics = StageMetrics(profile_dir=output_dir / 'profile' if profile else None)
         
         # Initialize connection
-        gs_connection = GoogleSheetsConnection(str(credentials_file))
-        
-        if not test_mode:
-            # Clear existing categorization
-            print("\n1️⃣ Clearing existing categorization...")
-            gs_connection.clear_categorization_columns(spreadsheet_id, str(sheets_list_file))
+        gs_connection = GoogleSheetsConnection(
+            str(credentials_file),
+            cache_dir=str(cache_dir) if cache_dir is not None else None,
+            offline=offline,
+            pool_size=max(workers, 1)
+        )
         
-        # Process statements
-        print("\n2️⃣ Processing bank statements...")
-        processor = BankStatementProcessor(gs_connection)
-        processor.process_all_statements(spreadsheet_id, str(sheets_list_file))
+        if offline:
+            print("\n📦 Offline mode: reading sheets from local cache, skipping sheet updates")
         
-        # Apply categorization
-        print("\n3️⃣ Applying transaction categorization...")
+        processor = BankStatementProcessor(gs_connection, str(removal_rules_file), reconcile=reconcile,
+                                           metrics=metrics)
         categorizer = Categorisation(processor)
-        categorized_data = categorizer.apply_categorization(spreadsheet_id, "Keyword Mapping")
+        
+        if incremental:
+            # Process and categorize only the sheets that changed
+            print("\n1️⃣ Processing changed bank statements and categorizing...")
+            IncrementalProcessor(processor, categorizer, str(processed_store_dir)).run(
+                spreadsheet_id, str(sheets_list_file), "Keyword Mapping",
+                max_workers=workers, batch=batch
+            )
+        elif streaming:
+            # Overlap processing and categorizing with the fetches still in flight
+            print("\n1️⃣ Streaming bank statements through processing and categorization...")
+            StreamingPipeline(processor, categorizer, max_workers=max(workers, 1)).run(
+                spreadsheet_id, str(sheets_list_file), "Keyword Mapping"
+            )
+        else:
+            # Process statements
+            print("\n1️⃣ Processing bank statements...")
+            processor.process_all_statements(spreadsheet_id, str(sheets_list_file),
+                                             max_workers=workers, batch=batch)
+            
+            # Apply categorization
+            print("\n2️⃣ Applying transaction categorization...")
+            with metrics.stage('apply_categorization') as stage:
+                categorized_data = categorizer.apply_categorization(spreadsheet_id, "Keyword Mapping")
+                stage['rows'] = len(categorized_data)
         
         # Process deposits
-        print("\n4️⃣ Processing deposits...")
-        deposit_handler = DepositCategorizer(processor)
-        deposit_handler.categorize_deposits()
+        print("\n3️⃣ Processing deposits...")
+        with metrics.stage('categorize_deposits') as stage:
+            deposit_handler = DepositCategorizer(processor, matching=deposit_matching)
+            stage['rows'] = len(deposit_handler.categorize_deposits())
         
         # Export results
-        print("\n5️⃣ Exporting results...")
-        _export_results(processor, deposit_handler, output_dir)
+        print("\n4️⃣ Exporting results...")
+        _export_results(processor, deposit_handler, output_dir, categorizer=categorizer,
+                        formats=formats, partition_by=partition_by, metrics=metrics)
+        
+        if not (offline or test_mode):
+            # Replace Notes/Subcategory in the statement sheets in one batch
+            print("\n5️⃣ Writing categorization back to statement sheets...")
+            with metrics.stage('write_categorization_back') as stage:
+                gs_connection.write_categorization_back(spreadsheet_id, categorizer.data, processor.sheet_layouts)
+                stage['rows'] = len(categorizer.data)
+        
+        if gs_connection.client is not None:
+            limiter = gs_connection.rate_limiter.metrics()
+            metrics.add('rate_limiter', limiter)
+            print(f"\n🚦 Sheets API: {limiter['requests']} requests, {limiter['throttled']} rate limited, "
+                  f"{limiter['total_wait_seconds']:.1f}s waiting, ending at {limiter['requests_per_minute']:.0f}/min")
+        metrics.print_summary()
+        metrics_file = metrics.write(output_dir)
+        print(f"📊 Stage metrics written to {metrics_file}")
         
         print(f"\n✅ Processing complete! Results saved in: {output_dir}")
         
@@ -95,24 +171,45 @@ def generate_test_data():
         print(f"\n❌ Test data generation failed: {str(e)}")
         sys.exit(1)
 
-def _export_results(processor, deposit_handler, output_dir):
-    """Export all processing results"""
+def _export_results(processor, deposit_handler, output_dir, categorizer=None,
+                    formats=('xlsx',), partition_by='Source_Sheet', metrics=None):
+    """Export all processing results in the requested formats, timing each export"""
+    metrics = metrics or StageMetrics()
     try:
-        # Main processed data
-        processor.export_to_excel(
-            output_dir / 'processed_statements.xlsx'
-        )
-        
-        # Removed rows analysis
-        if processor.removed_rows is not None:
-            processor.export_removed_rows(
-                output_dir / 'removed_rows_analysis.xlsx'
-            )
-        
-        # Deposit analysis
-        deposit_handler.export_deposit_analysis(
-            output_dir / 'deposit_analysis.xlsx'
-        )
+        if 'xlsx' in formats:
+            # Main processed data
+            with metrics.stage('export_processed_xlsx') as stage:
+                processor.export_to_excel(
+                    output_dir / 'processed_statements.xlsx'
+                )
+                stage['rows'] = len(processor.processed_data)
+            
+            # Removed rows analysis
+            if processor.removed_rows is not None:
+                with metrics.stage('export_removed_xlsx') as stage:
+                    processor.export_removed_rows(
+                        output_dir / 'removed_rows_analysis.xlsx'
+                    )
+                    stage['rows'] = len(processor.removed_rows)
+            
+            # Deposit analysis
+            with metrics.stage('export_deposits_xlsx'):
+                deposit_handler.export_deposit_analysis(
+                    output_dir / 'deposit_analysis.xlsx'
+                )
+        
+        if 'parquet' in formats:
+            # Columnar copies of the same tables for downstream dashboards
+            parquet_dir = output_dir / 'parquet'
+            with metrics.stage('export_processed_parquet') as stage:
+                processor.export_to_parquet(parquet_dir, partition_by=partition_by)
+                stage['rows'] = len(processor.processed_data)
+            with metrics.stage('export_deposits_parquet'):
+                deposit_handler.export_deposit_parquet(parquet_dir / 'deposits')
+            if categorizer is not None and categorizer.data is not None:
+                with metrics.stage('export_categorization_parquet') as stage:
+                    categorizer.export_categorization_parquet(parquet_dir, partition_by=partition_by)
+                    stage['rows'] = len(categorizer.data)
         
         # Generate summary report
         _generate_summary_report(processor, deposit_handler, output_dir)
@@ -131,7 +228,17 @@ def _generate_summary_report(processor, deposit_handler, output_dir):
             f.write(f"Processing Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"Total Transactions: {len(processor.processed_data)}\n")
             f.write(f"Removed Rows: {len(processor.removed_rows) if processor.removed_rows is not None else 0}\n")
-            f.write(f"Matched Deposits: {len(deposit_handler.matched_deposits)}\n")
+            if processor.balance_breaks is not None:
+                f.write(f"Balance Breaks: {len(processor.balance_breaks)}\n")
+                for break_type, count in processor.balance_breaks['Break_Type'].value_counts().items():
+                    f.write(f"  - {break_type}: {count}\n")
+            f.write(f"Failed Sheets: {len(processor.failed_sheets)}\n")
+            for sheet_name, error in processor.failed_sheets.items():
+                f.write(f"  - {sheet_name}: {error}\n")
+            f.write(f"Matched Deposits: {len(deposit_handler.matched_deposits)} ({deposit_handler.matching} matching)\n")
+            for mode, summary in deposit_handler.matching_summary.items():
+                f.write(f"  - {mode.title()} Matches: {summary['pairs']} "
+                        f"({summary['total_days']} total days between)\n")
             f.write(f"Unmatched Deposits: {len(deposit_handler.unmatched_deposits)}\n")
             f.write(f"Unmatched Returns: {len(deposit_handler.unmatched_returns)}\n")
             f.write(f"Issues Found: {len(deposit_handler.deposit_issues)}\n")
@@ -0,0 +1,93 @@
+import warnings
+
+import pandas as pd
+
+# Supported statement date formats, in the order they are tried
+DATE_FORMATS = [
+    '%d %b %y',    # e.g., "03 Apr 23"
+    '%d %B %Y',    # e.g., "03 April 2023"
+    '%d/%m/%Y',    # e.g., "03/04/2023"
+    '%d-%m-%Y',    # e.g., "03-04-2023"
+    '%Y-%m-%d',    # e.g., "2023-04-03"
+]
+
+DETECTION_SAMPLE_SIZE = 200
+
+
+def parse_date(date_str):
+    """
+    Parse a single date string, trying each known format then dayfirst guessing
+
+    Used only for the cells the dominant sheet format could not parse.
+    """
+    if pd.isna(date_str) or not isinstance(date_str, str):
+        return None
+
+    date_str = date_str.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return pd.to_datetime(date_str, format=date_format)
+        except (ValueError, TypeError, OverflowError):
+            continue
+
+    try:
+        # Last resort: let pandas guess the format
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            return pd.to_datetime(date_str, dayfirst=True)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def detect_date_format(dates, sample_size=DETECTION_SAMPLE_SIZE):
+    """
+    Pick the format that parses the most values in a sample of the column
+
+    Args:
+        dates (pd.Series): Raw date strings
+        sample_size (int): Number of non-empty values to test each format on
+
+    Returns:
+        str: Dominant format from DATE_FORMATS, or None if no format fits
+    """
+    sample = dates[dates.map(lambda value: isinstance(value, str))].str.strip()
+    sample = sample[sample != ''].head(sample_size)
+    if sample.empty:
+        return None
+
+    best_format, best_count = None, 0
+    for date_format in DATE_FORMATS:
+        parsed_count = pd.to_datetime(sample, format=date_format, errors='coerce').notna().sum()
+        if parsed_count > best_count:
+            best_format, best_count = date_format, parsed_count
+    return best_format
+
+
+def parse_date_column(dates):
+    """
+    Parse a whole date column using its dominant format
+
+    The column is parsed with one vectorized to_datetime call; only the cells
+    that fail go through the per-cell parse_date fallback chain.
+
+    Args:
+        dates (pd.Series): Raw date strings
+
+    Returns:
+        tuple: (pd.Series of datetime64[ns], detected format or None, number of fallback cells)
+    """
+    date_format = detect_date_format(dates)
+    is_string = dates.map(lambda value: isinstance(value, str))
+    stripped = dates.where(is_string).str.strip()
+
+    if date_format is not None:
+        parsed = pd.to_datetime(stripped, format=date_format, errors='coerce')
+    else:
+        parsed = pd.Series(pd.NaT, index=dates.index, dtype='datetime64[ns]')
+
+    fallback_mask = parsed.isna() & is_string & (stripped != '')
+    if fallback_mask.any():
+        fallback = pd.to_datetime(stripped[fallback_mask].map(parse_date), errors='coerce')
+        parsed[fallback_mask] = fallback
+
+    return parsed, date_format, int(fallback_mask.sum())
@@ -1,15 +1,38 @@
 from src.utils.error_handler import ProcessingError, handle_error
+import re
+import bisect
+from pathlib import Path
+import heapq
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import timedelta
+
+from src.excel_export import StreamingExcelWriter
+from src.parquet_export import write_parquet
+from src.schema import apply_compact_schema, editable_schema, is_money_column, pounds_frame
+
+MATCHING_MODES = ('greedy', 'optimal')
 
 class DepositCategorizer:
-    def __init__(self, bank_statement_processor):
-        """Initialize DepositCategorizer with strict deposit rules and error tracking"""
+    def __init__(self, bank_statement_processor, matching='greedy'):
+        """
+        Initialize DepositCategorizer with strict deposit rules and error tracking
+        
+        Parameters:
+        bank_statement_processor (BankStatementProcessor): Processed bank statement data
+        matching (str): 'greedy' pairs each deposit with the closest later return in
+            date order; 'optimal' finds the most pairs with the smallest total
+            Days_Between per amount
+        """
+        if matching not in MATCHING_MODES:
+            raise ValueError(f"Unknown matching mode '{matching}', expected one of {MATCHING_MODES}")
+        
         self.processor = bank_statement_processor
-        self.data = bank_statement_processor.processed_data.copy()
+        # Categorical columns are edited as strings until categorization is done
+        self.data = editable_schema(bank_statement_processor.processed_data)
+        self.matching = matching
         
-        # Strict deposit amounts
-        self.deposit_amounts = [50.0, 100.0]
+        # Strict deposit amounts in pence (£50 and £100), matched as exact integers
+        self.deposit_amounts = {5000, 10000}
         
         # Tracking containers
         self.deposit_issues = []
@@ -18,6 +41,7 @@ class DepositCategorizer:
         self.unmatched_returns = []
         self.miscellaneous_transactions = []
         self.processing_errors = []
+        self.matching_summary = {}
         
         # Keywords for identification
         self.deposit_keywords = [
@@ -36,43 +60,15 @@ class DepositCategorizer:
         try:
             print("\nStarting deposit categorization...")
             
-            # Track transactions
-            deposits = []
-            returns = []
-            
-            # Process each transaction
             total_rows = len(self.data)
-            processed_count = 0
-            error_count = 0
             
-            for index, row in self.data.iterrows():
-                try:
-                    # Progress tracking
-                    processed_count += 1
-                    if processed_count % 100 == 0:
-                        print(f"✓ Processed {processed_count}/{total_rows} transactions")
-                        print(f"  - Found {len(deposits)} deposits, {len(returns)} returns")
-                        print(f"  - Issues: {len(self.deposit_issues)}")
-                    
-                    transaction = str(row['Transaction']).upper()
-                    paid_in = row['Paid In (£)'] if pd.notnull(row['Paid In (£)']) else 0.0
-                    withdrawn = row['Withdrawn (£)'] if pd.notnull(row['Withdrawn (£)']) else 0.0
-                    
-                    # Detailed transaction analysis
-                    self._analyze_transaction(index, row, transaction, paid_in, withdrawn,
-                                           deposits, returns)
-                    
-                except Exception as e:
-                    error_count += 1
-                    error_detail = {
-                        'Row': index + 2,
-                        'Transaction': row['Transaction'],
-                        'Error': str(e),
-                        'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    self.processing_errors.append(error_detail)
-                    handle_error(e, f"categorize_deposits - Row {index + 2}",
-                               "deposit_categorizer.py")
+            # Classify every transaction at once
+            deposits, returns = self._classify_transactions()
+            processed_count = total_rows
+            error_count = 0
+            print(f"✓ Processed {processed_count}/{total_rows} transactions")
+            print(f"  - Found {len(deposits)} deposits, {len(returns)} returns")
+            print(f"  - Issues: {len(self.deposit_issues)}")
             
             # Match deposits with returns
             print("\nMatching deposits with returns...")
@@ -85,84 +81,101 @@ class DepositCategorizer:
             # Generate comprehensive summary
             self._generate_detailed_summary(total_rows, processed_count, error_count)
             
+            self.data = apply_compact_schema(self.data)
             return self.data
             
         except Exception as e:
             handle_error(e, "categorize_deposits", "deposit_categorizer.py")
             raise
 
-    def _analyze_transaction(self, index, row, transaction, paid_in, withdrawn,
-                           deposits, returns):
-        """Detailed analysis of each transaction"""
+    def _keyword_mask(self, transactions, keywords):
+        """Rows whose uppercased transaction contains any of the keywords"""
+        pattern = '|'.join(re.escape(keyword.upper()) for keyword in keywords)
+        return transactions.str.contains(pattern, regex=True)
+
+    def _classify_transactions(self):
+        """
+        Split transactions into deposits, returns, miscellaneous and issues
+        
+        Keyword and amount checks run over whole columns; each bucket is then
+        selected with a boolean mask, keeping the original row order.
+        
+        Returns:
+        tuple: (list of deposits, list of returns)
+        """
         try:
-            # Check keywords
-            is_deposit_desc = any(keyword.upper() in transaction
-                                for keyword in self.deposit_keywords)
-            is_return_desc = any(keyword.upper() in transaction
-                               for keyword in self.return_keywords)
+            transactions = self.data['Transaction'].astype(str).str.upper()
+            paid_in = self.data['Paid In (£)'].fillna(0)
+            withdrawn = self.data['Withdrawn (£)'].fillna(0)
+            
+            is_deposit_desc = self._keyword_mask(transactions, self.deposit_keywords)
+            is_return_desc = self._keyword_mask(transactions, self.return_keywords)
+            has_keyword = is_deposit_desc | is_return_desc
+            
+            paid_in_standard = paid_in.isin(self.deposit_amounts)
+            withdrawn_standard = withdrawn.isin(self.deposit_amounts)
+            standard_amount = paid_in_standard | withdrawn_standard
+            
+            # Same precedence as the per-transaction rules: deposit before return
+            is_deposit = standard_amount & paid_in_standard & is_deposit_desc
+            is_return = standard_amount & has_keyword & ~is_deposit & withdrawn_standard & is_return_desc
+            is_miscellaneous = standard_amount & ~has_keyword
+            is_issue = ~standard_amount & has_keyword
+            
+            self.miscellaneous_transactions.extend(
+                self._review_records(is_miscellaneous, paid_in, withdrawn, 'Standard amount but no deposit keyword')
+            )
+            self.deposit_issues.extend(
+                self._review_records(is_issue, paid_in, withdrawn, 'Non-standard amount with deposit keyword')
+            )
+            
+            deposits = self._transaction_records(is_deposit, paid_in)
+            returns = self._transaction_records(is_return, withdrawn)
+            
+            self.data.loc[is_deposit, 'Notes'] = 'DEPOSIT'
+            self.data.loc[is_deposit, 'Subcategory'] = 'Deposit'
+            self.data.loc[is_return, 'Notes'] = 'DEPOSIT RETURN'
+            self.data.loc[is_return, 'Subcategory'] = 'Deposit Return'
+            
+            return deposits, returns
             
-            # Case analysis with detailed tracking
-            if paid_in in self.deposit_amounts or withdrawn in self.deposit_amounts:
-                if not (is_deposit_desc or is_return_desc):
-                    self._track_miscellaneous(index, row, paid_in, withdrawn)
-                elif paid_in in self.deposit_amounts and is_deposit_desc:
-                    self._track_deposit(index, row, paid_in, deposits)
-                elif withdrawn in self.deposit_amounts and is_return_desc:
-                    self._track_return(index, row, withdrawn, returns)
-            elif is_deposit_desc or is_return_desc:
-                self._track_issue(index, row, paid_in, withdrawn,
-                                "Non-standard amount with deposit keyword")
-                
         except Exception as e:
             raise ProcessingError(
-                f"Transaction analysis failed: {str(e)}",
-                "_analyze_transaction",
+                f"Transaction classification failed: {str(e)}",
+                "_classify_transactions",
                 "deposit_categorizer.py"
             )
 
-    def _track_miscellaneous(self, index, row, paid_in, withdrawn):
-        """Track transactions needing review"""
-        self.miscellaneous_transactions.append({
-            'Row': index + 2,
-            'Date': row['Date'],
-            'Transaction': row['Transaction'],
-            'Amount': paid_in if paid_in > 0 else withdrawn,
-            'Type': 'Paid In' if paid_in > 0 else 'Withdrawn',
-            'Issue': 'Standard amount but no deposit keyword'
-        })
-
-    def _track_deposit(self, index, row, amount, deposits):
-        """Track valid deposits"""
-        deposits.append({
-            'Index': index,
-            'Date': row['Date'],
-            'Transaction': row['Transaction'],
-            'Amount': amount
-        })
-        self.data.at[index, 'Notes'] = 'DEPOSIT'
-        self.data.at[index, 'Subcategory'] = 'Deposit'
-
-    def _track_return(self, index, row, amount, returns):
-        """Track valid returns"""
-        returns.append({
-            'Index': index,
-            'Date': row['Date'],
-            'Transaction': row['Transaction'],
-            'Amount': amount
-        })
-        self.data.at[index, 'Notes'] = 'DEPOSIT RETURN'
-        self.data.at[index, 'Subcategory'] = 'Deposit Return'
+    def _transaction_records(self, mask, amounts):
+        """Deposit/return records for the masked rows"""
+        selected = self.data.loc[mask]
+        return [
+            {'Index': index, 'Date': date, 'Transaction': transaction, 'Amount': amount}
+            for index, date, transaction, amount in zip(
+                selected.index.tolist(), selected['Date'], selected['Transaction'], amounts[mask].tolist()
+            )
+        ]
 
-    def _track_issue(self, index, row, paid_in, withdrawn, issue):
-        """Track deposit-related issues"""
-        self.deposit_issues.append({
-            'Row': index + 2,
-            'Date': row['Date'],
-            'Transaction': row['Transaction'],
-            'Amount': paid_in if paid_in > 0 else withdrawn,
-            'Type': 'Paid In' if paid_in > 0 else 'Withdrawn',
-            'Issue': issue
-        })
+    def _review_records(self, mask, paid_in, withdrawn, issue):
+        """Miscellaneous/issue records for the masked rows"""
+        selected = self.data.loc[mask]
+        selected_paid_in = paid_in[mask]
+        amounts = selected_paid_in.where(selected_paid_in > 0, withdrawn[mask])
+        types = (selected_paid_in > 0).map({True: 'Paid In', False: 'Withdrawn'})
+        return [
+            {
+                'Row': index + 2,
+                'Date': date,
+                'Transaction': transaction,
+                'Amount': amount,
+                'Type': transaction_type,
+                'Issue': issue
+            }
+            for index, date, transaction, amount, transaction_type in zip(
+                selected.index.tolist(), selected['Date'], selected['Transaction'],
+                amounts.tolist(), types.tolist()
+            )
+        ]
 
     def _match_deposits_returns(self, deposits, returns):
         """
@@ -173,61 +186,59 @@ class DepositCategorizer:
         returns (list): List of return transactions
         """
         try:
-            # Sort by date
-            deposits.sort(key=lambda x: pd.to_datetime(x['Date']))
-            returns.sort(key=lambda x: pd.to_datetime(x['Date']))
+            # Convert dates once, then sort by date
+            for transaction in deposits + returns:
+                transaction['_Date'] = pd.to_datetime(transaction['Date'])
+            deposits.sort(key=lambda x: x['_Date'])
+            returns.sort(key=lambda x: x['_Date'])
+            
+            # Both assignments are cheap, so compute both and report the difference
+            candidates = {
+                'greedy': self._greedy_pairs(deposits, returns),
+                'optimal': self._optimal_pairs(deposits, returns)
+            }
+            self.matching_summary = {
+                mode: {'pairs': len(mode_pairs), 'total_days': sum(days for _, _, days in mode_pairs)}
+                for mode, mode_pairs in candidates.items()
+            }
+            pairs = candidates[self.matching]
             
             # Track matched transactions
             matched_deposits = []
+            matched_deposit_positions = set()
             used_returns = set()
-            
-            # Match each deposit with a return
-            for deposit in deposits:
-                deposit_date = pd.to_datetime(deposit['Date'])
-                deposit_amount = deposit['Amount']
-                best_match = None
-                min_days_diff = float('inf')
+            for deposit_position, return_position, days_between in pairs:
+                deposit = deposits[deposit_position]
+                return_trans = returns[return_position]
+                matched_deposit_positions.add(deposit_position)
+                used_returns.add(return_position)
                 
-                # Find the best matching return
-                for i, return_trans in enumerate(returns):
-                    if i not in used_returns:
-                        return_date = pd.to_datetime(return_trans['Date'])
-                        return_amount = return_trans['Amount']
-                        
-                        # Check if amounts match
-                        if return_amount == deposit_amount:
-                            days_diff = (return_date - deposit_date).days
-                            
-                            # Return must be after deposit
-                            if days_diff > 0 and days_diff < min_days_diff:
-                                min_days_diff = days_diff
-                                best_match = (i, return_trans)
-                
-                # Process the match if found
-                if best_match:
-                    return_index, return_trans = best_match
-                    used_returns.add(return_index)
-                    
-                    matched_deposits.append({
-                        'Deposit_Index': deposit['Index'],
-                        'Deposit_Date': deposit['Date'],
-                        'Deposit_Transaction': deposit['Transaction'],
-                        'Deposit_Amount': deposit_amount,
-                        'Return_Index': return_trans['Index'],
-                        'Return_Date': return_trans['Date'],
-                        'Return_Transaction': return_trans['Transaction'],
-                        'Return_Amount': return_trans['Amount'],
-                        'Days_Between': min_days_diff
-                    })
-                    
-                    # Update transaction notes
-                    self.data.at[deposit['Index'], 'Notes'] += ' (Matched)'
-                    self.data.at[return_trans['Index'], 'Notes'] += ' (Matched)'
-                else:
-                    # Track unmatched deposit
-                    self.unmatched_deposits.append(deposit)
+                matched_deposits.append({
+                    'Deposit_Index': deposit['Index'],
+                    'Deposit_Date': deposit['Date'],
+                    'Deposit_Transaction': deposit['Transaction'],
+                    'Deposit_Amount': deposit['Amount'],
+                    'Return_Index': return_trans['Index'],
+                    'Return_Date': return_trans['Date'],
+                    'Return_Transaction': return_trans['Transaction'],
+                    'Return_Amount': return_trans['Amount'],
+                    'Days_Between': days_between
+                })
+            
+            for transaction in deposits + returns:
+                del transaction['_Date']
+            
+            # Update transaction notes
+            matched_index = [match['Deposit_Index'] for match in matched_deposits] + \
+                            [match['Return_Index'] for match in matched_deposits]
+            if matched_index:
+                self.data.loc[matched_index, 'Notes'] += ' (Matched)'
             
-            # Track unmatched returns
+            # Track unmatched deposits and returns
+            self.unmatched_deposits.extend(
+                deposits[i] for i in range(len(deposits))
+                if i not in matched_deposit_positions
+            )
             self.unmatched_returns.extend(
                 returns[i] for i in range(len(returns))
                 if i not in used_returns
@@ -238,7 +249,9 @@ class DepositCategorizer:
             
             # Print matching summary
             print(f"\nMatching Summary:")
-            print(f"Matched Pairs: {len(matched_deposits)}")
+            print(f"Matched Pairs: {len(matched_deposits)} ({self.matching} matching)")
+            for mode, summary in self.matching_summary.items():
+                print(f"  - {mode.title()}: {summary['pairs']} pairs, {summary['total_days']} total days between")
             print(f"Unmatched Deposits: {len(self.unmatched_deposits)}")
             print(f"Unmatched Returns: {len(self.unmatched_returns)}")
             
@@ -246,6 +259,96 @@ class DepositCategorizer:
             handle_error(e, "_match_deposits_returns", "deposit_categorizer.py")
             raise
 
+    def _greedy_pairs(self, deposits, returns):
+        """
+        Pair each deposit, in date order, with the closest later unused return
+        
+        Returns are grouped by amount and kept sorted by date, so the closest
+        return at least one day after a deposit is found by bisection. Used
+        returns are skipped with a next-unused pointer per amount group.
+        
+        Parameters:
+        deposits (list): Deposit transactions sorted by '_Date'
+        returns (list): Return transactions sorted by '_Date'
+        
+        Returns:
+        list: (deposit position, return position, days between) tuples, in deposit order
+        """
+        groups = {}
+        for position, return_trans in enumerate(returns):
+            dates, positions = groups.setdefault(return_trans['Amount'], ([], []))
+            dates.append(return_trans['_Date'])
+            positions.append(position)
+        next_unused = {amount: list(range(len(dates) + 1)) for amount, (dates, _) in groups.items()}
+        
+        def find_unused(pointers, i):
+            root = i
+            while pointers[root] != root:
+                root = pointers[root]
+            while pointers[i] != root:
+                pointers[i], i = root, pointers[i]
+            return root
+        
+        pairs = []
+        for deposit_position, deposit in enumerate(deposits):
+            group = groups.get(deposit['Amount'])
+            if group is None:
+                continue
+            dates, positions = group
+            pointers = next_unused[deposit['Amount']]
+            
+            # Return must be at least one whole day after the deposit
+            i = find_unused(pointers, bisect.bisect_left(dates, deposit['_Date'] + timedelta(days=1)))
+            if i == len(dates):
+                continue
+            pointers[i] = i + 1
+            pairs.append((deposit_position, positions[i], (dates[i] - deposit['_Date']).days))
+        
+        return pairs
+
+    def _optimal_pairs(self, deposits, returns):
+        """
+        Pair deposits and returns to get the most pairs with the least total Days_Between
+        
+        Returns are swept in date order per amount. Each return takes the latest
+        unused deposit at least one whole day before it, which maximizes the number
+        of pairs and minimizes their total gap.
+        
+        Parameters:
+        deposits (list): Deposit transactions sorted by '_Date'
+        returns (list): Return transactions sorted by '_Date'
+        
+        Returns:
+        list: (deposit position, return position, days between) tuples, in deposit order
+        """
+        deposits_by_amount = {}
+        for position, deposit in enumerate(deposits):
+            deposits_by_amount.setdefault(deposit['Amount'], []).append(position)
+        
+        next_deposit = {amount: 0 for amount in deposits_by_amount}
+        available = {amount: [] for amount in deposits_by_amount}
+        pairs = []
+        for return_position, return_trans in enumerate(returns):
+            amount = return_trans['Amount']
+            positions = deposits_by_amount.get(amount)
+            if positions is None:
+                continue
+            
+            # Make every deposit at least one whole day earlier available
+            latest_date = return_trans['_Date'] - timedelta(days=1)
+            heap = available[amount]
+            while next_deposit[amount] < len(positions) and \
+                    deposits[positions[next_deposit[amount]]]['_Date'] <= latest_date:
+                heapq.heappush(heap, -positions[next_deposit[amount]])
+                next_deposit[amount] += 1
+            
+            if heap:
+                deposit_position = -heapq.heappop(heap)
+                days_between = (return_trans['_Date'] - deposits[deposit_position]['_Date']).days
+                pairs.append((deposit_position, return_position, days_between))
+        
+        return sorted(pairs)
+
     def _validate_timing_patterns(self):
         """Validate timing patterns between deposits and returns"""
         try:
@@ -277,7 +380,9 @@ class DepositCategorizer:
         print("\nDeposit Analysis Summary:")
         print(f"Total Transactions Processed: {processed_count}/{total_rows}")
         print(f"Processing Errors: {error_count}")
-        print(f"Matched Deposits: {len(self.matched_deposits)}")
+        print(f"Matched Deposits: {len(self.matched_deposits)} ({self.matching} matching)")
+        for mode, summary in self.matching_summary.items():
+            print(f"  - {mode.title()} Matches: {summary['pairs']}")
         print(f"Unmatched Deposits: {len(self.unmatched_deposits)}")
         print(f"Unmatched Returns: {len(self.unmatched_returns)}")
         print(f"Miscellaneous Transactions: {len(self.miscellaneous_transactions)}")
@@ -286,34 +391,61 @@ class DepositCategorizer:
     def export_deposit_analysis(self, output_file):
         """Export comprehensive deposit analysis"""
         try:
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            with StreamingExcelWriter(output_file) as writer:
                 # Export all tracking data
-                if self.matched_deposits:
-                    pd.DataFrame(self.matched_deposits).to_excel(
-                        writer, sheet_name='Matched_Deposits', index=False)
-                
-                if self.unmatched_deposits:
-                    pd.DataFrame(self.unmatched_deposits).to_excel(
-                        writer, sheet_name='Unmatched_Deposits', index=False)
-                
-                if self.unmatched_returns:
-                    pd.DataFrame(self.unmatched_returns).to_excel(
-                        writer, sheet_name='Unmatched_Returns', index=False)
-                
-                if self.miscellaneous_transactions:
-                    pd.DataFrame(self.miscellaneous_transactions).to_excel(
-                        writer, sheet_name='Miscellaneous', index=False)
-                
-                if self.deposit_issues:
-                    pd.DataFrame(self.deposit_issues).to_excel(
-                        writer, sheet_name='Issues', index=False)
-                
-                if self.processing_errors:
-                    pd.DataFrame(self.processing_errors).to_excel(
-                        writer, sheet_name='Processing_Errors', index=False)
+                for sheet_name, records in self._export_tables():
+                    if records:
+                        writer.write_frame(sheet_name, pounds_frame(self._records_frame(records)))
                 
             print(f"\nComprehensive deposit analysis exported to {output_file}")
             
         except Exception as e:
             handle_error(e, "export_deposit_analysis", "deposit_categorizer.py")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def _records_frame(records):
+        """
+        Frame of tracking records with nullable Int64 pence in the money columns
+        
+        Records of one table can lack an amount (e.g. timing issues next to
+        amount issues), which would otherwise turn the column into float NaN
+        and hide that it holds pence.
+        """
+        frame = pd.DataFrame(records)
+        return frame.astype({column: 'Int64' for column in frame.columns if is_money_column(column)})
+
+    def _export_tables(self):
+        """Deposit tracking tables by export name (amounts in pence)"""
+        return [
+            ('Matched_Deposits', self.matched_deposits),
+            ('Unmatched_Deposits', self.unmatched_deposits),
+            ('Unmatched_Returns', self.unmatched_returns),
+            ('Miscellaneous', self.miscellaneous_transactions),
+            ('Issues', self.deposit_issues),
+            ('Processing_Errors', self.processing_errors)
+        ]
+
+    def export_deposit_parquet(self, output_dir):
+        """
+        Export the deposit match tables as one Parquet file each
+        
+        Parameters:
+        output_dir (str): Directory to write <table>.parquet files into
+        
+        Returns:
+        dict: Table name -> path written
+        """
+        try:
+            output_dir = Path(output_dir)
+            written = {}
+            for name, records in self._export_tables():
+                if records:
+                    written[name] = write_parquet(self._records_frame(records), output_dir / f"{name.lower()}.parquet")
+            
+            print(f"\nDeposit tables exported to {output_dir}")
+            return written
+            
+        except Exception as e:
+            handle_error(e, "export_deposit_parquet", "deposit_categorizer.py")
+            raise
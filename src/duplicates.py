@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+# A bank row is identified by what the bank printed; provenance and categorization are not part of it
+DUPLICATE_KEY_COLUMNS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)']
+DUPLICATE_REASON = 'Duplicate Transaction'
+
+
+def fingerprint(frame, columns=DUPLICATE_KEY_COLUMNS):
+    """
+    Hash the key columns of every row into one 64-bit fingerprint
+
+    Args:
+        frame (pd.DataFrame): Rows to hash
+        columns (list): Key columns
+
+    Returns:
+        pd.Series: uint64 fingerprints, same index as frame
+    """
+    return pd.util.hash_pandas_object(frame[columns], index=False)
+
+
+def _same_keys(left, right):
+    """Row-wise equality of two key frames, treating missing values as equal"""
+    same = pd.Series(True, index=range(len(left)))
+    for column in left.columns:
+        a = left[column].reset_index(drop=True)
+        b = right[column].reset_index(drop=True)
+        same &= (a == b).fillna(False).astype(bool) | (a.isna() & b.isna())
+    return same.to_numpy()
+
+
+def find_duplicates(frame, columns=DUPLICATE_KEY_COLUMNS):
+    """
+    Find repeated rows in one pass and point each repeat at its original
+
+    The key columns are hashed once; fingerprints are factorized in row
+    order, so the first row carrying each fingerprint is the original and
+    every later one is a duplicate of it. Candidate pairs are confirmed on
+    the key values, so a hash collision never removes a row. Overlapping
+    statement periods put the same rows on two sheets; the copy on the
+    earlier row (by frame order) is kept.
+
+    Args:
+        frame (pd.DataFrame): Rows to check, in priority order
+        columns (list): Key columns that identify a transaction
+
+    Returns:
+        pd.DataFrame: Same index as frame with columns
+            Fingerprint: uint64 hash of the key columns
+            Duplicate_Of: index label of the original row (NA when not a duplicate)
+            Duplicate_Of_Sheet: Source_Sheet of the original (when frame has one)
+            Duplicate_Of_Row: Source_Row of the original (when frame has one)
+    """
+    fingerprints = fingerprint(frame, columns)
+    codes, _ = pd.factorize(fingerprints)
+
+    # Codes are numbered in order of first appearance, so the n-th first
+    # occurrence is the original for code n
+    first_positions = np.flatnonzero(~pd.Series(codes).duplicated().to_numpy())
+    original_positions = first_positions[codes]
+    candidates = np.flatnonzero(original_positions != np.arange(len(frame)))
+
+    keys = frame[columns]
+    confirmed = candidates[_same_keys(keys.iloc[candidates], keys.iloc[original_positions[candidates]])]
+
+    result = pd.DataFrame({'Fingerprint': fingerprints}, index=frame.index)
+    result['Duplicate_Of'] = pd.Series(pd.NA, index=frame.index, dtype='object')
+    result.iloc[confirmed, result.columns.get_loc('Duplicate_Of')] = frame.index[original_positions[confirmed]]
+    for column, pointer in (('Source_Sheet', 'Duplicate_Of_Sheet'), ('Source_Row', 'Duplicate_Of_Row')):
+        if column in frame.columns:
+            result[pointer] = pd.Series(pd.NA, index=frame.index, dtype='object')
+            originals = frame[column].to_numpy(dtype=object)[original_positions[confirmed]]
+            result.iloc[confirmed, result.columns.get_loc(pointer)] = originals
+    return result
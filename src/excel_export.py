@@ -0,0 +1,98 @@
+import math
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from src.schema import MONEY_COLUMNS, to_pounds
+
+# Rows converted and appended per step; only one chunk is materialized at a time
+EXPORT_CHUNK_SIZE = 10_000
+
+# Money columns are stored in pence and written in pounds
+POUNDS_FORMATTERS = {column: to_pounds for column in MONEY_COLUMNS}
+
+
+def to_excel_value(value):
+    """Convert a DataFrame value to something openpyxl can write (None for blanks)"""
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+def format_dates(dates):
+    """Format a date column as DD/MM/YYYY strings, like the Excel exports always have"""
+    return pd.to_datetime(dates).dt.strftime('%d/%m/%Y')
+
+
+class StreamingExcelWriter:
+    def __init__(self, output_file, chunk_size=EXPORT_CHUNK_SIZE):
+        """
+        Initialize a constant-memory Excel writer
+
+        Uses an openpyxl write-only workbook: rows are appended in chunks and
+        flushed to a temporary file, so memory does not grow with row count.
+        The workbook is saved when the context manager exits cleanly.
+
+        Parameters:
+        output_file (str): Path of the .xlsx file to write
+        chunk_size (int): Rows converted per step
+        """
+        self.output_file = output_file
+        self.chunk_size = chunk_size
+        self.workbook = Workbook(write_only=True)
+        self.header_font = Font(bold=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.workbook.save(self.output_file)
+        else:
+            self.workbook.close()
+        return False
+
+    def _create_sheet(self, sheet_name, columns):
+        worksheet = self.workbook.create_sheet(title=sheet_name)
+        header = []
+        for column in columns:
+            cell = WriteOnlyCell(worksheet, value=str(column))
+            cell.font = self.header_font
+            header.append(cell)
+        worksheet.append(header)
+        return worksheet
+
+    def write_frame(self, sheet_name, frame, formatters=None):
+        """
+        Stream a DataFrame into a new sheet without copying it
+
+        Parameters:
+        sheet_name (str): Worksheet title
+        frame (pd.DataFrame): Rows to write; the index is not written
+        formatters (dict): Column -> function applied to each chunk of that column
+        """
+        formatters = formatters or {}
+        worksheet = self._create_sheet(sheet_name, frame.columns)
+        for start in range(0, len(frame), self.chunk_size):
+            chunk = frame.iloc[start:start + self.chunk_size]
+            columns = [
+                formatters[column](chunk[column]) if column in formatters else chunk[column]
+                for column in frame.columns
+            ]
+            for row in zip(*(column.tolist() for column in columns)):
+                worksheet.append([to_excel_value(value) for value in row])
+
+    def write_rows(self, sheet_name, columns, rows):
+        """Write an already aggregated table (list of rows) into a new sheet"""
+        worksheet = self._create_sheet(sheet_name, columns)
+        for row in rows:
+            worksheet.append([to_excel_value(value) for value in row])
@@ -0,0 +1,393 @@
+import csv
+import math
+import random
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import gspread
+from gspread.utils import a1_range_to_grid_range, fill_gaps
+
+FIXTURE_FORMATS = ('csv', 'parquet')
+QUOTA_WINDOW_SECONDS = 60
+
+
+class _FakeResponse:
+    """Just enough of requests.Response for gspread.exceptions.APIError and Drive calls"""
+    def __init__(self, body, status_code=200, headers=None):
+        self._body = body
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = str(body)
+
+    def json(self):
+        return self._body
+
+
+def _rate_limit_error(retry_after):
+    return gspread.exceptions.APIError(_FakeResponse(
+        {'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED',
+                   'message': "Quota exceeded for quota metric 'Read requests'"}},
+        status_code=429,
+        headers={'Retry-After': str(retry_after)}
+    ))
+
+
+def _trim(rows):
+    """Drop trailing empty cells and rows, as the values API does on read"""
+    trimmed = []
+    for row in rows:
+        row = list(row)
+        while row and row[-1] == '':
+            row.pop()
+        trimmed.append(row)
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, rows=None, row_count=1000, col_count=26):
+        """
+        In-memory worksheet holding cell values as strings
+
+        Parameters:
+        spreadsheet (FakeSpreadsheet): Owning spreadsheet
+        title (str): Sheet title
+        rows (list): Initial values, header row first
+        row_count (int): Grid rows (grown to fit rows)
+        col_count (int): Grid columns (grown to fit rows)
+        """
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.values = [list(row) for row in rows or []]
+        self.row_count = max(row_count, len(self.values))
+        self.col_count = max([col_count] + [len(row) for row in self.values])
+
+    @property
+    def client(self):
+        return self.spreadsheet.client
+
+    def read(self, grid=None):
+        """Values inside a grid range (whole sheet when None), trimmed like the API"""
+        grid = grid or {}
+        rows = self.values[grid.get('startRowIndex', 0):grid.get('endRowIndex')]
+        start_col, end_col = grid.get('startColumnIndex', 0), grid.get('endColumnIndex')
+        return _trim([row[start_col:end_col] for row in rows])
+
+    def write(self, grid, values):
+        """Write a block of values at the top-left corner of a grid range"""
+        start_row, start_col = grid.get('startRowIndex', 0), grid.get('startColumnIndex', 0)
+        for row_offset, row in enumerate(values):
+            row_index = start_row + row_offset
+            while len(self.values) <= row_index:
+                self.values.append([])
+            target = self.values[row_index]
+            for col_offset, value in enumerate(row):
+                col_index = start_col + col_offset
+                target.extend([''] * (col_index + 1 - len(target)))
+                target[col_index] = '' if value is None else str(value)
+        self.row_count = max(self.row_count, len(self.values))
+        self.col_count = max([self.col_count] + [len(row) for row in self.values])
+        self.spreadsheet.touch()
+        return sum(len(row) for row in values)
+
+    def clear(self, grid):
+        """Blank every cell inside a grid range"""
+        for row in self.values[grid.get('startRowIndex', 0):grid.get('endRowIndex')]:
+            end_col = grid.get('endColumnIndex', len(row))
+            for col_index in range(grid.get('startColumnIndex', 0), min(end_col, len(row))):
+                row[col_index] = ''
+        self.spreadsheet.touch()
+
+    def get_all_values(self, **kwargs):
+        values = self.read()
+        self.client.request_started('get_all_values', rows=len(values))
+        return fill_gaps(values)
+
+    def row_values(self, row, **kwargs):
+        self.client.request_started('row_values')
+        values = self.read({'startRowIndex': row - 1, 'endRowIndex': row})
+        return values[0] if values else []
+
+    def update(self, range_name, values=None, **kwargs):
+        self.client.request_started('update')
+        if values is None:
+            range_name, values = 'A1', range_name
+        if values and not isinstance(values[0], list):
+            values = [values]
+        updated = self.write(a1_range_to_grid_range(range_name), values)
+        return {'updatedRange': f"'{self.title}'!{range_name}", 'updatedCells': updated}
+
+    def batch_clear(self, ranges):
+        self.client.request_started('batch_clear')
+        for range_name in ranges:
+            self.clear(a1_range_to_grid_range(range_name))
+        return {'clearedRanges': list(ranges)}
+
+    def resize(self, rows=None, cols=None):
+        self.client.request_started('resize')
+        self.row_count = rows if rows is not None else self.row_count
+        self.col_count = cols if cols is not None else self.col_count
+        del self.values[self.row_count:]
+        self.values = [row[:self.col_count] for row in self.values]
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, spreadsheet_id, sheets=None):
+        """
+        In-memory spreadsheet
+
+        Parameters:
+        client (FakeSheetsClient): Client that accounts for every request
+        spreadsheet_id (str): Spreadsheet key
+        sheets (dict): Sheet title -> rows (header first), in tab order
+        """
+        self.client = client
+        self.id = spreadsheet_id
+        self._worksheets = {}
+        self.version = 0
+        for title, rows in (sheets or {}).items():
+            self._worksheets[title] = FakeWorksheet(self, title, rows)
+
+    @property
+    def modified_time(self):
+        """Drive modifiedTime; moves forward on every write"""
+        return (datetime(2024, 1, 1) + timedelta(seconds=self.version)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+    def touch(self):
+        self.version += 1
+
+    def _lookup(self, title):
+        if title not in self._worksheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def _resolve(self, range_name):
+        """Split "'Title'!A1:B2" into a worksheet and a grid range"""
+        if '!' in range_name:
+            title, a1 = range_name.rsplit('!', 1)
+        elif range_name.startswith("'") or range_name in self._worksheets:
+            title, a1 = range_name, None
+        else:
+            title, a1 = next(iter(self._worksheets)), range_name
+        if title.startswith("'") and title.endswith("'"):
+            title = title[1:-1].replace("''", "'")
+        worksheet = self._worksheets.get(title)
+        if worksheet is None:
+            raise gspread.exceptions.APIError(_FakeResponse(
+                {'error': {'code': 400, 'status': 'INVALID_ARGUMENT',
+                           'message': f"Unable to parse range: {range_name}"}},
+                status_code=400
+            ))
+        return worksheet, a1_range_to_grid_range(a1) if a1 else None
+
+    def worksheet(self, title):
+        self.client.request_started('worksheet')
+        return self._lookup(title)
+
+    def worksheets(self):
+        self.client.request_started('worksheets')
+        return list(self._worksheets.values())
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        self.client.request_started('add_worksheet')
+        if title in self._worksheets:
+            raise gspread.exceptions.APIError(_FakeResponse(
+                {'error': {'code': 400, 'status': 'INVALID_ARGUMENT',
+                           'message': f'A sheet with the name "{title}" already exists.'}},
+                status_code=400
+            ))
+        worksheet = FakeWorksheet(self, title, row_count=rows, col_count=cols)
+        self._worksheets[title] = worksheet
+        self.touch()
+        return worksheet
+
+    def values_get(self, range_name, params=None):
+        try:
+            worksheet, grid = self._resolve(range_name)
+        except gspread.exceptions.APIError:
+            self.client.request_started('values_get')  # Rejected requests still count
+            raise
+        values = worksheet.read(grid)
+        self.client.request_started('values_get', rows=len(values))
+        response = {'range': range_name, 'majorDimension': 'ROWS'}
+        if values:
+            response['values'] = values
+        return response
+
+    def values_batch_get(self, ranges, params=None):
+        value_ranges = []
+        for range_name in ranges:
+            try:
+                worksheet, grid = self._resolve(range_name)
+            except gspread.exceptions.APIError:
+                self.client.request_started('values_batch_get')  # Rejected requests still count
+                raise
+            values = worksheet.read(grid)
+            value_range = {'range': range_name, 'majorDimension': 'ROWS'}
+            if values:
+                value_range['values'] = values
+            value_ranges.append(value_range)
+        self.client.request_started('values_batch_get',
+                                    rows=sum(len(value_range.get('values', [])) for value_range in value_ranges))
+        return {'spreadsheetId': self.id, 'valueRanges': value_ranges}
+
+    def values_batch_update(self, body=None):
+        self.client.request_started('values_batch_update')
+        updated = 0
+        for entry in body['data']:
+            worksheet, grid = self._resolve(entry['range'])
+            updated += worksheet.write(grid or {}, entry['values'])
+        return {'spreadsheetId': self.id, 'totalUpdatedCells': updated}
+
+
+class FakeSheetsClient:
+    def __init__(self, spreadsheets=None, latency=0.0, error_rate=0.0, requests_per_minute=None,
+                 retry_after=1, seed=0, clock=time.monotonic, sleep=time.sleep, latency_per_row=0.0):
+        """
+        In-process stand-in for the gspread client, for offline end-to-end runs
+
+        Implements the calls GoogleSheetsConnection, the write-back helpers and
+        time_pass make, on in-memory sheets. Every request can be delayed and
+        rejected with a 429 RESOURCE_EXHAUSTED error (carrying Retry-After),
+        either at random with a seeded generator or when a server-side quota
+        is exceeded, so retry, rate limiting and concurrency can be measured
+        deterministically. Safe to call from several threads.
+
+        Parameters:
+        spreadsheets (dict): Spreadsheet id -> {sheet title -> rows}
+        latency (float): Seconds every request takes
+        latency_per_row (float): Extra seconds per row a read returns, for transfer time
+        error_rate (float): Share of requests rejected with a 429
+        requests_per_minute (int): Server-side quota; requests beyond it within
+            a minute get a 429 until the window frees up (None for no quota)
+        retry_after (int): Retry-After seconds sent with random 429s
+        seed (int): Seed for the random 429s
+        clock (callable): Monotonic time source for the quota, replaceable in tests
+        sleep (callable): Sleep function used for latency, replaceable in tests
+        """
+        self.spreadsheets = {
+            spreadsheet_id: FakeSpreadsheet(self, spreadsheet_id, sheets)
+            for spreadsheet_id, sheets in (spreadsheets or {}).items()
+        }
+        self.latency = latency
+        self.latency_per_row = latency_per_row
+        self.error_rate = error_rate
+        self.requests_per_minute = requests_per_minute
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._clock = clock
+        self._sleep = sleep
+        self._window = deque()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls = Counter()
+        self.throttled = 0
+        self.total_latency = 0.0
+
+    @classmethod
+    def from_fixtures(cls, directory, **options):
+        """Build a client serving the spreadsheets stored by write_fixtures"""
+        return cls(load_fixtures(directory), **options)
+
+    def request_started(self, name, rows=0):
+        """Account for one API request: apply latency, then raise a 429 if it is rejected"""
+        latency = self.latency + rows * self.latency_per_row
+        with self._lock:
+            self.calls[name] += 1
+            now = self._clock()
+            while self._window and now - self._window[0] >= QUOTA_WINDOW_SECONDS:
+                self._window.popleft()
+
+            retry_after = None
+            if self.requests_per_minute is not None and len(self._window) >= self.requests_per_minute:
+                retry_after = math.ceil(QUOTA_WINDOW_SECONDS - (now - self._window[0]))
+            elif self.error_rate and self._random.random() < self.error_rate:
+                retry_after = self.retry_after
+            else:
+                self._window.append(now)
+            if retry_after is not None:
+                self.throttled += 1
+            self.total_latency += latency
+
+        if latency:
+            self._sleep(latency)
+        if retry_after is not None:
+            raise _rate_limit_error(retry_after)
+
+    def open_by_key(self, key):
+        self.request_started('open_by_key')
+        if key not in self.spreadsheets:
+            raise gspread.exceptions.SpreadsheetNotFound(key)
+        return self.spreadsheets[key]
+
+    def request(self, method, endpoint, params=None, **kwargs):
+        """Drive files.get, the only raw request the connection makes"""
+        self.request_started('request')
+        spreadsheet = self.spreadsheets.get(endpoint.rstrip('/').rsplit('/', 1)[-1])
+        if spreadsheet is None:
+            raise gspread.exceptions.APIError(_FakeResponse(
+                {'error': {'code': 404, 'status': 'NOT_FOUND', 'message': 'File not found'}}, status_code=404
+            ))
+        return _FakeResponse({'modifiedTime': spreadsheet.modified_time})
+
+
+def write_fixtures(directory, spreadsheets, format='csv'):
+    """
+    Store spreadsheets as fixture files: <directory>/<spreadsheet id>/<sheet title>.<format>
+
+    Sheet order is kept by prefixing each file with its tab position.
+    Parquet fixtures hold the header row as column names.
+
+    Parameters:
+    directory (str): Fixture root directory
+    spreadsheets (dict): Spreadsheet id -> {sheet title -> rows}
+    format (str): 'csv' or 'parquet'
+
+    Returns:
+    Path: The fixture root
+    """
+    if format not in FIXTURE_FORMATS:
+        raise ValueError(f"Unknown fixture format '{format}', expected one of {FIXTURE_FORMATS}")
+    directory = Path(directory)
+    for spreadsheet_id, sheets in spreadsheets.items():
+        spreadsheet_dir = directory / spreadsheet_id
+        spreadsheet_dir.mkdir(parents=True, exist_ok=True)
+        for position, (title, rows) in enumerate(sheets.items()):
+            path = spreadsheet_dir / f"{position:04d}_{title}.{format}"
+            if format == 'csv':
+                with open(path, 'w', newline='', encoding='utf-8') as f:
+                    csv.writer(f).writerows(rows)
+            else:
+                rows = fill_gaps(rows)
+                if len(set(rows[0])) != len(rows[0]):
+                    raise ValueError(f"Sheet '{title}' needs unique headers to be stored as Parquet")
+                pd.DataFrame(rows[1:], columns=rows[0]).to_parquet(path, index=False)
+    return directory
+
+
+def load_fixtures(directory):
+    """
+    Load fixtures written by write_fixtures
+
+    Returns:
+    dict: Spreadsheet id -> {sheet title -> rows}
+    """
+    spreadsheets = {}
+    for spreadsheet_dir in sorted(path for path in Path(directory).iterdir() if path.is_dir()):
+        sheets = {}
+        for path in sorted(spreadsheet_dir.iterdir()):
+            title = path.stem.split('_', 1)[1]
+            if path.suffix == '.csv':
+                with open(path, newline='', encoding='utf-8') as f:
+                    sheets[title] = [row for row in csv.reader(f)]
+            elif path.suffix == '.parquet':
+                frame = pd.read_parquet(path)
+                sheets[title] = [list(frame.columns)] + frame.values.tolist()
+        spreadsheets[spreadsheet_dir.name] = sheets
+    return spreadsheets
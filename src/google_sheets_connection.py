@@ -3,28 +3,61 @@ from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from google.oauth2 import service_account
 import gspread
-import time
-from datetime import datetime
-import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+
+from gspread.utils import a1_range_to_grid_range, absolute_range_name, fill_gaps, rowcol_to_a1
+from gspread.urls import DRIVE_FILES_API_V3_URL
+
+from src.rate_limiter import AdaptiveRateLimiter, SHEETS_REQUESTS_PER_MINUTE, DEFAULT_BURST
+from src.http_session import tuned_session, DEFAULT_POOL_SIZE
+from src.sheet_cache import SheetCache
+from src.sheet_writeback import write_dataframe
 
 class GoogleSheetsConnection:
-    def __init__(self, credentials_file):
+    def __init__(self, credentials_file, requests_per_minute=SHEETS_REQUESTS_PER_MINUTE,
+                 burst=DEFAULT_BURST, cache_dir=None, offline=False, client=None, max_retries=5,
+                 pool_size=DEFAULT_POOL_SIZE):
         """
         Initialize Google Sheets connection with enhanced configuration
         
         Parameters:
         credentials_file (str): Path to Google Sheets API credentials file
+        requests_per_minute (int): Sheets API quota shared by all calls on this connection; the
+            limiter starts there, backs off on rate-limit errors and recovers up to it
+        burst (int): Number of requests allowed back-to-back before throttling
+        cache_dir (str): Optional directory for the local cache of fetched sheet values
+        offline (bool): Serve all reads from the cache without connecting to Google
+        client: gspread-compatible client to use instead of connecting with the
+            credentials (e.g. a FakeSheetsClient for offline runs)
+        max_retries (int): Attempts per request when the API reports RESOURCE_EXHAUSTED
+        pool_size (int): Persistent HTTP connections per host; match it to the fetch workers
         """
+        if offline and cache_dir is None:
+            raise ValueError("Offline mode requires a cache_dir")
+        
         self.credentials_file = credentials_file
         self.scope = [
             'https://spreadsheets.google.com/feeds',
             'https://www.googleapis.com/auth/drive'
         ]
-        self.client = self._setup_connection()
-        self.last_request_time = datetime.now()
-        self.min_delay = 2.0  # Increased minimum delay between requests
-        self.max_retries = 5   # Increased maximum retries
-        self.base_wait_time = 5  # Base wait time for exponential backoff
+        self.offline = offline
+        self.pool_size = pool_size
+        self.cache = SheetCache(cache_dir) if cache_dir is not None else None
+        self._modified_times = {}  # Spreadsheet id -> Drive modifiedTime, fetched once per run
+        if offline:
+            self.client = None
+        else:
+            self.client = client if client is not None else self._setup_connection()
+        self.rate_limiter = AdaptiveRateLimiter.from_quota(requests_per_minute, burst)  # Shared by all threads
+        self.max_retries = max_retries
+        self.max_cached_spreadsheets = 8  # Spreadsheet handles kept, least recently used dropped first
+        self._handles = OrderedDict()  # Spreadsheet id -> {'spreadsheet': ..., 'worksheets': title -> Worksheet}
+        self._handles_lock = threading.RLock()
+        self.max_batch_ranges = 100  # Ranges per values:batchGet request
+        self.max_batch_query_chars = 1800  # Keep batchGet URLs well under the request size limit
 
     def _setup_connection(self):
         """Setup connection to Google Sheets"""
@@ -33,63 +66,428 @@ class GoogleSheetsConnection:
                 self.credentials_file,
                 scopes=self.scope
             )
-            client = gspread.authorize(creds)
-            return client
+            # Pooled keep-alive connections and gzip-compressed responses
+            return gspread.Client(auth=creds, session=tuned_session(creds, self.pool_size))
         except Exception as e:
             raise Exception(f"Failed to connect to Google Sheets: {str(e)}")
 
     def _wait_for_rate_limit(self):
-        """Enhanced rate limit handling with random jitter"""
-        now = datetime.now()
-        elapsed = (now - self.last_request_time).total_seconds()
-        if elapsed < self.min_delay:
-            delay = self.min_delay - elapsed + random.uniform(0.5, 1.5)
-            time.sleep(delay)
-        self.last_request_time = datetime.now()
+        """Wait for a token from the shared quota-sized token bucket"""
+        self.rate_limiter.acquire()
+
+    @staticmethod
+    def _is_rate_limited(e):
+        response = getattr(e, 'response', None)
+        return 'RESOURCE_EXHAUSTED' in str(e) or getattr(response, 'status_code', None) == 429
+
+    @staticmethod
+    def _retry_after(e):
+        """Seconds from the error's Retry-After header, or None"""
+        headers = getattr(getattr(e, 'response', None), 'headers', None) or {}
+        try:
+            return max(float(headers.get('Retry-After')), 0.0)
+        except (TypeError, ValueError):
+            return None
 
     def _handle_api_error(self, attempt, e, operation_name="operation"):
-        """Enhanced API error handling with exponential backoff"""
-        if 'RESOURCE_EXHAUSTED' in str(e) and attempt < self.max_retries - 1:
-            wait_time = min(self.base_wait_time * (2 ** attempt) + random.uniform(0.1, 1.0), 60)
-            print(f"Rate limit hit during {operation_name}, waiting {wait_time:.1f} seconds...")
-            time.sleep(wait_time)
+        """Slow the shared limiter down on every rate-limit error and say whether to retry"""
+        if not self._is_rate_limited(e):
+            return False
+        # The last attempt's error still tells the other threads to back off
+        pause = self.rate_limiter.on_throttle(self._retry_after(e))
+        if attempt < self.max_retries - 1:
+            print(f"Rate limit hit during {operation_name}, slowing to "
+                  f"{self.rate_limiter.rate * 60:.0f} requests/min, retrying in {pause:.1f} seconds...")
             return True
+        print(f"Rate limit hit during {operation_name}, slowing to "
+              f"{self.rate_limiter.rate * 60:.0f} requests/min, giving up after {self.max_retries} attempts")
         return False
 
-    def get_worksheet(self, spreadsheet_id, sheet_name):
-        """Get worksheet with enhanced retry logic"""
+    def _call(self, request, operation_name="operation"):
+        """
+        Make one API request through the shared limiter, retrying rate-limit errors
+        
+        Parameters:
+        request (callable): Makes the request and returns its result
+        operation_name (str): Description used in rate-limit messages
+        
+        Returns:
+        The request's result; other API errors, and rate-limit errors after
+        max_retries attempts, are raised
+        """
         for attempt in range(self.max_retries):
+            self._wait_for_rate_limit()
             try:
-                self._wait_for_rate_limit()
-                spreadsheet = self.client.open_by_key(spreadsheet_id)
-                worksheet = spreadsheet.worksheet(sheet_name)
-                return worksheet
+                result = request()
             except gspread.exceptions.APIError as e:
-                if self._handle_api_error(attempt, e, f"getting worksheet {sheet_name}"):
+                if self._handle_api_error(attempt, e, operation_name):
                     continue
-                raise Exception(f"Failed to get worksheet {sheet_name}: {str(e)}")
-            except Exception as e:
-                raise Exception(f"Failed to get worksheet {sheet_name}: {str(e)}")
+                raise
+            self.rate_limiter.on_success()
+            return result
+
+    def _spreadsheet_handle(self, spreadsheet_id):
+        """
+        Cached handle entry for a spreadsheet, opening it on first use
+        
+        Handles are kept in an LRU of max_cached_spreadsheets entries and
+        shared by all threads; the first caller opens the spreadsheet while
+        the others wait, so it is opened once per run.
+        """
+        with self._handles_lock:
+            entry = self._handles.get(spreadsheet_id)
+            if entry is None:
+                spreadsheet = self._call(lambda: self.client.open_by_key(spreadsheet_id), "opening spreadsheet")
+                entry = self._handles[spreadsheet_id] = {'spreadsheet': spreadsheet, 'worksheets': None}
+                while len(self._handles) > self.max_cached_spreadsheets:
+                    self._handles.popitem(last=False)
+            self._handles.move_to_end(spreadsheet_id)
+            return entry
+
+    def _worksheet_handles(self, spreadsheet_id):
+        """Worksheet title -> Worksheet for a spreadsheet, read with one metadata call and cached"""
+        with self._handles_lock:
+            entry = self._spreadsheet_handle(spreadsheet_id)
+            if entry['worksheets'] is None:
+                worksheets = self._call(entry['spreadsheet'].worksheets, "listing worksheets")
+                entry['worksheets'] = {worksheet.title: worksheet for worksheet in worksheets}
+            return entry['worksheets']
+
+    def _invalidate_worksheets(self, spreadsheet_id):
+        """Forget a spreadsheet's worksheet handles so the next lookup re-reads its metadata"""
+        with self._handles_lock:
+            if spreadsheet_id in self._handles:
+                self._handles[spreadsheet_id]['worksheets'] = None
+
+    def clear_handle_cache(self):
+        """Forget all cached spreadsheet and worksheet handles"""
+        with self._handles_lock:
+            self._handles.clear()
+
+    def get_worksheet(self, spreadsheet_id, sheet_name):
+        """
+        Get a worksheet handle from the connection's cache
+        
+        All of a spreadsheet's worksheets are looked up with one metadata call
+        and reused for the rest of the run. A title that is not cached
+        (e.g. a sheet added since) invalidates the spreadsheet's handles and
+        re-reads them once before WorksheetNotFound is reported.
+        """
+        try:
+            worksheets = self._worksheet_handles(spreadsheet_id)
+            if sheet_name not in worksheets:
+                self._invalidate_worksheets(spreadsheet_id)
+                worksheets = self._worksheet_handles(spreadsheet_id)
+            if sheet_name not in worksheets:
+                raise gspread.exceptions.WorksheetNotFound(sheet_name)
+            return worksheets[sheet_name]
+        except Exception as e:
+            raise Exception(f"Failed to get worksheet {sheet_name}: {str(e)}")
 
     def get_all_data(self, worksheet):
         """Get all data with enhanced retry logic"""
-        for attempt in range(self.max_retries):
-            try:
-                self._wait_for_rate_limit()
-                data = worksheet.get_all_values()
+        try:
+            data = self._call(worksheet.get_all_values, "getting data")
+            
+            if not data:
+                raise ValueError(f"No data found in worksheet")
+            if not all(isinstance(row, list) for row in data):
+                raise ValueError(f"Invalid data format in worksheet")
                 
-                if not data:
-                    raise ValueError(f"No data found in worksheet")
-                if not all(isinstance(row, list) for row in data):
-                    raise ValueError(f"Invalid data format in worksheet")
-                    
-                return data
+            return data
+        except Exception as e:
+            raise Exception(f"Failed to get data from worksheet: {str(e)}")
+
+    def _chunk_ranges(self, ranges):
+        """Split ranges into batchGet-sized chunks by count and encoded URL length"""
+        chunks, current, current_chars = [], [], 0
+        for range_name in ranges:
+            range_chars = len('&ranges=') + len(quote(range_name, safe=''))
+            if current and (len(current) >= self.max_batch_ranges or
+                            current_chars + range_chars > self.max_batch_query_chars):
+                chunks.append(current)
+                current, current_chars = [], 0
+            current.append(range_name)
+            current_chars += range_chars
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _open_spreadsheet(self, spreadsheet_id):
+        """Open a spreadsheet with retry logic, reusing the cached handle"""
+        try:
+            return self._spreadsheet_handle(spreadsheet_id)['spreadsheet']
+        except gspread.exceptions.APIError as e:
+            raise Exception(f"Failed to open spreadsheet {spreadsheet_id}: {str(e)}")
+
+    def _values_batch_get(self, spreadsheet, ranges):
+        """Call values:batchGet for one chunk of ranges with retry logic"""
+        response = self._call(lambda: spreadsheet.values_batch_get(ranges), f"batch fetching {len(ranges)} ranges")
+        return response.get('valueRanges', [])
+
+    def _batch_get_sheets(self, spreadsheet_id, sheet_names):
+        """
+        Fetch all values of several sheets with values:batchGet
+        
+        Returns:
+        tuple: (dict of sheet name -> rows, dict of sheet name -> error message)
+        """
+        spreadsheet = self._open_spreadsheet(spreadsheet_id)
+        results, errors = {}, {}
+        pending = list(dict.fromkeys(sheet_names))
+        
+        for chunk in self._chunk_ranges(pending):
+            try:
+                value_ranges = self._values_batch_get(
+                    spreadsheet, [absolute_range_name(name) for name in chunk]
+                )
             except gspread.exceptions.APIError as e:
-                if self._handle_api_error(attempt, e, "getting data"):
-                    continue
-                raise Exception(f"Failed to get data from worksheet: {str(e)}")
+                if 'Unable to parse range' not in str(e):
+                    raise
+                # A requested sheet does not exist: re-read the titles once and retry without it
+                self._invalidate_worksheets(spreadsheet_id)
+                titles = set(self._worksheet_handles(spreadsheet_id))
+                for name in chunk:
+                    if name not in titles:
+                        errors[name] = f"Worksheet {name} not found"
+                chunk = [name for name in chunk if name in titles]
+                value_ranges = self._values_batch_get(
+                    spreadsheet, [absolute_range_name(name) for name in chunk]
+                ) if chunk else []
+            
+            # valueRanges come back in request order
+            for name, value_range in zip(chunk, value_ranges):
+                rows = fill_gaps(value_range.get('values', []))
+                if rows:
+                    results[name] = rows
+                else:
+                    errors[name] = "No data found in worksheet"
+        
+        return results, errors
+
+    def get_many_sheets(self, spreadsheet_id, sheet_names):
+        """
+        Fetch several sheets with a single values:batchGet round-trip
+        
+        The spreadsheet is opened once and every sheet is requested in one
+        batchGet call, chunked only when the request would exceed the range
+        count or URL length limits. Rows are padded like get_all_values.
+        
+        Parameters:
+        spreadsheet_id (str): Google Sheets ID
+        sheet_names (list): Names of sheets to fetch
+        
+        Returns:
+        dict: Sheet name -> rows (list of lists), for every sheet that was found
+        """
+        try:
+            results, errors = self._batch_get_sheets(spreadsheet_id, sheet_names)
+            for sheet_name, error in errors.items():
+                print(f"❌ Failed to fetch {sheet_name}: {error}")
+            return results
+        except Exception as e:
+            raise Exception(f"Failed to batch fetch sheets: {str(e)}")
+
+    def get_modified_time(self, spreadsheet_id):
+        """
+        Get the spreadsheet's Drive modifiedTime (one metadata call per run)
+        
+        Returns:
+        str: RFC 3339 timestamp, or None if it could not be read
+        """
+        if spreadsheet_id not in self._modified_times:
+            try:
+                response = self._call(lambda: self.client.request(
+                    'get',
+                    f"{DRIVE_FILES_API_V3_URL}/{spreadsheet_id}",
+                    params={'fields': 'modifiedTime', 'supportsAllDrives': True}
+                ), "reading modifiedTime")
+                self._modified_times[spreadsheet_id] = response.json().get('modifiedTime')
+            except Exception as e:
+                print(f"⚠️ Could not read modifiedTime, cache will be refreshed: {str(e)}")
+                self._modified_times[spreadsheet_id] = None
+        return self._modified_times[spreadsheet_id]
+
+    def _refresh_modified_time(self, spreadsheet_id):
+        """Read the spreadsheet's Drive modifiedTime again, ignoring the value kept for this run"""
+        self._modified_times.pop(spreadsheet_id, None)
+        return self.get_modified_time(spreadsheet_id)
+
+    @staticmethod
+    def _split_range(range_name):
+        """Split "'Title'!F2:G4" into the sheet title and a grid range"""
+        title, a1 = range_name.rsplit('!', 1)
+        if title.startswith("'") and title.endswith("'"):
+            title = title[1:-1].replace("''", "'")
+        return title, a1_range_to_grid_range(a1)
+
+    def _own_write(self, spreadsheet_id, write, ranges=(), rewritten_sheets=()):
+        """
+        Run a write to the spreadsheet, keeping the sheet cache valid across it
+        
+        The cache is keyed on the spreadsheet's Drive modifiedTime, which every
+        write changes. Sheets cached at the modifiedTime read just before the
+        write are carried over to the one read just after it: cells written
+        through ranges are patched into them, and rewritten_sheets are dropped
+        so they are fetched again. An edit by someone else between the write
+        and the second read would be missed; the window is one API call.
+        
+        Parameters:
+        spreadsheet_id (str): Google Sheets ID written to
+        write (callable): Performs the write and returns its result
+        ranges (list): {'range': ..., 'values': ...} entries the write sends
+        rewritten_sheets (list): Sheets the write replaces in full
+        
+        Returns:
+        Result of write()
+        """
+        if self.cache is None or self.offline:
+            return write()
+        
+        before = self._refresh_modified_time(spreadsheet_id)
+        result = write()
+        after = self._refresh_modified_time(spreadsheet_id)
+        if before is not None and after is not None:
+            updates = {}
+            for entry in ranges:
+                title, grid = self._split_range(entry['range'])
+                updates.setdefault(title, []).append((grid, entry['values']))
+            carried = self.cache.restamp(spreadsheet_id, before, after, updates, rewritten_sheets)
+            print(f"✓ Kept {carried} cached sheets valid across the write")
+        return result
+
+    def write_dataframe(self, spreadsheet_id, worksheet, data_frame, current=None):
+        """
+        Write a DataFrame to a worksheet of spreadsheet_id with sheet_writeback.write_dataframe
+        
+        Goes through _own_write, so the write does not invalidate the other cached sheets.
+        
+        Returns:
+        dict: Write statistics (total_cells, changed_cells, ranges)
+        """
+        return self._own_write(
+            spreadsheet_id, lambda: write_dataframe(worksheet, data_frame, current=current),
+            rewritten_sheets=[worksheet.title]
+        )
+
+    def fetch_sheets(self, spreadsheet_id, sheet_names, max_workers=4, batch=True):
+        """
+        Fetch raw values for several sheets, using the local cache when enabled
+        
+        Cached sheets are reused while the spreadsheet's Drive modifiedTime is
+        unchanged; everything else is downloaded and written to the cache. In
+        offline mode only the cache is read.
+        
+        Parameters:
+        spreadsheet_id (str): Google Sheets ID
+        sheet_names (list): Names of sheets to fetch
+        max_workers (int): Number of fetch threads (1 fetches sequentially)
+        batch (bool): Try a single values:batchGet round-trip first
+        
+        Returns:
+        tuple: (dict of sheet name -> rows, dict of sheet name -> error message)
+        """
+        if self.cache is None:
+            return self._fetch_remote(spreadsheet_id, sheet_names, max_workers, batch)
+        
+        if self.offline:
+            results, errors = {}, {}
+            for sheet_name in sheet_names:
+                rows = self.cache.get(spreadsheet_id, sheet_name)
+                if rows is not None:
+                    results[sheet_name] = rows
+                else:
+                    errors[sheet_name] = "Not available in offline cache"
+                    print(f"❌ {sheet_name} is not cached, cannot load offline")
+            print(f"✓ Loaded {len(results)} sheets from cache (offline)")
+            return results, errors
+        
+        modified_time = self.get_modified_time(spreadsheet_id)
+        results = {}
+        if modified_time is not None:
+            for sheet_name in sheet_names:
+                rows = self.cache.get(spreadsheet_id, sheet_name, modified_time)
+                if rows is not None:
+                    results[sheet_name] = rows
+        
+        to_fetch = [name for name in sheet_names if name not in results]
+        if results:
+            print(f"✓ {len(results)} sheets unchanged since last fetch, using cache")
+        
+        errors = {}
+        if to_fetch:
+            fetched, errors = self._fetch_remote(spreadsheet_id, to_fetch, max_workers, batch)
+            changed = 0
+            for sheet_name, rows in fetched.items():
+                changed += self.cache.put(spreadsheet_id, sheet_name, rows, modified_time)
+            print(f"✓ Cached {len(fetched)} fetched sheets ({changed} with changed content)")
+            results.update(fetched)
+        
+        # Keep the caller's sheet order
+        return {name: results[name] for name in sheet_names if name in results}, errors
+
+    def get_sheet_values(self, spreadsheet_id, sheet_name):
+        """Get all values of one sheet, through the cache when enabled"""
+        results, errors = self.fetch_sheets(spreadsheet_id, [sheet_name], max_workers=1)
+        if sheet_name not in results:
+            raise Exception(f"Failed to get data from {sheet_name}: {errors.get(sheet_name)}")
+        return results[sheet_name]
+
+    def _fetch_remote(self, spreadsheet_id, sheet_names, max_workers=4, batch=True):
+        """
+        Fetch raw values for several sheets, batched or in parallel
+        
+        With batch=True all sheets are fetched through values:batchGet, falling
+        back to per-sheet fetches if the batch request fails. Per-sheet fetches
+        run on a thread pool sharing this connection's token bucket, so
+        concurrency never exceeds the API quota. A failing sheet is reported on
+        its own and does not abort the rest of the batch.
+        
+        Parameters:
+        spreadsheet_id (str): Google Sheets ID
+        sheet_names (list): Names of sheets to fetch
+        max_workers (int): Number of fetch threads (1 fetches sequentially)
+        batch (bool): Try a single values:batchGet round-trip first
+        
+        Returns:
+        tuple: (dict of sheet name -> rows, dict of sheet name -> error message)
+        """
+        if batch:
+            try:
+                results, errors = self._batch_get_sheets(spreadsheet_id, sheet_names)
+                print(f"✓ Fetched {len(results)} sheets in one batch request")
+                for sheet_name, error in errors.items():
+                    print(f"❌ Failed to fetch {sheet_name}: {error}")
+                return results, errors
             except Exception as e:
-                raise Exception(f"Failed to get data from worksheet: {str(e)}")
+                print(f"⚠️ Batch fetch failed, fetching sheets individually: {str(e)}")
+        
+        def fetch(sheet_name):
+            worksheet = self.get_worksheet(spreadsheet_id, sheet_name)
+            return self.get_all_data(worksheet)
+        
+        results, errors = {}, {}
+        if max_workers is None or max_workers <= 1:
+            for sheet_name in sheet_names:
+                try:
+                    results[sheet_name] = fetch(sheet_name)
+                except Exception as e:
+                    errors[sheet_name] = str(e)
+                    print(f"❌ Failed to fetch {sheet_name}: {str(e)}")
+            return results, errors
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch, name): name for name in sheet_names}
+            for future in as_completed(futures):
+                sheet_name = futures[future]
+                try:
+                    results[sheet_name] = future.result()
+                    print(f"✓ Fetched {sheet_name}")
+                except Exception as e:
+                    errors[sheet_name] = str(e)
+                    print(f"❌ Failed to fetch {sheet_name}: {str(e)}")
+        
+        return results, errors
 
     def get_sheet_data(self, spreadsheet_id, sheet_name):
         """Get data from sheet and return as DataFrame with enhanced error handling"""
@@ -112,8 +510,7 @@ class GoogleSheetsConnection:
     def load_keyword_mapping(self, spreadsheet_id, keyword_sheet_name):
         """Load and process keyword mapping with enhanced error handling"""
         try:
-            worksheet = self.get_worksheet(spreadsheet_id, keyword_sheet_name)
-            data = self.get_all_data(worksheet)
+            data = self.get_sheet_values(spreadsheet_id, keyword_sheet_name)
             
             mapping_df = pd.DataFrame(data)
             
@@ -135,45 +532,122 @@ class GoogleSheetsConnection:
             
             print("\nStarting to clear Notes and Subcategory columns...")
             for sheet_name in sheet_names:
-                retry_count = 0
-                while retry_count < self.max_retries:
-                    try:
-                        self._wait_for_rate_limit()
-                        worksheet = self.get_worksheet(spreadsheet_id, sheet_name)
-                        if worksheet:
-                            headers = worksheet.row_values(1)
-                            
-                            # Find columns to clear
-                            notes_idx = headers.index('Notes')
-                            subcat_idx = headers.index('Subcategory')
-                            notes_col = chr(65 + notes_idx)
-                            subcat_col = chr(65 + subcat_idx)
-                            
-                            # Enhanced batch clearing with rate limiting
-                            self._wait_for_rate_limit()
-                            worksheet.batch_clear([
-                                f"{notes_col}2:{notes_col}",
-                                f"{subcat_col}2:{subcat_col}"
-                            ])
-                            
-                            print(f"✓ Successfully cleared {sheet_name}")
-                            break
-                            
-                    except gspread.exceptions.APIError as e:
-                        if self._handle_api_error(retry_count, e, f"clearing {sheet_name}"):
-                            retry_count += 1
-                            continue
-                        print(f"❌ Error processing {sheet_name}: {str(e)}")
-                        break
+                # Every request retries on its own; pacing comes from the shared limiter
+                try:
+                    worksheet = self.get_worksheet(spreadsheet_id, sheet_name)
+                    headers = self._call(lambda: worksheet.row_values(1), f"reading headers of {sheet_name}")
                     
-                    except Exception as e:
-                        print(f"❌ Error processing {sheet_name}: {str(e)}")
-                        break
-                
-                # Add delay between processing sheets
-                time.sleep(random.uniform(1.0, 2.0))
+                    # Find columns to clear
+                    notes_col = chr(65 + headers.index('Notes'))
+                    subcat_col = chr(65 + headers.index('Subcategory'))
+                    
+                    self._call(lambda: worksheet.batch_clear([
+                        f"{notes_col}2:{notes_col}",
+                        f"{subcat_col}2:{subcat_col}"
+                    ]), f"clearing {sheet_name}")
+                    
+                    print(f"✓ Successfully cleared {sheet_name}")
+                except Exception as e:
+                    print(f"❌ Error processing {sheet_name}: {str(e)}")
             
             print("\n✅ Finished processing all sheets")
             
         except Exception as e:
-            raise Exception(f"Failed to clear categorization columns: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to clear categorization columns: {str(e)}")
+
+    def _values_batch_update(self, spreadsheet, data):
+        """Call values:batchUpdate for a list of ranges with retry logic"""
+        return self._call(lambda: spreadsheet.values_batch_update(body={'valueInputOption': 'RAW', 'data': data}),
+                          f"batch updating {len(data)} ranges")
+
+    @staticmethod
+    def _categorization_ranges(sheet_name, layout, rows):
+        """
+        Build the Notes/Subcategory ranges that rewrite one sheet's categorization
+        
+        Parameters:
+        sheet_name (str): Statement sheet name
+        layout (dict): Sheet header row and row count, as recorded by the processor
+        rows (pd.DataFrame): Processed rows from this sheet with Source_Row, Notes and Subcategory
+        
+        Returns:
+        list: {'range': ..., 'values': ...} entries covering rows 2..last row
+        """
+        headers = layout['headers']
+        notes_col = headers.index('Notes') if 'Notes' in headers else 5
+        subcat_col = headers.index('Subcategory') if 'Subcategory' in headers else 6
+        row_count = layout['rows'] - 1
+        if row_count < 1:
+            return []
+        
+        # Every data row is written, so rows without a result are cleared
+        notes = [''] * row_count
+        subcategories = [''] * row_count
+        for source_row, note, subcategory in zip(rows['Source_Row'], rows['Notes'], rows['Subcategory']):
+            position = int(source_row) - 2
+            if 0 <= position < row_count:
+                notes[position] = '' if pd.isna(note) or note == 'nan' else str(note)
+                subcategories[position] = '' if pd.isna(subcategory) or subcategory == 'nan' else str(subcategory)
+        
+        last_row = row_count + 1
+        if subcat_col == notes_col + 1:
+            return [{
+                'range': absolute_range_name(
+                    sheet_name, f"{rowcol_to_a1(2, notes_col + 1)}:{rowcol_to_a1(last_row, subcat_col + 1)}"
+                ),
+                'values': [[note, subcategory] for note, subcategory in zip(notes, subcategories)]
+            }]
+        return [
+            {
+                'range': absolute_range_name(
+                    sheet_name, f"{rowcol_to_a1(2, col + 1)}:{rowcol_to_a1(last_row, col + 1)}"
+                ),
+                'values': [[value] for value in values]
+            }
+            for col, values in ((notes_col, notes), (subcat_col, subcategories))
+        ]
+
+    def write_categorization_back(self, spreadsheet_id, data, sheet_layouts):
+        """
+        Write Notes and Subcategory back into the source statement sheets
+        
+        Each processed row is mapped to its origin through Source_Sheet and
+        Source_Row. The two columns of every sheet are rewritten in full, so rows
+        without a result (removed or duplicate rows) are cleared, and all sheets
+        go out in one values:batchUpdate. This replaces clear_categorization_columns.
+        
+        Parameters:
+        spreadsheet_id (str): Google Sheets ID of the statement sheets
+        data (pd.DataFrame): Categorized transactions with Source_Sheet and Source_Row
+        sheet_layouts (dict): Sheet name -> header row and row count (processor.sheet_layouts)
+        
+        Returns:
+        dict: Sheet name -> number of categorized rows written
+        """
+        try:
+            missing_columns = [col for col in ['Source_Sheet', 'Source_Row', 'Notes', 'Subcategory']
+                               if col not in data.columns]
+            if missing_columns:
+                raise ValueError(f"Missing required columns: {missing_columns}")
+            
+            rows_by_sheet = dict(tuple(data.groupby('Source_Sheet', sort=False, observed=True)))
+            empty_rows = data.iloc[0:0]
+            
+            ranges, written = [], {}
+            for sheet_name, layout in sheet_layouts.items():
+                rows = rows_by_sheet.get(sheet_name, empty_rows)
+                ranges.extend(self._categorization_ranges(sheet_name, layout, rows))
+                written[sheet_name] = len(rows)
+            
+            if not ranges:
+                print("No categorization to write back")
+                return written
+            
+            spreadsheet = self._open_spreadsheet(spreadsheet_id)
+            self._own_write(spreadsheet_id, lambda: self._values_batch_update(spreadsheet, ranges), ranges=ranges)
+            print(f"✓ Wrote categorization for {sum(written.values())} rows "
+                  f"across {len(written)} sheets in one batch update")
+            return written
+        
+        except Exception as e:
+            raise Exception(f"Failed to write categorization back: {str(e)}")
@@ -0,0 +1,284 @@
+import gzip
+import json
+import pickle
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from src.keyword_matcher import KeywordMatcher
+from src.schema import apply_compact_schema
+from src.sheet_cache import SheetCache
+
+# Bump when the per-sheet processing output changes shape, so old results are rebuilt
+STORE_VERSION = 6
+
+
+class ProcessedSheetStore:
+    def __init__(self, store_dir):
+        """
+        Initialize the local store of per-sheet processing results
+
+        Each entry holds one sheet's processed and categorized rows, keyed by
+        spreadsheet id + sheet name, together with the hash of the raw sheet
+        values and the hash of the configuration it was processed with.
+
+        Parameters:
+        store_dir (str): Directory holding the store files
+        """
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.store_dir / 'index.json'
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if not self.index_file.exists():
+            return {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable processed sheet index: {str(e)}")
+            return {}
+
+    def _save_index(self):
+        temp_file = self.index_file.with_suffix('.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+        temp_file.replace(self.index_file)
+
+    @staticmethod
+    def _key(spreadsheet_id, sheet_name):
+        return f"{spreadsheet_id}:{sheet_name}"
+
+    def _data_file(self, key):
+        return self.store_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pkl.gz"
+
+    def get(self, spreadsheet_id, sheet_name, raw_hash, config_hash):
+        """
+        Read a sheet's stored result
+
+        Returns:
+        dict: Stored result, or None if missing or built from different input
+        """
+        key = self._key(spreadsheet_id, sheet_name)
+        entry = self.index.get(key)
+        if entry is None or entry.get('raw_hash') != raw_hash or entry.get('config_hash') != config_hash:
+            return None
+
+        try:
+            with gzip.open(self._data_file(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, spreadsheet_id, sheet_name, raw_hash, config_hash, result):
+        """Store a sheet's result; the index is saved by flush()"""
+        key = self._key(spreadsheet_id, sheet_name)
+        with gzip.open(self._data_file(key), 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.index[key] = {
+            'spreadsheet_id': spreadsheet_id,
+            'sheet_name': sheet_name,
+            'raw_hash': raw_hash,
+            'config_hash': config_hash,
+            'rows': len(result['processed']),
+            'processed_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def flush(self):
+        self._save_index()
+
+
+def process_and_categorize(processor, categorizer, rows, sheet_name, matcher):
+    """
+    Process and categorize one sheet's raw values
+
+    Parameters:
+    processor (BankStatementProcessor): Processor whose removal rules and date parsing are used
+    categorizer (Categorisation): Categorizer whose categorize_frame is used
+    rows (list): Raw sheet values, header row first
+    sheet_name (str): Name of the sheet
+    matcher (KeywordMatcher): Matcher built from the keyword mapping
+
+    Returns:
+    dict: Processed and removed rows, date format, Notes/Subcategory and issues of the sheet
+    """
+    processed, removed = processor.process_sheet_with_removed(rows, sheet_name)
+    processed = processed.reset_index(drop=True)
+    categorized, issues = categorizer.categorize_frame(processed, matcher)
+    return {
+        'processed': processed,
+        'removed': removed,
+        'date_format': processor.date_formats.get(sheet_name),
+        'notes': categorized['Notes'],
+        'subcategories': categorized['Subcategory'],
+        'issues': issues
+    }
+
+
+def merge_sheet_results(processor, categorizer, results):
+    """
+    Combine per-sheet results exactly as a full run would
+
+    Sets processor.processed_data, processor.removed_rows, categorizer.data and
+    categorizer.categorization_issues.
+
+    Parameters:
+    processor (BankStatementProcessor): Processor to combine the sheets into
+    categorizer (Categorisation): Categorizer to receive the combined categorization
+    results (list): Results of process_and_categorize, in sheet order
+
+    Returns:
+    pd.DataFrame: Categorized transactions
+    """
+    processor.removed_rows = None
+    for result in results:
+        processor.add_removed_rows(result['removed'])
+
+    processed = processor.combine_sheets([result['processed'] for result in results])
+
+    # Positions after the ignore_index concat line up with processed_data's index
+    notes = pd.concat([result['notes'] for result in results], ignore_index=True)
+    subcategories = pd.concat([result['subcategories'] for result in results], ignore_index=True)
+    data = processed.copy()
+    data['Notes'] = notes.loc[data.index]
+    data['Subcategory'] = subcategories.loc[data.index]
+    data = apply_compact_schema(data)
+    categorizer.data = data
+
+    # Issues are reported against the combined row index, in processed order
+    issues_by_index = {}
+    offset = 0
+    for result in results:
+        for issue in result['issues']:
+            issue = dict(issue)
+            issue['Row'] += offset
+            issues_by_index[issue['Row'] - 2] = issue
+        offset += len(result['processed'])
+    categorizer.categorization_issues = [
+        issues_by_index[index] for index in data.index if index in issues_by_index
+    ]
+
+    return data
+
+
+class IncrementalProcessor:
+    def __init__(self, processor, categorizer, store_dir):
+        """
+        Initialize the incremental statement pipeline
+
+        Only sheets whose raw values changed since the last run are processed
+        and categorized again; every other sheet is loaded from the store.
+        A change to the keyword mapping or removal rules rebuilds every sheet.
+
+        Parameters:
+        processor (BankStatementProcessor): Processor whose processed_data is rebuilt
+        categorizer (Categorisation): Categorizer whose data and issues are rebuilt
+        store_dir (str): Directory of the ProcessedSheetStore
+        """
+        self.processor = processor
+        self.categorizer = categorizer
+        self.store = ProcessedSheetStore(store_dir)
+        self.reprocessed_sheets = []
+        self.reused_sheets = []
+
+    def _config_hash(self, keyword_mappings):
+        """Hash of everything besides the raw values that affects a sheet's result"""
+        config = {
+            'version': STORE_VERSION,
+            'keywords': keyword_mappings[['Keyword', 'Subcategory']].values.tolist(),
+            'removal_rules': {reason: rule.pattern for reason, rule in self.processor.removal_rules.rules.items()}
+        }
+        return SheetCache.hash_rows(config)
+
+    @staticmethod
+    def _input_hash(rows):
+        """
+        Hash of a sheet's input values, leaving out Notes and Subcategory
+        
+        Those two columns are rewritten by every run's write-back and are not
+        read by processing, so a new categorization must not make the sheet
+        look changed.
+        """
+        headers = rows[0] if rows else []
+        output_columns = {
+            headers.index(name) if name in headers else default
+            for name, default in (('Notes', 5), ('Subcategory', 6))
+        }
+        return SheetCache.hash_rows([
+            [value for col, value in enumerate(row) if col not in output_columns] for row in rows
+        ])
+
+    def run(self, spreadsheet_id, sheets_file, keyword_sheet_name, max_workers=4, batch=True):
+        """
+        Rebuild processed and categorized data, re-processing only changed sheets
+
+        Parameters:
+        spreadsheet_id (str): Google Sheets ID
+        sheets_file (str): Text file with one sheet name per line
+        keyword_sheet_name (str): Name of keyword mapping sheet
+        max_workers (int): Number of concurrent fetch threads (1 fetches sequentially)
+        batch (bool): Fetch all sheets with one values:batchGet request when possible
+
+        Returns:
+        pd.DataFrame: Categorized transactions (also set on categorizer.data)
+        """
+        try:
+            sheets_to_process = self.processor.load_sheets_list(sheets_file)
+            print(f"Found {len(sheets_to_process)} sheets to process")
+
+            metrics = self.processor.metrics
+            with metrics.stage('fetch') as stage:
+                sheet_data, self.processor.failed_sheets = self.processor.gs_connection.fetch_sheets(
+                    spreadsheet_id, sheets_to_process, max_workers=max_workers, batch=batch
+                )
+                stage['rows'] = sum(max(len(rows) - 1, 0) for rows in sheet_data.values())
+
+            keyword_mappings = self.categorizer._get_keyword_mappings(spreadsheet_id, keyword_sheet_name)
+            config_hash = self._config_hash(keyword_mappings)
+            matcher = None
+
+            self.reprocessed_sheets, self.reused_sheets = [], []
+            results = []
+            for sheet_name in sheets_to_process:
+                if sheet_name not in sheet_data:
+                    continue
+                rows = sheet_data[sheet_name]
+                raw_hash = self._input_hash(rows)
+                self.processor.record_sheet_layout(sheet_name, rows)
+
+                result = self.store.get(spreadsheet_id, sheet_name, raw_hash, config_hash)
+                if result is None:
+                    print(f"\nProcessing sheet: {sheet_name}")
+                    if matcher is None:
+                        matcher = KeywordMatcher.from_mapping(keyword_mappings)
+                    with metrics.stage('process_sheet') as stage:
+                        result = process_and_categorize(self.processor, self.categorizer, rows, sheet_name, matcher)
+                        stage['rows'] = len(rows) - 1
+                    self.store.put(spreadsheet_id, sheet_name, raw_hash, config_hash, result)
+                    self.reprocessed_sheets.append(sheet_name)
+                    print(f"✓ Processed {len(result['processed'])} transactions from {sheet_name}")
+                else:
+                    self.processor.date_formats[sheet_name] = result['date_format']
+                    self.reused_sheets.append(sheet_name)
+                results.append(result)
+            self.store.flush()
+
+            print(f"\n♻️ Reused {len(self.reused_sheets)} unchanged sheet(s), "
+                  f"re-processed {len(self.reprocessed_sheets)}")
+            if self.processor.failed_sheets:
+                print(f"\n⚠️ {len(self.processor.failed_sheets)} sheet(s) could not be fetched:")
+                for sheet_name, error in self.processor.failed_sheets.items():
+                    print(f"- {sheet_name}: {error}")
+            if not results:
+                raise Exception("No sheets could be fetched")
+
+            with metrics.stage('combine_sheets') as stage:
+                stage['rows'] = sum(len(result['processed']) for result in results)
+                return merge_sheet_results(self.processor, self.categorizer, results)
+
+        except Exception as e:
+            raise Exception(f"Failed to process bank statements incrementally: {str(e)}")
@@ -0,0 +1,114 @@
+from collections import deque
+
+import pandas as pd
+
+
+class KeywordMatcher:
+    def __init__(self, keywords, labels=None):
+        """
+        Build an Aho-Corasick automaton over a list of keywords.
+
+        The automaton is built once and then scans each transaction in a
+        single pass, so the cost per transaction no longer grows with the
+        number of keywords in the mapping sheet.
+
+        Args:
+            keywords (list): Keywords to search for (matched case-insensitively)
+            labels (list): Optional label per keyword, e.g. its Subcategory
+        """
+        self.keywords = [str(keyword) for keyword in keywords]
+        self.labels = list(labels) if labels is not None else list(self.keywords)
+
+        if len(self.labels) != len(self.keywords):
+            raise ValueError("Number of labels must match number of keywords")
+
+        # Empty keywords are a substring of every transaction
+        self._always = [i for i, keyword in enumerate(self.keywords) if keyword == '']
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._build()
+
+    @classmethod
+    def from_mapping(cls, mappings_df, keyword_column='Keyword', label_column='Subcategory'):
+        """
+        Build a matcher from a keyword mapping DataFrame.
+
+        Args:
+            mappings_df (pd.DataFrame): Keyword mapping with keyword and label columns
+            keyword_column (str): Name of the keyword column
+            label_column (str): Name of the label column
+
+        Returns:
+            KeywordMatcher: Matcher with one pattern per mapping row, in row order
+        """
+        return cls(mappings_df[keyword_column].tolist(), mappings_df[label_column].tolist())
+
+    def _build(self):
+        """Build the trie, failure links and merged output lists"""
+        for pattern_id, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword.upper():
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state].append(pattern_id)
+
+        # Breadth-first pass to set failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text):
+        """
+        Find every keyword contained in a piece of text.
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            list: Indices of matched keywords, in keyword order, each listed once
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set(self._always)
+        state = 0
+
+        for char in str(text).upper():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+
+        return sorted(found)
+
+    def match_series(self, series):
+        """
+        Match every value of a Series, scanning each distinct value once.
+
+        Args:
+            series (pd.Series): Values to scan (e.g. the Transaction column)
+
+        Returns:
+            pd.Series: List of matched keyword indices per row, same index as input
+        """
+        cache = {text: self.find(text) for text in pd.unique(series.astype(str))}
+        return series.astype(str).map(cache)
+
+    def __len__(self):
+        return len(self.keywords)
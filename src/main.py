@@ -7,6 +7,7 @@ from google_sheets_connection import GoogleSheetsConnection
 from bank_statement_processor import BankStatementProcessor
 from categorisation import Categorisation
 from deposit_categorizer import DepositCategorizer
+from stage_metrics import StageMetrics
 from utils.error_handler import handle_error
 
 def main():
@@ -21,8 +22,10 @@ def main():
         project_root = Path(__file__).parent.parent
         credentials_file = project_root / 'creds' / 'credentials.json'
         sheets_list_file = project_root / 'Text_files' / 'Column_uniformity_sheets_to_update.txt'
+        removal_rules_file = project_root / 'Text_files' / 'removal_patterns.json'
         output_dir = project_root / 'output' / f'run_{timestamp}'
         output_dir.mkdir(parents=True, exist_ok=True)
+        metrics = StageMetrics()
         
         print("\n🚀 Starting bank statement processing...")
         print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -31,42 +34,45 @@ def main():
         print("\n1️⃣ Initializing Google Sheets connection...")
         gs_connection = GoogleSheetsConnection(str(credentials_file))
         
-        # 2. Clear existing categorization
-        print("\n2️⃣ Clearing existing categorization...")
-        gs_connection.clear_categorization_columns(SPREADSHEET_ID, str(sheets_list_file))
-        
-        # 3. Process bank statements
-        print("\n3️⃣ Processing bank statements...")
-        processor = BankStatementProcessor(gs_connection)
+        # 2. Process bank statements
+        print("\n2️⃣ Processing bank statements...")
+        processor = BankStatementProcessor(gs_connection, str(removal_rules_file), metrics=metrics)
         processor.process_all_statements(SPREADSHEET_ID, str(sheets_list_file))
         
-        # 4. Apply categorization
-        print("\n4️⃣ Applying transaction categorization...")
+        # 3. Apply categorization
+        print("\n3️⃣ Applying transaction categorization...")
         categorizer = Categorisation(processor)
-        categorized_data = categorizer.apply_categorization(SPREADSHEET_ID, "Keyword Mapping")
+        with metrics.stage('apply_categorization') as stage:
+            categorized_data = categorizer.apply_categorization(SPREADSHEET_ID, "Keyword Mapping")
+            stage['rows'] = len(categorized_data)
         
-        # 5. Handle deposits
-        print("\n5️⃣ Processing deposits...")
-        deposit_handler = DepositCategorizer(processor)
-        deposit_handler.categorize_deposits()
+        # 4. Handle deposits
+        print("\n4️⃣ Processing deposits...")
+        with metrics.stage('categorize_deposits') as stage:
+            deposit_handler = DepositCategorizer(processor)
+            stage['rows'] = len(deposit_handler.categorize_deposits())
         
-        # 6. Export results
-        print("\n6️⃣ Exporting results...")
+        # 5. Export results
+        print("\n5️⃣ Exporting results...")
         
         # Main processed data
-        processor.export_to_excel(
-            output_dir / 'processed_statements.xlsx'
-        )
+        with metrics.stage('export_processed_xlsx') as stage:
+            processor.export_to_excel(
+                output_dir / 'processed_statements.xlsx'
+            )
+            stage['rows'] = len(processor.processed_data)
         
         # Removed rows analysis
-        processor.export_removed_rows(
-            output_dir / 'removed_rows_analysis.xlsx'
-        )
+        with metrics.stage('export_removed_xlsx'):
+            processor.export_removed_rows(
+                output_dir / 'removed_rows_analysis.xlsx'
+            )
         
         # Deposit analysis
-        deposit_handler.export_deposit_analysis(
-            output_dir / 'deposit_analysis.xlsx'
-        )
+        with metrics.stage('export_deposits_xlsx'):
+            deposit_handler.export_deposit_analysis(
+                output_dir / 'deposit_analysis.xlsx'
+            )
         
         # Processing summary
         _export_processing_summary(
@@ -76,6 +82,19 @@ def main():
             timestamp
         )
         
+        # 6. Write categorization back to the statement sheets in one batch
+        print("\n6️⃣ Writing categorization back to statement sheets...")
+        with metrics.stage('write_categorization_back') as stage:
+            gs_connection.write_categorization_back(SPREADSHEET_ID, categorized_data, processor.sheet_layouts)
+            stage['rows'] = len(categorized_data)
+        
+        limiter = gs_connection.rate_limiter.metrics()
+        metrics.add('rate_limiter', limiter)
+        print(f"\n🚦 Sheets API: {limiter['requests']} requests, {limiter['throttled']} rate limited, "
+              f"{limiter['total_wait_seconds']:.1f}s waiting, ending at {limiter['requests_per_minute']:.0f}/min")
+        metrics.print_summary()
+        metrics.write(output_dir)
+        
         print(f"\n✅ Processing complete! Results saved in: {output_dir}")
         
     except Exception as e:
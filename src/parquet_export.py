@@ -0,0 +1,91 @@
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from src.schema import is_money_column, parse_pounds, to_pounds
+
+CATEGORICAL_COLUMNS = ['Subcategory']
+PARTITION_CHOICES = ('Source_Sheet', 'month')
+MONTH_COLUMN = 'Month'
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise Exception("Parquet export requires pyarrow (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+
+def to_parquet_frame(frame):
+    """
+    Give a frame the Parquet schema used for all exports
+
+    Date-like columns become datetime64, amount columns float64 pounds
+    (integer columns hold pence, text is parsed like parse_pence), Subcategory categorical, and remaining text
+    columns strings. Other columns keep their dtype.
+
+    Args:
+        frame (pd.DataFrame): Frame to convert; it is not modified
+
+    Returns:
+        pd.DataFrame: Converted frame
+    """
+    converted = {}
+    for column in frame.columns:
+        values = frame[column]
+        if column == 'Date' or str(column).endswith('_Date'):
+            values = pd.to_datetime(values, errors='coerce')
+        elif is_money_column(column):
+            if pd.api.types.is_integer_dtype(values):
+                values = to_pounds(values).astype('float64')
+            else:
+                # Float pounds on removed rows, or raw sheet text such as '£1,000.00'
+                values = parse_pounds(values)
+        elif column in CATEGORICAL_COLUMNS:
+            values = values.astype('category')
+        elif values.dtype == object:
+            values = values.astype('string')
+        converted[column] = values
+    return pd.DataFrame(converted, index=frame.index)
+
+
+def write_parquet(frame, path, partition_by=None):
+    """
+    Write a frame as Parquet, replacing any previous output at path
+
+    Args:
+        frame (pd.DataFrame): Rows to write
+        path (str): Target file, or dataset directory when partitioned
+        partition_by (str): None for a single file, 'Source_Sheet' or 'month'
+            for a Hive-partitioned dataset directory
+
+    Returns:
+        Path: The file or directory written
+    """
+    pa, pq = _require_pyarrow()
+    if partition_by is not None and partition_by not in PARTITION_CHOICES:
+        raise ValueError(f"Unknown partitioning '{partition_by}', expected one of {PARTITION_CHOICES}")
+
+    path = Path(path)
+    frame = to_parquet_frame(frame)
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+    if partition_by is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        pq.write_table(table, path)
+        return path
+
+    partition_column = partition_by
+    if partition_by == 'month':
+        partition_column = MONTH_COLUMN
+        frame[MONTH_COLUMN] = frame['Date'].dt.strftime('%Y-%m')
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    pq.write_to_dataset(table, root_path=str(path), partition_cols=[partition_column])
+    return path
@@ -0,0 +1,163 @@
+import threading
+import time
+
+# Google Sheets API quota: 60 requests per minute per user per project
+SHEETS_REQUESTS_PER_MINUTE = 60
+DEFAULT_BURST = 10
+
+
+class TokenBucket:
+    def __init__(self, rate=SHEETS_REQUESTS_PER_MINUTE / 60.0, capacity=DEFAULT_BURST,
+                 clock=time.monotonic, sleep=time.sleep):
+        """
+        Initialize a thread-safe token bucket limiter
+
+        Parameters:
+        rate (float): Tokens added per second (sustained requests per second)
+        capacity (int): Maximum tokens held, i.e. the largest allowed burst
+        clock (callable): Monotonic time source, replaceable in tests
+        sleep (callable): Sleep function, replaceable in tests
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._last_refill = clock()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.total_requests = 0
+        self.total_wait_time = 0.0
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens from the bucket, sleeping until enough are available
+
+        Returns:
+        float: Seconds spent waiting
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= tokens
+            # A negative balance reserves future tokens, so concurrent callers queue fairly
+            wait_time = max(0.0, -self._tokens / self.rate)
+            self.total_requests += 1
+            self.total_wait_time += wait_time
+
+        if wait_time > 0:
+            self._sleep(wait_time)
+        return wait_time
+
+    @classmethod
+    def from_quota(cls, requests_per_minute=SHEETS_REQUESTS_PER_MINUTE, burst=DEFAULT_BURST):
+        """Build a limiter from a per-minute quota"""
+        return cls(rate=requests_per_minute / 60.0, capacity=burst)
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    def __init__(self, rate=SHEETS_REQUESTS_PER_MINUTE / 60.0, capacity=DEFAULT_BURST, min_rate=None,
+                 max_rate=None, increase=None, decrease=0.5, clock=time.monotonic, sleep=time.sleep):
+        """
+        Initialize a token bucket whose rate adapts to the server's throttling (AIMD)
+
+        Every successful request raises the rate by a fixed step up to max_rate;
+        every rate-limit error multiplies it by `decrease` and pauses all
+        callers, for the server's Retry-After when it sends one. Repeated
+        throttling therefore spaces requests out exponentially, and the rate
+        climbs back once requests succeed again.
+
+        Parameters:
+        rate (float): Starting requests per second
+        capacity (int): Maximum tokens held, i.e. the largest allowed burst
+        min_rate (float): Lowest rate backed off to (default max_rate / 60)
+        max_rate (float): Highest rate sped up to (default the starting rate)
+        increase (float): Requests per second added per success (default max_rate / 20)
+        decrease (float): Factor applied to the rate on every rate-limit error
+        clock (callable): Monotonic time source, replaceable in tests
+        sleep (callable): Sleep function, replaceable in tests
+        """
+        super().__init__(rate, capacity, clock, sleep)
+        if not 0 < decrease < 1:
+            raise ValueError("Decrease must be between 0 and 1")
+
+        self.max_rate = float(max_rate) if max_rate is not None else self.rate
+        self.min_rate = float(min_rate) if min_rate is not None else self.max_rate / 60.0
+        self.increase = float(increase) if increase is not None else self.max_rate / 20.0
+        self.decrease = decrease
+        self._paused_until = clock()
+
+        # Metrics
+        self.total_successes = 0
+        self.throttle_count = 0
+        self.total_pause_time = 0.0
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens from the bucket, sleeping until enough are available and any pause is over
+
+        Returns:
+        float: Seconds spent waiting
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= tokens
+            wait_time = max(0.0, -self._tokens / self.rate, self._paused_until - now)
+            self.total_requests += 1
+            self.total_wait_time += wait_time
+
+        if wait_time > 0:
+            self._sleep(wait_time)
+        return wait_time
+
+    def on_success(self):
+        """Additive increase after a request went through"""
+        with self._lock:
+            self.total_successes += 1
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after=None):
+        """
+        Multiplicative decrease after a rate-limit error
+
+        Callers are paused for retry_after seconds when the server sent it,
+        otherwise for one request interval at the reduced rate, and the burst
+        allowance is dropped so they do not all retry at once.
+
+        Returns:
+        float: Seconds until requests resume
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.throttle_count += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self.total_pause_time += pause
+            self._paused_until = max(self._paused_until, now + pause)
+            return pause
+
+    def metrics(self):
+        """Current limiter state for run reports"""
+        with self._lock:
+            return {
+                'requests_per_minute': self.rate * 60,
+                'requests': self.total_requests,
+                'throttled': self.throttle_count,
+                'total_wait_seconds': self.total_wait_time,
+                'total_pause_seconds': self.total_pause_time
+            }
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+from src.schema import MONEY_COLUMNS, parse_pence, parse_pounds
+
+BREAK_COLUMNS = [
+    'Break_Type', 'Source_Sheet', 'Source_Row', 'Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)',
+    'Balance (£)', 'Expected Balance (£)', 'Difference (£)', 'Previous_Sheet'
+]
+MISSING_ROWS = 'Missing Rows'
+DUPLICATED_ROW = 'Duplicated Row'
+WRONG_SIGN = 'Wrong Sign'
+SHEET_GAP = 'Sheet Gap'
+
+
+def _statement_order(data):
+    """
+    Rows in the order the bank booked them: sheets by first date, rows by Source_Row
+
+    Statements listed newest first (first row dated after the last) are
+    read bottom-up.
+    """
+    rows = data.sort_values('Source_Row', kind='stable')
+    dates = rows.groupby('Source_Sheet', observed=True, sort=False)['Date']
+    newest_first = (dates.transform('first') > dates.transform('last')).to_numpy()
+    source_rows = rows['Source_Row'].to_numpy()
+    return rows.assign(
+        _sheet_start=dates.transform('min'),
+        _row_order=np.where(newest_first, -source_rows, source_rows)
+    ).sort_values(['_sheet_start', 'Source_Sheet', '_row_order'], kind='stable')
+
+
+def _booked_removed_rows(data, removed):
+    """
+    Removed rows that moved the balance, e.g. direct debits dropped by a removal rule
+
+    Rows need an amount and a balance and must belong to a sheet in data.
+    Amounts are parsed into pence; dates are left out, as rows are placed by
+    Source_Row and only the kept rows decide the sheet order.
+    """
+    if removed is None or removed.empty:
+        return None
+    removed = removed[removed['Source_Sheet'].isin(data['Source_Sheet'].unique())]
+    amounts = removed[['Paid In (£)', 'Withdrawn (£)']].apply(parse_pounds)
+    has_amount = amounts.fillna(0).ne(0).any(axis=1) & parse_pounds(removed['Balance (£)']).notna()
+    if not has_amount.any():
+        return None
+    booked = removed.loc[has_amount, ['Transaction', 'Source_Sheet', 'Source_Row']].copy()
+    booked['Date'] = pd.NaT
+    for column in MONEY_COLUMNS:
+        booked[column] = parse_pence(removed.loc[has_amount, column])
+    return booked
+
+
+def reconcile_balances(data, removed=None):
+    """
+    Check the reported Balance (£) against the running total of the amounts
+
+    Within each Source_Sheet the expected balance is the sheet's opening
+    balance plus the cumulative sum of Paid In - Withdrawn. Wherever the
+    difference to the reported balance changes, the row is a break:
+
+    - Wrong Sign: the balance moved by the amount, in the other direction
+    - Duplicated Row: the balance did not move, the row repeats a booked one
+    - Missing Rows: the balance moved by an amount no row explains
+    - Sheet Gap: a sheet does not open where the previous sheet closed
+
+    Removed rows that carry an amount (a direct debit dropped by a removal
+    rule, a duplicate from an overlapping statement) still moved the balance
+    on the statement, so they are booked in their sheet at their Source_Row.
+
+    Apart from putting rows in statement order, this is a handful of NumPy
+    passes over integer pence, so it runs on every combine.
+
+    Args:
+        data (pd.DataFrame): processed_data (amounts in pence, with Source_Sheet and Source_Row)
+        removed (pd.DataFrame): removed_rows, optional (amounts in pounds or sheet text)
+
+    Returns:
+        pd.DataFrame: One row per break with BREAK_COLUMNS, amounts in pence
+    """
+    if data is None or data.empty:
+        return pd.DataFrame(columns=BREAK_COLUMNS)
+
+    booked = _booked_removed_rows(data, removed)
+    if booked is not None:
+        data = pd.concat([data, booked], ignore_index=True)
+
+    rows = _statement_order(data)
+    codes, sheets = pd.factorize(rows['Source_Sheet'])
+    paid_in = rows['Paid In (£)'].to_numpy(dtype='int64')
+    withdrawn = rows['Withdrawn (£)'].to_numpy(dtype='int64')
+    balance = rows['Balance (£)'].to_numpy(dtype='int64')
+    delta = paid_in - withdrawn
+
+    # Sheet boundaries; sheets are contiguous after ordering
+    is_first = np.ones(len(rows), dtype=bool)
+    is_first[1:] = codes[1:] != codes[:-1]
+    starts = np.flatnonzero(is_first)
+    ends = np.append(starts[1:] - 1, len(rows) - 1)
+    group = np.cumsum(is_first) - 1
+
+    # Expected balance: opening balance plus the running total within the sheet
+    running = np.cumsum(delta)
+    sheet_running = running - (running - delta)[starts][group]
+    opening = (balance - delta)[starts]
+    drift = balance - (opening[group] + sheet_running)
+
+    # A break is where the drift changes from one row to the next
+    step = np.zeros(len(rows), dtype='int64')
+    step[1:] = drift[1:] - drift[:-1]
+    step[is_first] = 0
+    break_types = np.select(
+        [step == 0, (delta != 0) & (step == -2 * delta), (delta != 0) & (step == -delta)],
+        ['', WRONG_SIGN, DUPLICATED_ROW],
+        default=MISSING_ROWS
+    )
+
+    # Consecutive sheets should continue from the previous closing balance
+    gaps = opening[1:] - balance[ends[:-1]]
+    gap_sheets = np.flatnonzero(gaps != 0) + 1
+
+    positions = np.concatenate([np.flatnonzero(step != 0), starts[gap_sheets]])
+    order = np.argsort(positions, kind='stable')
+    positions = positions[order]
+    is_gap = np.concatenate([np.zeros(len(positions) - len(gap_sheets), dtype=bool),
+                             np.ones(len(gap_sheets), dtype=bool)])[order]
+    differences = np.concatenate([step[step != 0], gaps[gap_sheets - 1]])[order]
+    previous_sheets = np.concatenate([
+        np.full((step != 0).sum(), '', dtype=object),
+        np.asarray(sheets, dtype=object)[gap_sheets - 1]
+    ])[order]
+
+    selected = rows.iloc[positions]
+    breaks = pd.DataFrame({
+        'Break_Type': np.where(is_gap, SHEET_GAP, break_types[positions]),
+        'Source_Sheet': selected['Source_Sheet'].astype(object).to_numpy(),
+        'Source_Row': selected['Source_Row'].to_numpy(),
+        'Date': selected['Date'].to_numpy(),
+        'Transaction': selected['Transaction'].astype(object).to_numpy(),
+        'Paid In (£)': paid_in[positions],
+        'Withdrawn (£)': withdrawn[positions],
+        'Balance (£)': balance[positions],
+        'Expected Balance (£)': balance[positions] - differences,
+        'Difference (£)': differences,
+        'Previous_Sheet': previous_sheets
+    })
+    return breaks
@@ -0,0 +1,134 @@
+import re
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Default removal patterns, used when no rules file is supplied.
+# Patterns are regular expressions matched against the lowercased Transaction.
+DEFAULT_REMOVAL_PATTERNS = {
+    'Balance Forward': [
+        'balance brought forward',
+        'brought forward',
+        'closing balance'
+    ],
+    'Metro Bank DD': [
+        'direct debit metro bank y65ys7p',
+        'direct debit metro bank'
+    ]
+}
+
+EMPTY_ROW_REASON = 'Empty Row'
+
+
+class RemovalRules:
+    def __init__(self, removal_patterns=None):
+        """
+        Initialize RemovalRules with a precompiled reason -> pattern table
+
+        Parameters:
+        removal_patterns (dict): Removal reason -> list of regex patterns. Rules are
+            checked in order and the first matching reason wins.
+        """
+        if removal_patterns is None:
+            removal_patterns = DEFAULT_REMOVAL_PATTERNS
+
+        self.rules = {}
+        for reason, patterns in removal_patterns.items():
+            if isinstance(patterns, str):
+                patterns = [patterns]
+            if not patterns:
+                continue
+            try:
+                self.rules[reason] = re.compile('|'.join(f"(?:{p})" for p in patterns))
+            except re.error as e:
+                raise ValueError(f"Invalid removal pattern for '{reason}': {str(e)}")
+
+        # Reason order used for labelling and for ordering removed rows
+        self.reasons = list(self.rules) + [EMPTY_ROW_REASON]
+
+    @classmethod
+    def from_file(cls, rules_file):
+        """
+        Load removal rules from a JSON config file
+
+        The file maps each removal reason to a list of patterns, e.g.
+        {"Balance Forward": ["brought forward", "closing balance"]}
+        """
+        try:
+            with open(rules_file, 'r', encoding='utf-8') as f:
+                removal_patterns = json.load(f)
+            if not isinstance(removal_patterns, dict):
+                raise ValueError("Rules file must contain a JSON object of reason -> patterns")
+            return cls(removal_patterns)
+        except Exception as e:
+            raise Exception(f"Failed to load removal rules from {rules_file}: {str(e)}")
+
+    @classmethod
+    def load(cls, rules_file=None):
+        """Load rules from a file if it exists, otherwise fall back to the defaults"""
+        if rules_file is not None and Path(rules_file).exists():
+            return cls.from_file(rules_file)
+        return cls()
+
+    def _reason_codes(self, df):
+        """Index into self.reasons of the first matching rule per row, -1 if kept"""
+        transactions = df['Transaction'].str.lower()
+        conditions = [
+            transactions.str.contains(pattern, na=False).to_numpy(dtype=bool)
+            for pattern in self.rules.values()
+        ]
+
+        dates = df['Date']
+        empty_mask = (
+            dates.isna() |
+            (dates.str.strip() == '') |
+            (df['Transaction'].isna() & df['Paid In (£)'].isna() &
+             df['Withdrawn (£)'].isna() & df['Balance (£)'].isna())
+        )
+        conditions.append(empty_mask.to_numpy(dtype=bool))
+
+        # np.select picks the first condition that holds, matching sequential removal
+        return np.select(conditions, list(range(len(self.reasons))), default=-1)
+
+    def label(self, df):
+        """
+        Label every row with its first matching removal reason
+
+        Parameters:
+        df (pd.DataFrame): Raw statement rows with Date, Transaction and amount columns
+
+        Returns:
+        pd.Series: Removal reason per row, or None for rows that are kept
+        """
+        codes = self._reason_codes(df)
+        labels = pd.Categorical.from_codes(codes, categories=self.reasons)
+        return pd.Series(labels, index=df.index).astype(object).where(codes >= 0, None)
+
+    def split(self, df):
+        """
+        Split rows into kept and removed in one step
+
+        Returns:
+        tuple: (kept DataFrame, removed DataFrame with Removal_Reason, grouped by reason order)
+        """
+        codes = self._reason_codes(df)
+        removed_mask = codes >= 0
+
+        kept = df[~removed_mask]
+
+        # Stable sort keeps sheet order within each reason
+        removed_positions = np.flatnonzero(removed_mask)
+        removed_positions = removed_positions[np.argsort(codes[removed_mask], kind='stable')]
+        removed = df.iloc[removed_positions].copy()
+        removed['Removal_Reason'] = [self.reasons[code] for code in codes[removed_positions]]
+
+        return kept, removed
+
+    def counts(self, removed):
+        """Number of removed rows per reason, in rule order"""
+        if removed.empty:
+            return {}
+        counts = removed['Removal_Reason'].value_counts()
+        return {reason: int(counts[reason]) for reason in self.reasons if reason in counts}
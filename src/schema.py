@@ -0,0 +1,146 @@
+import pandas as pd
+
+# Arrow-backed strings store text in one contiguous buffer instead of a Python
+# object per cell; fall back to pandas' own string dtype without pyarrow
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'string'
+
+# Free text gets compact strings; low-cardinality labels become categoricals
+COMPACT_DTYPES = {
+    'Transaction': STRING_DTYPE,
+    'Notes': STRING_DTYPE,
+    'Source_Sheet': 'category',
+    'Subcategory': 'category'
+}
+CATEGORY_COLUMNS = [column for column, dtype in COMPACT_DTYPES.items() if dtype == 'category']
+
+# Money is held as int64 pence so amount comparisons and lookups are exact
+MONEY_COLUMNS = ['Paid In (£)', 'Withdrawn (£)', 'Balance (£)']
+PENCE_DTYPE = 'int64'
+
+
+def apply_compact_schema(frame):
+    """
+    Give processed transactions the compact dtypes used throughout the pipeline
+
+    Columns not present in frame are skipped, and categoricals only keep the
+    labels that are actually used (concatenating frames with different
+    categories falls back to object, so this is also applied after combining).
+
+    Args:
+        frame (pd.DataFrame): Processed transactions; it is not modified
+
+    Returns:
+        pd.DataFrame: Converted frame
+    """
+    dtypes = {column: dtype for column, dtype in COMPACT_DTYPES.items() if column in frame.columns}
+    # Categories are built from plain objects so their dtype does not depend
+    # on whether the column was edited as strings first
+    for column in CATEGORY_COLUMNS:
+        if column in dtypes and not isinstance(frame[column].dtype, pd.CategoricalDtype):
+            dtypes[column] = object
+    frame = frame.astype(dtypes)
+    for column in CATEGORY_COLUMNS:
+        if column in frame.columns:
+            frame[column] = frame[column].astype('category').cat.remove_unused_categories()
+    return frame
+
+
+def parse_pence(values):
+    """
+    Parse statement amounts such as '£1,234.50' into int64 pence
+
+    Amounts are rounded to the nearest penny as they are parsed. A statement
+    amount has at most two decimals, and for any such amount below about
+    £90 trillion the rounded value is exact, so equal amounts always compare
+    equal afterwards. Blanks and unparseable cells become 0, as they always have.
+
+    Args:
+        values (pd.Series): Raw cell values
+
+    Returns:
+        pd.Series: int64 pence, same index as values
+    """
+    pounds = parse_pounds(values).fillna(0)
+    return (pounds * 100).round().astype(PENCE_DTYPE)
+
+
+def parse_pounds(values):
+    """
+    Parse statement amounts such as '£1,234.50' into float pounds
+
+    Args:
+        values (pd.Series): Raw cell values (numbers pass through unchanged)
+
+    Returns:
+        pd.Series: float64 pounds, NaN for blanks and unparseable cells
+    """
+    # Remove currency symbols and commas (Arrow string kernels are the fast path)
+    text = values.astype(STRING_DTYPE).str.replace('£', '', regex=False).str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(text, errors='coerce').astype('float64')
+
+
+def to_pounds(pence):
+    """Convert a Series (or scalar) of pence to float pounds for display and export"""
+    return pence / 100
+
+
+def is_money_column(column):
+    """Whether a column holds money: the statement amounts, '... (£)' and '...Amount' columns"""
+    return column in MONEY_COLUMNS or str(column).endswith('(£)') or str(column).endswith('Amount')
+
+
+def pounds_frame(frame):
+    """
+    Copy of frame with its money columns converted from pence to pounds
+
+    Integer money columns (see is_money_column), including nullable Int64
+    ones, hold pence; other columns, including the float pounds on removed
+    rows, are left as they are.
+
+    Args:
+        frame (pd.DataFrame): Frame to convert; it is not modified
+
+    Returns:
+        pd.DataFrame: Converted frame
+    """
+    frame = frame.copy()
+    for column in frame.columns:
+        if is_money_column(column) and pd.api.types.is_integer_dtype(frame[column]):
+            frame[column] = to_pounds(frame[column])
+    return frame
+
+
+def editable_schema(frame):
+    """
+    Turn the categorical columns back into strings so new labels can be assigned
+
+    Categoricals reject values outside their categories; categorisers call
+    this before assigning and apply_compact_schema afterwards.
+
+    Args:
+        frame (pd.DataFrame): Frame with the compact schema; it is not modified
+
+    Returns:
+        pd.DataFrame: Frame with CATEGORY_COLUMNS as strings
+    """
+    dtypes = {column: STRING_DTYPE for column in CATEGORY_COLUMNS if column in frame.columns}
+    return frame.astype(dtypes)
+
+
+def memory_report(frame):
+    """
+    Deep memory usage of a frame per column
+
+    Args:
+        frame (pd.DataFrame): Frame to measure
+
+    Returns:
+        pd.Series: Column -> bytes, plus a 'Total' entry
+    """
+    usage = frame.memory_usage(deep=True, index=False)
+    usage['Total'] = usage.sum()
+    return usage
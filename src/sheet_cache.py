@@ -0,0 +1,191 @@
+import gzip
+import json
+import pickle
+import hashlib
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from gspread.utils import fill_gaps
+
+
+def apply_values(rows, grid, values):
+    """
+    Write a block of values into sheet rows as the Sheets API would store them
+
+    Parameters:
+    rows (list): Sheet values as returned by a fetch (list of lists)
+    grid (dict): Grid range of the block (startRowIndex/startColumnIndex, 0-based)
+    values (list): Rows of values written at the top-left of grid
+
+    Returns:
+    list: New rows, shaped like a fresh fetch of the sheet would be
+    """
+    rows = [list(row) for row in rows]
+    start_row = grid.get('startRowIndex', 0)
+    start_col = grid.get('startColumnIndex', 0)
+    for row_offset, value_row in enumerate(values):
+        while len(rows) <= start_row + row_offset:
+            rows.append([])
+        row = rows[start_row + row_offset]
+        for col_offset, value in enumerate(value_row):
+            col = start_col + col_offset
+            if len(row) <= col:
+                row.extend([''] * (col + 1 - len(row)))
+            row[col] = value
+
+    # A fetch leaves out trailing empty cells and rows, then pads rows to the same width
+    for row in rows:
+        while row and row[-1] == '':
+            row.pop()
+    while rows and not rows[-1]:
+        rows.pop()
+    return fill_gaps(rows)
+
+
+class SheetCache:
+    def __init__(self, cache_dir):
+        """
+        Initialize the on-disk cache of raw sheet values
+
+        Each sheet's values are stored as a gzip-compressed pickle keyed by
+        spreadsheet id + sheet name. An index file records the Drive
+        modifiedTime the values were fetched at and a hash of their content.
+
+        Parameters:
+        cache_dir (str): Directory holding the cache files
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.cache_dir / 'index.json'
+        self._lock = threading.Lock()
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if not self.index_file.exists():
+            return {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable sheet cache index: {str(e)}")
+            return {}
+
+    def _save_index(self):
+        temp_file = self.index_file.with_suffix('.tmp')
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+        temp_file.replace(self.index_file)
+
+    @staticmethod
+    def _key(spreadsheet_id, sheet_name):
+        return f"{spreadsheet_id}:{sheet_name}"
+
+    def _data_file(self, key):
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pkl.gz"
+
+    @staticmethod
+    def hash_rows(rows):
+        """Stable content hash of a sheet's values"""
+        payload = json.dumps(rows, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def entry(self, spreadsheet_id, sheet_name):
+        """Index entry for a sheet, or None if it is not cached"""
+        return self.index.get(self._key(spreadsheet_id, sheet_name))
+
+    def content_hash(self, spreadsheet_id, sheet_name):
+        entry = self.entry(spreadsheet_id, sheet_name)
+        return entry['content_hash'] if entry else None
+
+    def get(self, spreadsheet_id, sheet_name, modified_time=None):
+        """
+        Read cached values for a sheet
+
+        Parameters:
+        modified_time (str): If given, only return values fetched at this Drive modifiedTime
+
+        Returns:
+        list: Cached rows, or None if missing or stale
+        """
+        key = self._key(spreadsheet_id, sheet_name)
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        if modified_time is not None and entry.get('modified_time') != modified_time:
+            return None
+
+        try:
+            with gzip.open(self._data_file(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def restamp(self, spreadsheet_id, old_time, new_time, updates=None, dropped=()):
+        """
+        Carry cached sheets across a write made by this pipeline
+
+        Sheets cached at old_time (i.e. current just before the write) are
+        moved to new_time, with the written blocks applied to their rows.
+        Sheets in dropped were rewritten in full and are removed, so they are
+        fetched again.
+
+        Parameters:
+        spreadsheet_id (str): Spreadsheet that was written to
+        old_time (str): Drive modifiedTime just before the write
+        new_time (str): Drive modifiedTime just after the write
+        updates (dict): Sheet name -> list of (grid range, values) written
+        dropped (list): Names of sheets rewritten in full
+
+        Returns:
+        int: Number of cached sheets carried over
+        """
+        updates = updates or {}
+        carried = 0
+        for key, entry in list(self.index.items()):
+            if entry.get('spreadsheet_id') != spreadsheet_id or entry.get('modified_time') != old_time:
+                continue
+            sheet_name = entry['sheet_name']
+            if sheet_name in dropped:
+                with self._lock:
+                    self.index.pop(key, None)
+                    self._data_file(key).unlink(missing_ok=True)
+                    self._save_index()
+                continue
+            rows = self.get(spreadsheet_id, sheet_name, old_time)
+            if rows is None:
+                continue
+            for grid, values in updates.get(sheet_name, []):
+                rows = apply_values(rows, grid, values)
+            self.put(spreadsheet_id, sheet_name, rows, new_time)
+            carried += 1
+        return carried
+
+    def put(self, spreadsheet_id, sheet_name, rows, modified_time=None):
+        """
+        Store a sheet's values
+
+        Returns:
+        bool: True if the content differs from what was cached before
+        """
+        key = self._key(spreadsheet_id, sheet_name)
+        content_hash = self.hash_rows(rows)
+
+        with self._lock:
+            previous = self.index.get(key)
+            changed = previous is None or previous.get('content_hash') != content_hash
+            if changed or not self._data_file(key).exists():
+                with gzip.open(self._data_file(key), 'wb') as f:
+                    pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            self.index[key] = {
+                'spreadsheet_id': spreadsheet_id,
+                'sheet_name': sheet_name,
+                'modified_time': modified_time,
+                'content_hash': content_hash,
+                'rows': len(rows),
+                'fetched_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+            self._save_index()
+
+        return changed
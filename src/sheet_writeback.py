@@ -0,0 +1,139 @@
+import math
+from datetime import datetime, date
+
+import numpy as np
+import pandas as pd
+from gspread.utils import absolute_range_name, rowcol_to_a1
+
+
+def to_cell_value(value):
+    """Convert a DataFrame value to what the Sheets values API stores"""
+    if value is None:
+        return ''
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return ''
+    if value is pd.NaT:
+        return ''
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.strftime('%Y-%m-%d %H:%M:%S') if value.time() != datetime.min.time() \
+            else value.strftime('%Y-%m-%d')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+
+def to_sheet_values(data_frame):
+    """Header row plus data rows, converted to sheet cell values"""
+    rows = [[to_cell_value(value) for value in data_frame.columns.tolist()]]
+    rows.extend(
+        [to_cell_value(value) for value in row]
+        for row in data_frame.itertuples(index=False, name=None)
+    )
+    return rows
+
+
+def _same_cell(current, new):
+    """Compare an unformatted sheet value with a new cell value"""
+    current_is_number = isinstance(current, (int, float)) and not isinstance(current, bool)
+    new_is_number = isinstance(new, (int, float)) and not isinstance(new, bool)
+    if current_is_number and new_is_number:
+        return float(current) == float(new)
+    return current == new
+
+
+def diff_ranges(sheet_name, current, new):
+    """
+    Work out the ranges that must be written to turn current into new
+
+    Each row is reduced to the span between its first and last changed cell,
+    and consecutive rows with the same span are merged into one block. Cells
+    that exist in current but not in new are written as blanks.
+
+    Args:
+        sheet_name (str): Worksheet title used in the A1 ranges
+        current (list): Rows currently in the sheet (unformatted values)
+        new (list): Rows the sheet should hold
+
+    Returns:
+        list: {'range': ..., 'values': ...} entries for values:batchUpdate
+    """
+    row_count = max(len(current), len(new))
+    col_count = max([len(row) for row in current] + [len(row) for row in new] + [0])
+
+    def padded(rows, index):
+        row = list(rows[index]) if index < len(rows) else []
+        return row + [''] * (col_count - len(row))
+
+    blocks = []  # [first_row, first_col, last_col, rows]
+    for row_index in range(row_count):
+        current_row, new_row = padded(current, row_index), padded(new, row_index)
+        changed = [col for col in range(col_count) if not _same_cell(current_row[col], new_row[col])]
+        if not changed:
+            continue
+
+        first_col, last_col = changed[0], changed[-1]
+        values = new_row[first_col:last_col + 1]
+        previous = blocks[-1] if blocks else None
+        if previous and previous[0] + len(previous[3]) == row_index \
+                and previous[1] == first_col and previous[2] == last_col:
+            previous[3].append(values)
+        else:
+            blocks.append([row_index, first_col, last_col, [values]])
+
+    return [
+        {
+            'range': absolute_range_name(
+                sheet_name,
+                f"{rowcol_to_a1(first_row + 1, first_col + 1)}:"
+                f"{rowcol_to_a1(first_row + len(rows), last_col + 1)}"
+            ),
+            'values': rows
+        }
+        for first_row, first_col, last_col, rows in blocks
+    ]
+
+
+def write_dataframe(worksheet, data_frame, current=None):
+    """
+    Write a DataFrame to a worksheet, sending only the cells that changed
+
+    The sheet is read once, diffed against the DataFrame, and the changed
+    ranges are written with a single values:batchUpdate request.
+
+    Args:
+        worksheet (gspread.Worksheet): Target worksheet
+        data_frame (pd.DataFrame): Data to write, header row included
+        current (list): Current sheet values, if already known (e.g. a new, empty sheet)
+
+    Returns:
+        dict: Write statistics (total_cells, changed_cells, ranges)
+    """
+    spreadsheet = worksheet.spreadsheet
+    new = to_sheet_values(data_frame)
+
+    if current is None:
+        response = spreadsheet.values_get(
+            absolute_range_name(worksheet.title),
+            params={'valueRenderOption': 'UNFORMATTED_VALUE', 'dateTimeRenderOption': 'FORMATTED_STRING'}
+        )
+        current = response.get('values', [])
+
+    ranges = diff_ranges(worksheet.title, current, new)
+    stats = {
+        'total_cells': sum(len(row) for row in new),
+        'changed_cells': sum(len(row) for entry in ranges for row in entry['values']),
+        'ranges': len(ranges)
+    }
+    if not ranges:
+        return stats
+
+    # The values API cannot write past the grid, so grow it first when needed
+    needed_rows = max(len(new), len(current))
+    needed_cols = max([len(row) for row in new] + [0])
+    if needed_rows > worksheet.row_count or needed_cols > worksheet.col_count:
+        worksheet.resize(rows=max(needed_rows, worksheet.row_count), cols=max(needed_cols, worksheet.col_count))
+
+    spreadsheet.values_batch_update(body={'valueInputOption': 'RAW', 'data': ranges})
+    return stats
@@ -0,0 +1,134 @@
+import sys
+import json
+import time
+import pstats
+import cProfile
+from pathlib import Path
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+PROFILE_TOP_FUNCTIONS = 30
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class StageMetrics:
+    def __init__(self, profile_dir=None):
+        """
+        Initialize per-stage timing for one pipeline run
+
+        Each stage records wall time, CPU time, rows handled, rows/sec and the
+        process's peak RSS when it finished. Stages entered repeatedly (e.g.
+        process_sheet once per sheet) are accumulated under one name.
+
+        Parameters:
+        profile_dir (str): When given, every stage also runs under cProfile and
+            write() dumps <stage>.prof and a <stage>.txt summary there. Only the
+            calling thread is profiled, and nested stages are profiled as part
+            of the outermost one.
+        """
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.stages = {}
+        self.extra = {}  # Name -> dict of run-level metrics from other components
+        self._profiles = {}
+        self._depth = 0
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a block of work as stage `name`
+
+        Yields a dict; set its 'rows' entry to the number of rows the stage
+        handled to get rows/sec.
+
+        Example:
+            with metrics.stage('apply_categorization') as stage:
+                data = categorizer.apply_categorization(...)
+                stage['rows'] = len(data)
+        """
+        run = {'rows': None}
+        profiler = None
+        if self.profile_dir is not None and self._depth == 0:
+            profiler = self._profiles.setdefault(name, cProfile.Profile())
+            profiler.enable()
+        self._depth += 1
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield run
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            self._depth -= 1
+            if profiler is not None:
+                profiler.disable()
+            self._record(name, wall, cpu, run['rows'])
+
+    def _record(self, name, wall, cpu, rows):
+        record = self.stages.setdefault(name, {
+            'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows': None
+        })
+        record['calls'] += 1
+        record['wall_seconds'] += wall
+        record['cpu_seconds'] += cpu
+        if rows is not None:
+            record['rows'] = (record['rows'] or 0) + rows
+        record['rows_per_second'] = (
+            record['rows'] / record['wall_seconds']
+            if record['rows'] is not None and record['wall_seconds'] > 0 else None
+        )
+        record['peak_rss_mb'] = peak_rss_mb()
+
+    def add(self, name, values):
+        """Attach run-level metrics from another component, e.g. the API rate limiter"""
+        self.extra[name] = dict(values)
+
+    def summary(self):
+        """Metrics for all stages, in the order they first ran, plus any attached metrics"""
+        return {
+            'total_wall_seconds': time.perf_counter() - self._started,
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': [{'stage': name, **record} for name, record in self.stages.items()],
+            **self.extra
+        }
+
+    def write(self, output_dir):
+        """
+        Write metrics.json (and cProfile dumps when profiling) into output_dir
+
+        Returns:
+            Path: The metrics.json written
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        metrics_file = output_dir / 'metrics.json'
+        with open(metrics_file, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+        if self.profile_dir is not None:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            for name, profiler in self._profiles.items():
+                profiler.dump_stats(str(self.profile_dir / f'{name}.prof'))
+                with open(self.profile_dir / f'{name}.txt', 'w') as f:
+                    stats = pstats.Stats(profiler, stream=f)
+                    stats.sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        return metrics_file
+
+    def print_summary(self):
+        """Print one line per stage"""
+        print("\n⏱️ Stage timings:")
+        for name, record in self.stages.items():
+            rate = f", {record['rows_per_second']:,.0f} rows/s" if record['rows_per_second'] else ""
+            print(f"- {name}: {record['wall_seconds']:.2f}s wall, {record['cpu_seconds']:.2f}s CPU{rate}")
@@ -0,0 +1,121 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from src.keyword_matcher import KeywordMatcher
+from src.incremental_processor import process_and_categorize, merge_sheet_results
+
+
+class StreamingPipeline:
+    def __init__(self, processor, categorizer, max_workers=4, process_workers=1):
+        """
+        Initialize the streaming statement pipeline
+
+        Sheets are fetched one by one on a thread pool and each sheet is
+        processed and categorized as soon as it arrives, while the remaining
+        fetches are still waiting on the network. Sheets are combined once all
+        of them have landed, so the result matches a sequential run.
+
+        Parameters:
+        processor (BankStatementProcessor): Processor whose processed_data is built
+        categorizer (Categorisation): Categorizer whose data and issues are built
+        max_workers (int): Concurrent sheet fetches
+        process_workers (int): Threads processing and categorizing fetched sheets.
+            Processing is CPU-bound Python, so more than one rarely helps.
+        """
+        if max_workers < 1 or process_workers < 1:
+            raise ValueError("Worker counts must be at least 1")
+        self.processor = processor
+        self.categorizer = categorizer
+        self.max_workers = max_workers
+        self.process_workers = process_workers
+
+    def _fetch(self, spreadsheet_id, sheet_name):
+        """Fetch one sheet through the connection (and its cache); returns (rows, error)"""
+        results, errors = self.processor.gs_connection.fetch_sheets(
+            spreadsheet_id, [sheet_name], max_workers=1, batch=False
+        )
+        return results.get(sheet_name), errors.get(sheet_name)
+
+    def _load_matcher(self, spreadsheet_id, keyword_sheet_name):
+        keyword_mappings = self.categorizer._get_keyword_mappings(spreadsheet_id, keyword_sheet_name)
+        return KeywordMatcher.from_mapping(keyword_mappings)
+
+    def _process(self, rows, sheet_name, matcher):
+        print(f"\nProcessing sheet: {sheet_name}")
+        result = process_and_categorize(self.processor, self.categorizer, rows, sheet_name, matcher)
+        print(f"✓ Processed {len(result['processed'])} transactions from {sheet_name}")
+        return result
+
+    async def _stream(self, spreadsheet_id, sheet_names, keyword_sheet_name):
+        """
+        Fetch every sheet and process each one as soon as it lands
+
+        Returns:
+        tuple: (list of sheet results in sheet order, dict of sheet name -> fetch error, raw rows fetched)
+        """
+        loop = asyncio.get_running_loop()
+        errors = {}
+        fetched_rows = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as fetch_pool, \
+                ThreadPoolExecutor(max_workers=self.process_workers) as process_pool:
+            # The keyword mapping is fetched alongside the first sheets
+            matcher = loop.run_in_executor(fetch_pool, self._load_matcher, spreadsheet_id, keyword_sheet_name)
+
+            async def handle(sheet_name):
+                nonlocal fetched_rows
+                rows, error = await loop.run_in_executor(fetch_pool, self._fetch, spreadsheet_id, sheet_name)
+                if rows is None:
+                    errors[sheet_name] = error
+                    return None
+                print(f"✓ Fetched {sheet_name}")
+                fetched_rows += max(len(rows) - 1, 0)
+                self.processor.record_sheet_layout(sheet_name, rows)
+                return await loop.run_in_executor(process_pool, self._process, rows, sheet_name, await matcher)
+
+            tasks = [asyncio.ensure_future(handle(sheet_name)) for sheet_name in sheet_names]
+            try:
+                results = await asyncio.gather(matcher, *tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+        return [result for result in results[1:] if result is not None], errors, fetched_rows
+
+    def run(self, spreadsheet_id, sheets_file, keyword_sheet_name):
+        """
+        Fetch, process and categorize every listed sheet with overlapping stages
+
+        Parameters:
+        spreadsheet_id (str): Google Sheets ID
+        sheets_file (str): Text file with one sheet name per line
+        keyword_sheet_name (str): Name of keyword mapping sheet
+
+        Returns:
+        pd.DataFrame: Categorized transactions (also set on categorizer.data)
+        """
+        try:
+            sheets_to_process = self.processor.load_sheets_list(sheets_file)
+            print(f"Found {len(sheets_to_process)} sheets to process")
+
+            metrics = self.processor.metrics
+            # Fetching, processing and categorizing overlap, so they are timed as one stage
+            with metrics.stage('stream_sheets') as stage:
+                results, self.processor.failed_sheets, stage['rows'] = asyncio.run(
+                    self._stream(spreadsheet_id, sheets_to_process, keyword_sheet_name)
+                )
+
+            if self.processor.failed_sheets:
+                print(f"\n⚠️ {len(self.processor.failed_sheets)} sheet(s) could not be fetched:")
+                for sheet_name, error in self.processor.failed_sheets.items():
+                    print(f"- {sheet_name}: {error}")
+            if not results:
+                raise Exception("No sheets could be fetched")
+
+            with metrics.stage('combine_sheets') as stage:
+                stage['rows'] = sum(len(result['processed']) for result in results)
+                return merge_sheet_results(self.processor, self.categorizer, results)
+
+        except Exception as e:
+            raise Exception(f"Failed to stream bank statements: {str(e)}")
@@ -0,0 +1,173 @@
+import sys
+from pathlib import Path
+import gspread
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.google_sheets_connection import GoogleSheetsConnection
+from src.bank_statement_processor import BankStatementProcessor
+
+HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+
+class _FakeResponse:
+    def __init__(self, message, code=400):
+        self.text = message
+        self._body = {'error': {'code': code, 'message': message, 'status': 'INVALID_ARGUMENT'}}
+
+    def json(self):
+        return self._body
+
+
+class _FakeWorksheet:
+    def __init__(self, title):
+        self.title = title
+
+
+class _FakeValuesSpreadsheet:
+    """Local fake of the values API: batchGet trims trailing empty cells like the real API"""
+    def __init__(self, sheets):
+        self.sheets = sheets
+        self.batch_get_calls = []
+        self.metadata_calls = 0
+
+    def values_batch_get(self, ranges, params=None):
+        self.batch_get_calls.append(list(ranges))
+        titles = [range_name.strip("'").replace("''", "'") for range_name in ranges]
+        for title in titles:
+            if title not in self.sheets:
+                raise gspread.exceptions.APIError(_FakeResponse(f"Unable to parse range: '{title}'"))
+        value_ranges = []
+        for range_name, title in zip(ranges, titles):
+            rows = [self._trim(row) for row in self.sheets[title]]
+            value_range = {'range': f"{range_name}!A1:G{len(rows)}", 'majorDimension': 'ROWS'}
+            if rows:
+                value_range['values'] = rows
+            value_ranges.append(value_range)
+        return {'spreadsheetId': 'sheet-id', 'valueRanges': value_ranges}
+
+    def worksheets(self):
+        self.metadata_calls += 1
+        return [_FakeWorksheet(title) for title in self.sheets]
+
+    @staticmethod
+    def _trim(row):
+        row = list(row)
+        while row and row[-1] == '':
+            row.pop()
+        return row
+
+
+class _FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self.open_calls = 0
+
+    def open_by_key(self, spreadsheet_id):
+        self.open_calls += 1
+        return self.spreadsheet
+
+
+class _FakeConnection(GoogleSheetsConnection):
+    def __init__(self, sheets):
+        self._sheets = sheets
+        super().__init__('unused.json', requests_per_minute=6000, burst=50)
+
+    def _setup_connection(self):
+        return _FakeClient(_FakeValuesSpreadsheet(self._sheets))
+
+
+def _statement(month):
+    return [
+        HEADERS,
+        [f'01 {month} 23', 'TESCO STORE', '', '10.00', '100.00', '', ''],
+        [f'02 {month} 23', 'DEPOSIT ROOM 7', '50.00', '', '150.00', '', ''],
+    ]
+
+
+class TestBatchFetch:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
+        self.sheets = {f"01_{month}_2023_to_31_{month}_2023": _statement(month) for month in self.months}
+        self.sheets["Owner's Sheet"] = _statement('Jul')
+        self.sheets['Empty'] = []
+        self.connection = _FakeConnection(self.sheets)
+        self.spreadsheet = self.connection.client.spreadsheet
+
+    def test_single_round_trip(self):
+        names = list(self.sheets)[:7]
+        results = self.connection.get_many_sheets('sheet-id', names)
+
+        assert list(results) == names
+        assert self.connection.client.open_calls == 1
+        assert len(self.spreadsheet.batch_get_calls) == 1
+        # Rows are padded back to full width like get_all_values
+        assert results[names[0]] == self.sheets[names[0]]
+        assert results["Owner's Sheet"] == self.sheets["Owner's Sheet"]
+
+    def test_chunks_only_when_limits_require(self):
+        self.connection.max_batch_ranges = 4
+        names = list(self.sheets)[:7]
+        results = self.connection.get_many_sheets('sheet-id', names)
+
+        assert list(results) == names
+        assert [len(call) for call in self.spreadsheet.batch_get_calls] == [4, 3]
+
+        self.spreadsheet.batch_get_calls.clear()
+        self.connection.max_batch_ranges = 100
+        self.connection.max_batch_query_chars = 150
+        self.connection.get_many_sheets('sheet-id', names)
+        assert len(self.spreadsheet.batch_get_calls) > 1
+        assert sum(len(call) for call in self.spreadsheet.batch_get_calls) == 7
+
+    def test_missing_and_empty_sheets_reported_individually(self):
+        names = list(self.sheets) + ['Missing_Sheet']
+        results, errors = self.connection.fetch_sheets('sheet-id', names)
+
+        assert set(errors) == {'Empty', 'Missing_Sheet'}
+        assert len(results) == 7
+        assert self.spreadsheet.metadata_calls == 1
+
+    def test_spreadsheet_and_worksheet_handles_are_cached(self):
+        names = list(self.sheets)[:3]
+        for name in names * 2:
+            assert self.connection.get_worksheet('sheet-id', name).title == name
+        self.connection.get_many_sheets('sheet-id', names)
+        assert self.connection.client.open_calls == 1
+        assert self.spreadsheet.metadata_calls == 1
+
+        # A title missing from the cache re-reads the metadata once
+        self.sheets['Added_Sheet'] = _statement('Aug')
+        assert self.connection.get_worksheet('sheet-id', 'Added_Sheet').title == 'Added_Sheet'
+        assert self.spreadsheet.metadata_calls == 2
+        with pytest.raises(Exception, match='Missing_Sheet'):
+            self.connection.get_worksheet('sheet-id', 'Missing_Sheet')
+        assert self.spreadsheet.metadata_calls == 3
+        assert self.connection.client.open_calls == 1
+
+    def test_spreadsheet_handles_are_least_recently_used(self):
+        self.connection.max_cached_spreadsheets = 2
+        for spreadsheet_id in ['a', 'b', 'a', 'c', 'a']:
+            self.connection.get_worksheet(spreadsheet_id, 'Empty')
+        # 'b' was dropped when 'c' arrived; 'a' stayed cached throughout
+        assert self.connection.client.open_calls == 3
+        assert list(self.connection._handles) == ['c', 'a']
+
+    def test_process_all_statements_uses_batch(self, tmp_path):
+        sheets_file = tmp_path / 'sheets.txt'
+        sheets_file.write_text('\n'.join(list(self.sheets)[:6]))
+
+        processor = BankStatementProcessor(self.connection)
+        data = processor.process_all_statements('sheet-id', str(sheets_file))
+
+        assert len(data) == 12
+        assert processor.failed_sheets == {}
+        assert len(self.spreadsheet.batch_get_calls) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
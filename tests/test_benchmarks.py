@@ -0,0 +1,88 @@
+import os
+import sys
+from pathlib import Path
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+pytest.importorskip('pytest_benchmark')
+
+from src.categorisation import Categorisation
+from src.deposit_categorizer import DepositCategorizer, MATCHING_MODES
+from src.stage_metrics import peak_rss_mb
+from scripts.benchmark_pipeline import build_pipeline, SPREADSHEET_ID, KEYWORD_SHEET
+
+# Kept small so the suite stays fast; raise them to benchmark at scale, e.g.
+#   BENCHMARK_ROWS=100000 BENCHMARK_KEYWORDS=2000 pytest tests/test_benchmarks.py --benchmark-autosave
+# and compare against earlier saved runs with --benchmark-compare --benchmark-compare-fail=mean:20%
+BENCHMARK_ROWS = int(os.environ.get('BENCHMARK_ROWS', 1_000))
+BENCHMARK_KEYWORDS = int(os.environ.get('BENCHMARK_KEYWORDS', 100))
+ROUNDS = 3
+
+
+@pytest.fixture(scope='module')
+def processed():
+    """Synthetic statements processed once, shared by the downstream stage benchmarks"""
+    processor, sheets_file = build_pipeline(BENCHMARK_ROWS, keywords=BENCHMARK_KEYWORDS)
+    try:
+        processor.process_all_statements(SPREADSHEET_ID, str(sheets_file), max_workers=1)
+    finally:
+        sheets_file.unlink()
+    return processor
+
+
+def _record(benchmark, rows):
+    if benchmark.stats is None:  # --benchmark-disable runs each test once without timing
+        return
+    benchmark.extra_info['rows'] = rows
+    benchmark.extra_info['rows_per_second'] = rows / benchmark.stats.stats.mean
+    benchmark.extra_info['peak_rss_mb'] = peak_rss_mb()
+
+
+class TestPipelineBenchmarks:
+    def test_process_all_statements(self, benchmark):
+        """Fetch through the local connection, parse and combine every sheet"""
+        sheets_files = []
+
+        def setup():
+            processor, sheets_file = build_pipeline(BENCHMARK_ROWS, keywords=BENCHMARK_KEYWORDS)
+            sheets_files.append(sheets_file)
+            return (processor, sheets_file), {}
+
+        def run(processor, sheets_file):
+            return processor.process_all_statements(SPREADSHEET_ID, str(sheets_file), max_workers=1)
+
+        try:
+            data = benchmark.pedantic(run, setup=setup, rounds=ROUNDS)
+        finally:
+            for sheets_file in sheets_files:
+                sheets_file.unlink()
+        assert len(data) > 0
+        _record(benchmark, BENCHMARK_ROWS)
+
+    def test_apply_categorization(self, benchmark, processed):
+        """Keyword categorization of the whole processed frame"""
+        def run():
+            return Categorisation(processed).apply_categorization(SPREADSHEET_ID, KEYWORD_SHEET)
+
+        data = benchmark.pedantic(run, rounds=ROUNDS)
+        assert data['Subcategory'].notna().any()
+        _record(benchmark, len(processed.processed_data))
+
+    @pytest.mark.parametrize('matching', MATCHING_MODES)
+    def test_categorize_deposits(self, benchmark, processed, matching):
+        """Deposit classification and deposit/return matching"""
+        def run():
+            handler = DepositCategorizer(processed, matching=matching)
+            handler.categorize_deposits()
+            return handler
+
+        handler = benchmark.pedantic(run, rounds=ROUNDS)
+        assert handler.matched_deposits
+        _record(benchmark, len(processed.processed_data))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
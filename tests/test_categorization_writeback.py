@@ -0,0 +1,115 @@
+import sys
+from pathlib import Path
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.bank_statement_processor import BankStatementProcessor
+from src.categorisation import Categorisation
+from tests.test_batch_fetch import HEADERS, _FakeConnection, _FakeValuesSpreadsheet
+
+
+class _WritableSpreadsheet(_FakeValuesSpreadsheet):
+    def __init__(self, sheets):
+        super().__init__(sheets)
+        self.batch_update_bodies = []
+
+    def values_batch_update(self, body=None):
+        self.batch_update_bodies.append(body)
+        return {'totalUpdatedCells': sum(len(row) for entry in body['data'] for row in entry['values'])}
+
+
+class _WritableConnection(_FakeConnection):
+    def _setup_connection(self):
+        client = super()._setup_connection()
+        client.spreadsheet = _WritableSpreadsheet(self._sheets)
+        return client
+
+
+class TestCategorizationWriteback:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.sheets = {
+            'Sheet_Jan': [
+                HEADERS,
+                ['01 Jan 23', 'TESCO STORE', '', '10.00', '100.00', 'old note', 'Old'],
+                ['02 Jan 23', 'Balance brought forward', '', '', '100.00', 'stale', 'Stale'],
+                ['03 Jan 23', 'SHELL FUELS', '', '20.00', '80.00', '', ''],
+            ],
+            'Sheet_Feb': [
+                ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Subcategory', 'Notes'],
+                ['01 Feb 23', 'TESCO STORE', '', '12.00', '68.00', '', ''],
+                ['01 Feb 23', 'TESCO STORE', '', '12.00', '68.00', '', ''],
+            ],
+            'Keyword Mapping': [['Keyword', 'Subcategory'], ['TESCO', 'Groceries'], ['SHELL', 'Fuel']],
+        }
+        self.sheets_file = tmp_path / 'sheets.txt'
+        self.sheets_file.write_text('Sheet_Jan\nSheet_Feb')
+        self.connection = _WritableConnection(self.sheets)
+        self.spreadsheet = self.connection.client.spreadsheet
+
+        self.processor = BankStatementProcessor(self.connection)
+        self.processor.process_all_statements('sheet-id', str(self.sheets_file))
+        self.data = Categorisation(self.processor).apply_categorization('sheet-id', 'Keyword Mapping')
+
+    def test_source_rows_are_tracked(self):
+        assert sorted(zip(self.data['Source_Sheet'], self.data['Source_Row'])) == [
+            ('Sheet_Feb', 2), ('Sheet_Jan', 2), ('Sheet_Jan', 4)
+        ]
+        removed = self.processor.removed_rows
+        assert removed['Source_Row'].tolist() == [3, 3]
+        assert removed['Removal_Reason'].tolist() == ['Balance Forward', 'Duplicate Transaction']
+        assert removed['Duplicate_Of_Row'].tolist()[1] == 2
+        assert self.processor.sheet_layouts['Sheet_Jan'] == {'headers': HEADERS, 'rows': 4}
+
+    def test_one_batch_update_for_all_sheets(self):
+        written = self.connection.write_categorization_back('sheet-id', self.data, self.processor.sheet_layouts)
+
+        assert written == {'Sheet_Jan': 2, 'Sheet_Feb': 1}
+        assert len(self.spreadsheet.batch_update_bodies) == 1
+        body = self.spreadsheet.batch_update_bodies[0]
+        assert body['valueInputOption'] == 'RAW'
+        assert body['data'] == [
+            # Removed rows are cleared, kept rows get their categorization
+            {'range': "'Sheet_Jan'!F2:G4",
+             'values': [['tesco', 'Groceries'], ['', ''], ['shell', 'Fuel']]},
+            # Non-adjacent or swapped columns are written separately; the duplicate row is cleared
+            {'range': "'Sheet_Feb'!G2:G3", 'values': [['tesco'], ['']]},
+            {'range': "'Sheet_Feb'!F2:F3", 'values': [['Groceries'], ['']]},
+        ]
+
+    def test_removed_keyword_clears_previous_categorization(self):
+        # The previous run wrote shell/Fuel back; the mapping no longer has SHELL
+        self.sheets['Sheet_Jan'][3][5:] = ['shell', 'Fuel']
+        self.sheets['Keyword Mapping'] = [['Keyword', 'Subcategory'], ['TESCO', 'Groceries']]
+        processor = BankStatementProcessor(self.connection)
+        processor.process_all_statements('sheet-id', str(self.sheets_file))
+        data = Categorisation(processor).apply_categorization('sheet-id', 'Keyword Mapping')
+
+        shell = data[data['Transaction'] == 'SHELL FUELS']
+        assert shell[['Notes', 'Subcategory']].values.tolist() == [['', '']]
+        self.connection.write_categorization_back('sheet-id', data, processor.sheet_layouts)
+        assert self.spreadsheet.batch_update_bodies[-1]['data'][0] == {
+            'range': "'Sheet_Jan'!F2:G4", 'values': [['tesco', 'Groceries'], ['', ''], ['', '']]
+        }
+
+    def test_previous_categorization_is_not_ingested(self):
+        # Sheet_Jan holds old note/Old and stale/Stale from an earlier run
+        processor = BankStatementProcessor(self.connection)
+        processor.process_all_statements('sheet-id', str(self.sheets_file))
+
+        for frame in (processor.processed_data, processor.removed_rows):
+            assert frame['Notes'].tolist() == [''] * len(frame)
+            assert frame['Subcategory'].tolist() == [''] * len(frame)
+
+    def test_missing_columns(self):
+        with pytest.raises(Exception, match='Source_Row'):
+            self.connection.write_categorization_back(
+                'sheet-id', self.data.drop(columns=['Source_Row']), self.processor.sheet_layouts
+            )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,189 @@
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.rate_limiter import TokenBucket, AdaptiveRateLimiter
+from src.google_sheets_connection import GoogleSheetsConnection
+from src.bank_statement_processor import BankStatementProcessor
+
+HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+
+class _FakeWorksheet:
+    def __init__(self, title, rows, latency, tracker):
+        self.title = title
+        self.rows = rows
+        self.latency = latency
+        self.tracker = tracker
+
+    def get_all_values(self):
+        with self.tracker.request():
+            time.sleep(self.latency)
+        return self.rows
+
+
+class _FakeSpreadsheet:
+    def __init__(self, worksheets):
+        self.worksheets_by_title = worksheets
+
+    def worksheets(self):
+        return list(self.worksheets_by_title.values())
+
+
+class _ConcurrencyTracker:
+    """Records the most requests in flight at once"""
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def request(self):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class _FakeClient:
+    def __init__(self, worksheets):
+        self.spreadsheet = _FakeSpreadsheet(worksheets)
+        self.open_calls = 0
+
+    def open_by_key(self, spreadsheet_id):
+        self.open_calls += 1
+        return self.spreadsheet
+
+
+class _FakeConnection(GoogleSheetsConnection):
+    """GoogleSheetsConnection backed by an in-memory client"""
+    def __init__(self, worksheets, **kwargs):
+        self._worksheets = worksheets
+        super().__init__('unused.json', **kwargs)
+
+    def _setup_connection(self):
+        return _FakeClient(self._worksheets)
+
+
+def _statement(day):
+    return [
+        HEADERS,
+        [f'0{day} Apr 23', f'TESCO STORE {day}', '', '10.00', '100.00', '', ''],
+        [f'0{day} Apr 23', f'DEPOSIT ROOM {day}', '50.00', '', '150.00', '', ''],
+    ]
+
+
+class TestTokenBucket:
+    def test_burst_then_sustained_rate(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(rate=2.0, capacity=3, clock=lambda: now[0], sleep=sleep)
+        waits = [bucket.acquire() for _ in range(5)]
+
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3] == pytest.approx(0.5)
+        assert waits[4] == pytest.approx(0.5)
+        assert bucket.total_requests == 5
+        assert bucket.total_wait_time == pytest.approx(1.0)
+
+    def test_concurrent_callers_share_quota(self):
+        bucket = TokenBucket(rate=100.0, capacity=1)
+        start = time.monotonic()
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(11)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 10 tokens beyond the burst at 100/s need at least ~0.1s in total
+        assert time.monotonic() - start >= 0.09
+
+
+class TestAdaptiveRateLimiter:
+    def test_backs_off_and_recovers(self):
+        now = [0.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        limiter = AdaptiveRateLimiter(rate=4.0, capacity=1, increase=1.0, clock=lambda: now[0], sleep=sleep)
+        limiter.acquire()
+
+        # Multiplicative decrease, and all callers wait out the server's Retry-After
+        assert limiter.on_throttle(retry_after=3) == 3
+        assert limiter.rate == 2.0
+        assert limiter.acquire() == pytest.approx(3.0)
+
+        # Without Retry-After the pause is one interval at the reduced rate
+        assert limiter.on_throttle() == pytest.approx(1.0)
+        assert limiter.rate == 1.0
+
+        # Additive increase, capped at the starting rate
+        for _ in range(5):
+            limiter.on_success()
+        assert limiter.rate == 4.0
+
+        metrics = limiter.metrics()
+        assert metrics['requests_per_minute'] == 240
+        assert metrics['throttled'] == 2
+        assert metrics['total_pause_seconds'] == pytest.approx(4.0)
+        assert metrics['total_wait_seconds'] == pytest.approx(3.0)
+
+
+class TestConcurrentFetch:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.tracker = _ConcurrencyTracker()
+        self.worksheets = {
+            f'Sheet_{day}': _FakeWorksheet(f'Sheet_{day}', _statement(day), latency=0.02, tracker=self.tracker)
+            for day in range(1, 7)
+        }
+        self.sheet_names = list(self.worksheets) + ['Missing_Sheet']
+        self.sheets_file = tmp_path / 'sheets.txt'
+        self.sheets_file.write_text('\n'.join(self.sheet_names))
+
+    def test_fetch_reports_failures_individually(self):
+        connection = _FakeConnection(self.worksheets, requests_per_minute=6000, burst=50)
+        results, errors = connection.fetch_sheets('sheet-id', self.sheet_names, max_workers=4, batch=False)
+
+        assert set(results) == set(self.worksheets)
+        assert list(errors) == ['Missing_Sheet']
+        assert self.tracker.max_active > 1
+        # Worker threads share one cached spreadsheet handle
+        assert connection.client.open_calls == 1
+
+    def test_sequential_mode(self):
+        connection = _FakeConnection(self.worksheets, requests_per_minute=6000, burst=50)
+        results, errors = connection.fetch_sheets('sheet-id', self.sheet_names, max_workers=1, batch=False)
+
+        assert list(results) == list(self.worksheets)
+        assert list(errors) == ['Missing_Sheet']
+        assert self.tracker.max_active == 1
+
+    def test_process_all_statements_keeps_sheet_order(self):
+        connection = _FakeConnection(self.worksheets, requests_per_minute=6000, burst=50)
+        processor = BankStatementProcessor(connection)
+        data = processor.process_all_statements('sheet-id', str(self.sheets_file), max_workers=4, batch=False)
+
+        assert len(data) == 12
+        assert list(processor.failed_sheets) == ['Missing_Sheet']
+        assert data['Source_Sheet'].unique().tolist() == list(self.worksheets)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.date_parser import detect_date_format, parse_date, parse_date_column
+from src.bank_statement_processor import BankStatementProcessor
+
+HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+
+class TestDateParser:
+    def test_detects_dominant_format(self):
+        assert detect_date_format(pd.Series(['03 Apr 23', '04 Apr 23', '2023-04-05'])) == '%d %b %y'
+        assert detect_date_format(pd.Series(['2023-04-03', '2023-04-04', ' 2023-04-05 '])) == '%Y-%m-%d'
+        assert detect_date_format(pd.Series(['03/04/2023', '13/04/2023'])) == '%d/%m/%Y'
+        assert detect_date_format(pd.Series(['', None, 'garbage'])) is None
+
+    def test_column_matches_per_cell_parsing(self):
+        dates = pd.Series([
+            '03 Apr 23', ' 04 Apr 23', '05 April 2023', '06/04/2023', '07-04-2023',
+            '2023-04-08', 'April 9 2023', 'not a date', '', None, 12345
+        ])
+        parsed, date_format, fallback_count = parse_date_column(dates)
+
+        expected = pd.to_datetime(dates.map(parse_date), errors='coerce')
+        pd.testing.assert_series_equal(parsed, expected, check_names=False)
+        assert date_format == '%d %b %y'
+        assert fallback_count == 6
+
+    def test_process_sheet_records_format(self):
+        worksheet_data = [
+            HEADERS,
+            ['2023-04-03', 'TESCO SUPERSTORE', '', '45.67', '954.33', '', ''],
+            ['2023-04-04', 'DEPOSIT ROOM 7', '50.00', '', '1,004.33', '', ''],
+            ['05/04/2023', 'SHELL FUELS', '', '20.00', '984.33', '', ''],
+        ]
+        processor = BankStatementProcessor(None)
+        df = processor.process_sheet(worksheet_data, 'Sheet_1')
+
+        assert processor.date_formats == {'Sheet_1': '%Y-%m-%d'}
+        assert df['Date'].tolist() == [
+            pd.Timestamp('2023-04-03'), pd.Timestamp('2023-04-04'), pd.Timestamp('2023-04-05')
+        ]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -108,7 +108,7 @@ def run_specific_tests():
             (categorizer.data['Paid In (£)'].notnull()) &
             (categorizer.data['Paid In (£)'] > 0) &
             (categorizer.data['Transaction'].str.lower().str.contains('deposit', na=False)) &
-            (~categorizer.data['Paid In (£)'].isin([50.0, 100.0]))
+            (~categorizer.data['Paid In (£)'].isin([5000, 10000]))
         ]
         if len(invalid_deposits) > 0:
             print(f"⚠️ Found {len(invalid_deposits)} deposits with non-standard amounts")
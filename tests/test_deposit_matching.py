@@ -0,0 +1,204 @@
+import sys
+import random
+from pathlib import Path
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.bank_statement_processor import BankStatementProcessor
+from src.deposit_categorizer import DepositCategorizer
+
+HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+
+def _processor(rows, sheet_name='Sheet_1'):
+    processor = BankStatementProcessor(None)
+    processor.combine_sheets([processor.process_sheet([HEADERS] + rows, sheet_name)])
+    return processor
+
+
+def _csv_processor(csv_file):
+    raw = pd.read_csv(csv_file, dtype=str, keep_default_na=False)
+    return _processor(raw[HEADERS].values.tolist(), Path(csv_file).stem)
+
+
+class TestDepositClassification:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.rows = [
+            ['01 Apr 23', 'ROOM DEPOSIT 7', '50.00', '', '1050.00', '', ''],
+            ['02 Apr 23', 'DEPOSIT RETURN ROOM 7', '', '50.00', '1000.00', '', ''],
+            ['03 Apr 23', 'TESCO STORE', '', '100.00', '900.00', '', ''],
+            ['04 Apr 23', 'DEPOSIT PART PAYMENT', '75.00', '', '975.00', '', ''],
+            ['05 Apr 23', 'DEP REFUND ROOM 9', '', '100.00', '875.00', '', ''],
+            ['06 Apr 23', 'SHELL FUELS', '', '20.00', '855.00', '', ''],
+        ]
+
+    def test_buckets(self):
+        categorizer = DepositCategorizer(_processor(self.rows))
+        deposits, returns = categorizer._classify_transactions()
+
+        assert [deposit['Transaction'] for deposit in deposits] == ['ROOM DEPOSIT 7']
+        assert [ret['Transaction'] for ret in returns] == ['DEPOSIT RETURN ROOM 7', 'DEP REFUND ROOM 9']
+        assert [item['Transaction'] for item in categorizer.miscellaneous_transactions] == ['TESCO STORE']
+        assert categorizer.miscellaneous_transactions[0]['Type'] == 'Withdrawn'
+        assert [issue['Transaction'] for issue in categorizer.deposit_issues] == ['DEPOSIT PART PAYMENT']
+        assert categorizer.deposit_issues[0]['Amount'] == 7500
+        assert categorizer.data['Notes'].tolist() == ['DEPOSIT', 'DEPOSIT RETURN', '', '', 'DEPOSIT RETURN', '']
+
+    def test_controlled_csv(self):
+        processor = _csv_processor(project_root / 'test_data' / 'test_data_controlled.csv')
+        categorizer = DepositCategorizer(processor)
+        categorizer.categorize_deposits()
+
+        assert len(categorizer.matched_deposits) == 15
+        assert categorizer.unmatched_deposits == []
+        assert categorizer.unmatched_returns == []
+        assert len(categorizer.miscellaneous_transactions) == 1
+        assert len(categorizer.deposit_issues) == 11
+        assert (categorizer.data['Notes'] == 'DEPOSIT (Matched)').sum() == 15
+        assert (categorizer.data['Notes'] == 'DEPOSIT RETURN (Matched)').sum() == 15
+
+
+def _greedy_reference(deposits, returns):
+    """Original quadratic greedy matcher, used to check the sweep matcher"""
+    deposits = sorted(deposits, key=lambda x: x['Date'])
+    returns = sorted(returns, key=lambda x: x['Date'])
+    used, pairs = set(), []
+    for deposit in deposits:
+        best, best_days = None, float('inf')
+        for i, ret in enumerate(returns):
+            days = (ret['Date'] - deposit['Date']).days
+            if i not in used and ret['Amount'] == deposit['Amount'] and 0 < days < best_days:
+                best, best_days = i, days
+        if best is not None:
+            used.add(best)
+            pairs.append((deposit['Index'], returns[best]['Index'], best_days))
+    return pairs
+
+
+def _best_assignment(deposits, returns):
+    """Exhaustive (pairs, total days) of the best assignment, for small inputs"""
+    best = (0, 0)
+
+    def search(i, used, pairs, days):
+        nonlocal best
+        if i == len(deposits):
+            if pairs > best[0] or (pairs == best[0] and days < best[1]):
+                best = (pairs, days)
+            return
+        search(i + 1, used, pairs, days)
+        for k, ret in enumerate(returns):
+            gap = (ret['Date'] - deposits[i]['Date']).days
+            if k not in used and ret['Amount'] == deposits[i]['Amount'] and gap > 0:
+                search(i + 1, used | {k}, pairs + 1, days + gap)
+
+    search(0, frozenset(), 0, 0)
+    return best
+
+
+class TestDepositMatching:
+    def _categorizer(self, size, matching='greedy'):
+        processor = BankStatementProcessor(None)
+        processor.processed_data = pd.DataFrame({'Notes': ['DEPOSIT'] * size})
+        return DepositCategorizer(processor, matching=matching)
+
+    def _transactions(self, seed, count):
+        rng = random.Random(seed)
+        start = pd.Timestamp('2023-01-01')
+        transactions = []
+        for index in range(count):
+            date = start + pd.Timedelta(days=rng.randint(0, 30), hours=rng.choice([0, 0, 0, 13]))
+            transactions.append({
+                'Index': index, 'Date': date, 'Transaction': f'T{index}', 'Amount': rng.choice([50.0, 100.0])
+            })
+        return transactions
+
+    def test_matches_greedy_reference(self):
+        for seed in range(50):
+            transactions = self._transactions(seed, 40)
+            deposits, returns = transactions[::2], transactions[1::2]
+            expected = _greedy_reference(deposits, returns)
+
+            categorizer = self._categorizer(40)
+            categorizer._match_deposits_returns(deposits, returns)
+            matched = [(m['Deposit_Index'], m['Return_Index'], m['Days_Between'])
+                       for m in categorizer.matched_deposits]
+
+            assert matched == expected
+            assert len(categorizer.unmatched_deposits) == len(deposits) - len(expected)
+            assert len(categorizer.unmatched_returns) == len(returns) - len(expected)
+
+    def test_closest_later_return_wins(self):
+        day = pd.Timestamp('2023-04-01')
+        deposits = [{'Index': 0, 'Date': day, 'Transaction': 'DEPOSIT', 'Amount': 50.0}]
+        returns = [
+            {'Index': 1, 'Date': day + pd.Timedelta(days=9), 'Transaction': 'LATE', 'Amount': 50.0},
+            {'Index': 2, 'Date': day, 'Transaction': 'SAME DAY', 'Amount': 50.0},
+            {'Index': 3, 'Date': day + pd.Timedelta(days=2), 'Transaction': 'CLOSEST', 'Amount': 50.0},
+            {'Index': 4, 'Date': day + pd.Timedelta(days=1), 'Transaction': 'OTHER AMOUNT', 'Amount': 100.0},
+        ]
+        categorizer = self._categorizer(5)
+        categorizer._match_deposits_returns(deposits, returns)
+
+        assert categorizer.matched_deposits[0]['Return_Transaction'] == 'CLOSEST'
+        assert categorizer.matched_deposits[0]['Days_Between'] == 2
+        assert categorizer.data['Notes'].tolist() == [
+            'DEPOSIT (Matched)', 'DEPOSIT', 'DEPOSIT', 'DEPOSIT (Matched)', 'DEPOSIT'
+        ]
+
+    def test_optimal_mode_minimizes_total_gap(self):
+        day = pd.Timestamp('2023-04-01')
+        deposits = [
+            {'Index': 0, 'Date': day, 'Transaction': 'EARLY DEPOSIT', 'Amount': 50.0},
+            {'Index': 1, 'Date': day + pd.Timedelta(days=3), 'Transaction': 'LATE DEPOSIT', 'Amount': 50.0},
+        ]
+        returns = [{'Index': 2, 'Date': day + pd.Timedelta(days=5), 'Transaction': 'RETURN', 'Amount': 50.0}]
+        categorizer = self._categorizer(3, matching='optimal')
+        categorizer._match_deposits_returns(deposits, returns)
+
+        assert categorizer.matched_deposits[0]['Deposit_Transaction'] == 'LATE DEPOSIT'
+        assert [deposit['Transaction'] for deposit in categorizer.unmatched_deposits] == ['EARLY DEPOSIT']
+        assert categorizer.matching_summary == {
+            'greedy': {'pairs': 1, 'total_days': 5},
+            'optimal': {'pairs': 1, 'total_days': 2}
+        }
+
+    def test_optimal_matches_exhaustive_search(self):
+        for seed in range(100):
+            transactions = self._transactions(seed, 10)
+            for transaction in transactions:
+                transaction['Date'] = transaction['Date'].normalize()
+            deposits, returns = transactions[::2], transactions[1::2]
+            expected = _best_assignment(deposits, returns)
+
+            categorizer = self._categorizer(10, matching='optimal')
+            categorizer._match_deposits_returns(deposits, returns)
+            total_days = sum(m['Days_Between'] for m in categorizer.matched_deposits)
+
+            assert (len(categorizer.matched_deposits), total_days) == expected
+            assert categorizer.matching_summary['optimal']['pairs'] >= categorizer.matching_summary['greedy']['pairs']
+
+    def test_unknown_matching_mode(self):
+        with pytest.raises(ValueError):
+            self._categorizer(1, matching='best')
+
+    def test_many_deposits(self):
+        start = pd.Timestamp('2020-01-01')
+        count = 20000
+        deposits = [{'Index': i, 'Date': start + pd.Timedelta(days=i // 10), 'Transaction': f'D{i}',
+                     'Amount': 50.0 if i % 2 else 100.0} for i in range(count)]
+        returns = [{'Index': count + i, 'Date': start + pd.Timedelta(days=i // 10 + 7), 'Transaction': f'R{i}',
+                    'Amount': 50.0 if i % 2 else 100.0} for i in range(count)]
+        categorizer = self._categorizer(2 * count)
+        categorizer._match_deposits_returns(deposits, returns)
+
+        assert len(categorizer.matched_deposits) == count
+        assert {m['Days_Between'] for m in categorizer.matched_deposits} == {7}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src import duplicates
+from src.bank_statement_processor import BankStatementProcessor
+from src.duplicates import find_duplicates
+
+HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+
+class TestDuplicateDetection:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        # Two statements whose periods overlap on 01-02 Nov
+        self.oct_sheet = [
+            HEADERS,
+            ['30 Oct 24', 'RENT', '', '500.00', '1500.00', '', ''],
+            ['01 Nov 24', 'TESCO STORE', '', '10.00', '1490.00', '', ''],
+            ['01 Nov 24', 'TESCO STORE', '', '10.00', '1480.00', '', ''],
+        ]
+        self.nov_sheet = [
+            HEADERS,
+            ['01 Nov 24', 'TESCO STORE', '', '10.00', '1490.00', 'tesco', 'Groceries'],
+            ['01 Nov 24', 'TESCO STORE', '', '10.00', '1480.00', '', ''],
+            ['05 Nov 24', 'DEPOSIT ROOM 7', '50.00', '', '1530.00', '', ''],
+        ]
+
+    def test_pointer_to_original(self):
+        frame = pd.DataFrame({
+            'Date': ['01', '02', '01', '01'],
+            'Transaction': ['A', 'B', 'A', 'A'],
+            'Source_Sheet': ['Oct', 'Oct', 'Nov', 'Dec'],
+            'Source_Row': [2, 3, 2, 5]
+        }, index=[10, 11, 12, 13])
+        result = find_duplicates(frame, ['Date', 'Transaction'])
+
+        assert result['Duplicate_Of'].tolist() == [pd.NA, pd.NA, 10, 10]
+        assert result['Duplicate_Of_Sheet'].tolist()[2:] == ['Oct', 'Oct']
+        assert result['Duplicate_Of_Row'].tolist()[2:] == [2, 2]
+        assert result['Fingerprint'].dtype == np.uint64
+        assert result.loc[10, 'Fingerprint'] == result.loc[13, 'Fingerprint']
+
+    def test_hash_collision_is_not_a_duplicate(self, monkeypatch):
+        frame = pd.DataFrame({'Date': ['01', '02'], 'Transaction': ['A', 'B']})
+        monkeypatch.setattr(duplicates, 'fingerprint',
+                            lambda frame, columns: pd.Series(np.uint64(7), index=frame.index))
+
+        assert find_duplicates(frame, ['Date', 'Transaction'])['Duplicate_Of'].isna().all()
+
+    def test_overlapping_statements(self):
+        processor = BankStatementProcessor(None)
+        processor.combine_sheets([
+            processor.process_sheet(self.oct_sheet, '02_Oct_2024_to_01_Nov_2024'),
+            processor.process_sheet(self.nov_sheet, '01_Nov_2024_to_01_Dec_2024'),
+        ])
+
+        # Same-day purchases with different balances are both real; the overlap is dropped
+        assert processor.processed_data['Source_Sheet'].tolist() == ['02_Oct_2024_to_01_Nov_2024'] * 3 + \
+            ['01_Nov_2024_to_01_Dec_2024']
+        removed = processor.removed_rows
+        assert removed['Removal_Reason'].tolist() == ['Duplicate Transaction'] * 2
+        assert removed['Source_Row'].tolist() == [2, 3]
+        assert removed['Duplicate_Of_Sheet'].tolist() == ['02_Oct_2024_to_01_Nov_2024'] * 2
+        assert removed['Duplicate_Of_Row'].tolist() == [3, 4]
+        assert removed['Withdrawn (£)'].tolist() == [10.0, 10.0]
+
+    def test_removed_amounts_share_one_representation(self):
+        self.nov_sheet.append(['06 Nov 24', 'DIRECT DEBIT METRO BANK', '', '£1,000.00', '530.00', '', ''])
+        processor = BankStatementProcessor(None)
+        processor.combine_sheets([
+            processor.process_sheet(self.oct_sheet, '02_Oct_2024_to_01_Nov_2024'),
+            processor.process_sheet(self.nov_sheet, '01_Nov_2024_to_01_Dec_2024'),
+        ])
+
+        removed = processor.removed_rows
+        assert removed['Removal_Reason'].tolist() == ['Metro Bank DD'] + ['Duplicate Transaction'] * 2
+        for column in ['Paid In (£)', 'Withdrawn (£)', 'Balance (£)']:
+            assert removed[column].dtype == 'float64'
+        assert removed['Withdrawn (£)'].tolist() == [1000.0, 10.0, 10.0]
+        assert removed['Balance (£)'].tolist() == [530.0, 1490.0, 1480.0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,108 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.bank_statement_processor import BankStatementProcessor
+from src.excel_export import StreamingExcelWriter
+from src.deposit_categorizer import DepositCategorizer
+
+HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+
+def _sheet_rows(path, sheet_name):
+    workbook = load_workbook(path, read_only=True)
+    rows = [list(row) for row in workbook[sheet_name].iter_rows(values_only=True)]
+    workbook.close()
+    return rows
+
+
+class TestStreamingExcelExport:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.processor = BankStatementProcessor(None)
+        jan = self.processor.process_sheet([
+            HEADERS,
+            ['15 Jan 23', 'TESCO STORE', '', '10.00', '90.00', '', ''],
+            ['02 Jan 23', 'DEPOSIT ROOM 7', '50.00', '', '100.00', '', ''],
+            ['03 Jan 23', 'Balance brought forward', '', '', '100.00', '', ''],
+        ], 'Sheet_Jan')
+        feb = self.processor.process_sheet([
+            HEADERS,
+            ['01 Feb 23', 'SHELL FUELS', '', '20.00', '70.00', '', ''],
+        ], 'Sheet_Feb')
+        self.processor.combine_sheets([jan, feb])
+
+    def test_chunked_frame_matches_pandas(self):
+        frame = pd.DataFrame({
+            'Text': [f'row {i}' for i in range(25)],
+            'Amount': np.arange(25) / 4,
+            'Missing': [np.nan if i % 3 else 1.5 for i in range(25)],
+            'Count': np.arange(25, dtype='int64')
+        })
+        output_file = self.tmp_path / 'chunks.xlsx'
+        with StreamingExcelWriter(output_file, chunk_size=7) as writer:
+            writer.write_frame('Data', frame)
+
+        expected = pd.read_excel(output_file, sheet_name='Data')
+        pd.testing.assert_frame_equal(expected, frame)
+
+    def test_export_to_excel(self):
+        output_file = self.tmp_path / 'processed.xlsx'
+        self.processor.export_to_excel(output_file)
+
+        transactions = _sheet_rows(output_file, 'Transactions')
+        assert transactions[0] == list(self.processor.processed_data.columns)
+        assert [row[0] for row in transactions[1:]] == ['02/01/2023', '15/01/2023', '01/02/2023']
+
+        summary = dict(_sheet_rows(output_file, 'Summary')[1:])
+        assert summary['Total Transactions'] == 3
+        assert summary['Date Range Start'] == '02/01/2023'
+        assert summary['Date Range End'] == '01/02/2023'
+        assert summary['Net Position'] == '£20.00'
+
+        sheet_summary = _sheet_rows(output_file, 'Sheet_Summary')
+        assert sheet_summary[1:] == [['Sheet_Feb', 1, 0, 20, -20], ['Sheet_Jan', 2, 50, 10, 40]]
+
+    def test_export_removed_rows(self):
+        output_file = self.tmp_path / 'removed.xlsx'
+        self.processor.export_removed_rows(output_file)
+
+        workbook = load_workbook(output_file, read_only=True)
+        assert workbook.sheetnames == ['All_Removed_Rows', 'Removal_Summary', 'Sheet_Wise_Summary', 'Balance_Forward']
+        workbook.close()
+        removed = _sheet_rows(output_file, 'All_Removed_Rows')
+        assert removed[1][0] == '03/01/2023'
+        assert removed[1][-1] == 'Balance Forward'
+
+    def test_deposit_issues_mixing_amounts_and_timing(self):
+        processor = BankStatementProcessor(None)
+        processor.combine_sheets([processor.process_sheet([
+            HEADERS,
+            ['02 Jan 23', 'DEPOSIT ROOM 7', '50.00', '', '50.00', '', ''],
+            ['05 Jan 23', 'DEPOSIT ROOM 9', '45.00', '', '95.00', '', ''],
+            ['20 Mar 23', 'DEPOSIT RETURN ROOM 7', '', '50.00', '45.00', '', ''],
+        ], 'Sheet_Q1')])
+        deposits = DepositCategorizer(processor)
+        deposits.categorize_deposits()
+        output_file = self.tmp_path / 'deposits.xlsx'
+        deposits.export_deposit_analysis(output_file)
+
+        issues = _sheet_rows(output_file, 'Issues')
+        amount = issues[0].index('Amount')
+        # The amount issue is in pounds; the timing issue has no amount
+        assert [row[amount] for row in issues[1:]] == [45, None]
+        assert [row[issues[0].index('Issue')] for row in issues[1:]] == [
+            'Non-standard amount with deposit keyword', 'Return delayed (more than 30 days)'
+        ]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,140 @@
+import sys
+from pathlib import Path
+import gspread
+import pytest
+from google.auth.credentials import AnonymousCredentials
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.fake_sheets import FakeSheetsClient, load_fixtures, write_fixtures
+from src.google_sheets_connection import GoogleSheetsConnection
+from src.rate_limiter import AdaptiveRateLimiter
+from src.http_session import tuned_session
+
+HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestFakeSheets:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.sheets = {
+            'Sheet1': [HEADERS,
+                       ['01/06/2023', 'TESCO STORES', '', '20.00', '980.00', 'old note', 'Groceries'],
+                       ['02/06/2023', 'DEPOSIT ROOM 7', '50.00', '', '1,030.00', '', '']],
+            'Keyword Mapping': [['Keyword', 'Subcategory'], ['tesco', 'Groceries']]
+        }
+
+    def _connection(self, client):
+        return GoogleSheetsConnection('unused.json', requests_per_minute=600_000, burst=1_000, client=client)
+
+    def test_fixtures_round_trip(self, tmp_path):
+        for format in ('csv', 'parquet'):
+            write_fixtures(tmp_path / format, {'sheet-id': self.sheets}, format=format)
+            assert load_fixtures(tmp_path / format) == {'sheet-id': self.sheets}
+
+    def test_worksheet_calls(self):
+        client = FakeSheetsClient({'sheet-id': self.sheets})
+        spreadsheet = client.open_by_key('sheet-id')
+        worksheet = spreadsheet.worksheet('Sheet1')
+
+        assert worksheet.row_values(1) == HEADERS
+        worksheet.batch_clear(['F2:F', 'G2:G'])
+        worksheet.update('F3', [['DEPOSIT', 'Deposit']])
+        assert [row[5:] for row in worksheet.get_all_values()[1:]] == [['', ''], ['DEPOSIT', 'Deposit']]
+
+        new_sheet = spreadsheet.add_worksheet(title='Level_1', rows=10, cols=5)
+        new_sheet.update([['a', 'b'], ['c']])
+        assert spreadsheet.values_get("'Level_1'")['values'] == [['a', 'b'], ['c']]
+        with pytest.raises(gspread.exceptions.WorksheetNotFound):
+            spreadsheet.worksheet('Missing')
+        assert client.calls['worksheet'] == 2
+
+    def test_connection_fetches_through_fake(self):
+        client = FakeSheetsClient({'sheet-id': self.sheets})
+        connection = self._connection(client)
+
+        results, errors = connection.fetch_sheets('sheet-id', ['Sheet1', 'Missing'])
+        assert results == {'Sheet1': self.sheets['Sheet1']}
+        assert 'Missing' in errors
+        assert connection.load_keyword_mapping('sheet-id', 'Keyword Mapping')['Keyword'].tolist() == ['tesco']
+
+        data = connection.get_sheet_values('sheet-id', 'Sheet1')
+        assert data == self.sheets['Sheet1']
+
+    def test_injected_rate_limits_are_retried(self):
+        clock = _FakeClock()
+        client = FakeSheetsClient({'sheet-id': self.sheets}, latency=0.25, error_rate=0.3, retry_after=2,
+                                  seed=1, clock=clock, sleep=clock.sleep)
+        connection = self._connection(client)
+        connection.rate_limiter = AdaptiveRateLimiter(rate=100.0, capacity=50, clock=clock, sleep=clock.sleep)
+
+        for _ in range(5):
+            results, errors = connection.fetch_sheets('sheet-id', ['Sheet1'], batch=False)
+            assert results == {'Sheet1': self.sheets['Sheet1']} and not errors
+        limiter = connection.rate_limiter.metrics()
+        assert client.throttled > 0
+        assert limiter['throttled'] == client.throttled
+        assert limiter['requests'] == sum(client.calls.values())
+        # Every 429 paused all requests for its Retry-After
+        assert limiter['total_pause_seconds'] == 2 * client.throttled
+        assert clock.now == pytest.approx(0.25 * limiter['requests'] + limiter['total_wait_seconds'])
+
+    def test_final_rate_limit_still_slows_limiter(self):
+        clock = _FakeClock()
+        client = FakeSheetsClient({'sheet-id': self.sheets}, error_rate=1.0, retry_after=2,
+                                  clock=clock, sleep=clock.sleep)
+        connection = self._connection(client)
+        connection.rate_limiter = AdaptiveRateLimiter(rate=100.0, capacity=50, clock=clock, sleep=clock.sleep)
+
+        with pytest.raises(Exception, match='RESOURCE_EXHAUSTED'):
+            connection.get_sheet_values('sheet-id', 'Sheet1')
+        # Every 429 counts, including the last of each request's attempts
+        limiter = connection.rate_limiter.metrics()
+        assert client.throttled >= connection.max_retries
+        assert limiter['throttled'] == client.throttled
+        assert limiter['total_pause_seconds'] == 2 * client.throttled
+
+    def test_quota_rejects_with_retry_after(self):
+        clock = _FakeClock()
+        client = FakeSheetsClient({'sheet-id': self.sheets}, requests_per_minute=2, clock=clock)
+
+        client.open_by_key('sheet-id')
+        clock.now = 20
+        client.open_by_key('sheet-id')
+        with pytest.raises(gspread.exceptions.APIError) as error:
+            client.open_by_key('sheet-id')
+        assert 'RESOURCE_EXHAUSTED' in str(error.value)
+        assert error.value.response.headers['Retry-After'] == '40'
+
+        clock.now = 60
+        client.open_by_key('sheet-id')
+        assert client.throttled == 1
+
+    def test_tuned_session(self):
+        session = tuned_session(AnonymousCredentials(), pool_size=8)
+        adapter = session.get_adapter('https://sheets.googleapis.com')
+
+        assert adapter._pool_maxsize == 8 and adapter._pool_block
+        assert session.headers['Accept-Encoding'] == 'gzip'
+        assert 'gzip' in session.headers['User-Agent']
+        with pytest.raises(ValueError):
+            tuned_session(AnonymousCredentials(), pool_size=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
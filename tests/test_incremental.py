@@ -0,0 +1,97 @@
+import sys
+from pathlib import Path
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.bank_statement_processor import BankStatementProcessor
+from src.categorisation import Categorisation
+from src.incremental_processor import IncrementalProcessor
+from tests.test_batch_fetch import HEADERS, _FakeConnection
+
+
+def _statement(month):
+    return [
+        HEADERS,
+        [f'01 {month} 23', 'TESCO STORE', '', '10.00', '100.00', '', ''],
+        [f'02 {month} 23', 'DEPOSIT ROOM 7', '50.00', '', '150.00', '', ''],
+        [f'03 {month} 23', 'SHELL TESCO FUEL', '', '20.00', '130.00', '', ''],
+        [f'04 {month} 23', 'Balance brought forward', '', '', '130.00', '', ''],
+    ]
+
+
+class TestIncrementalProcessing:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.months = ['Jan', 'Feb', 'Mar']
+        self.sheets = {f'Sheet_{month}': _statement(month) for month in self.months}
+        self.sheets['Keyword Mapping'] = [
+            ['Keyword', 'Subcategory'], ['TESCO', 'Groceries'], ['SHELL', 'Fuel'], ['DEPOSIT', 'Deposits']
+        ]
+        self.sheets_file = tmp_path / 'sheets.txt'
+        self.sheets_file.write_text('\n'.join(f'Sheet_{month}' for month in self.months))
+        self.store_dir = tmp_path / 'processed'
+
+    def _run_incremental(self):
+        processor = BankStatementProcessor(_FakeConnection(self.sheets))
+        categorizer = Categorisation(processor)
+        runner = IncrementalProcessor(processor, categorizer, str(self.store_dir))
+        data = runner.run('sheet-id', str(self.sheets_file), 'Keyword Mapping')
+        return runner, processor, categorizer, data
+
+    def _run_full(self):
+        processor = BankStatementProcessor(_FakeConnection(self.sheets))
+        processor.process_all_statements('sheet-id', str(self.sheets_file))
+        categorizer = Categorisation(processor)
+        data = categorizer.apply_categorization('sheet-id', 'Keyword Mapping')
+        return processor, categorizer, data
+
+    def test_only_changed_sheets_are_reprocessed(self):
+        runner, _, _, _ = self._run_incremental()
+        assert runner.reprocessed_sheets == ['Sheet_Jan', 'Sheet_Feb', 'Sheet_Mar']
+
+        runner, _, _, _ = self._run_incremental()
+        assert runner.reprocessed_sheets == []
+        assert runner.reused_sheets == ['Sheet_Jan', 'Sheet_Feb', 'Sheet_Mar']
+
+        self.sheets['Sheet_Feb'].append(['05 Feb 23', 'SHELL FUELS', '', '5.00', '125.00', '', ''])
+        runner, _, _, _ = self._run_incremental()
+        assert runner.reprocessed_sheets == ['Sheet_Feb']
+
+    def test_written_back_categorization_is_not_a_change(self):
+        _, _, _, data = self._run_incremental()
+        # Write-back fills Notes/Subcategory in the source sheets
+        for month in self.months:
+            self.sheets[f'Sheet_{month}'][1][5:] = ['tesco', 'Groceries']
+
+        runner, _, _, reused = self._run_incremental()
+        assert runner.reprocessed_sheets == []
+        pd.testing.assert_frame_equal(reused[['Notes', 'Subcategory']], data[['Notes', 'Subcategory']])
+
+    def test_mapping_change_reprocesses_everything(self):
+        self._run_incremental()
+        self.sheets['Keyword Mapping'].append(['FUEL', 'Fuel'])
+        runner, _, _, data = self._run_incremental()
+
+        assert runner.reprocessed_sheets == ['Sheet_Jan', 'Sheet_Feb', 'Sheet_Mar']
+        assert (data['Notes'] == 'tesco, shell, fuel').sum() == 3
+
+    def test_merged_result_matches_full_run(self):
+        self._run_incremental()
+        self.sheets['Sheet_Mar'][1][1] = 'TESCO EXTRA'
+        _, processor, categorizer, data = self._run_incremental()
+        full_processor, full_categorizer, full_data = self._run_full()
+
+        pd.testing.assert_frame_equal(processor.processed_data, full_processor.processed_data)
+        pd.testing.assert_frame_equal(data, full_data)
+        pd.testing.assert_frame_equal(processor.removed_rows, full_processor.removed_rows)
+        assert categorizer.categorization_issues == full_categorizer.categorization_issues
+        assert len(categorizer.categorization_issues) == 3
+        assert processor.date_formats == full_processor.date_formats
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.keyword_matcher import KeywordMatcher
+from src.categorisation import Categorisation
+
+
+class _MappingConnection:
+    """Minimal connection returning a fixed keyword mapping"""
+    def __init__(self, mapping_df):
+        self.mapping_df = mapping_df
+
+    def load_keyword_mapping(self, spreadsheet_id, sheet_name):
+        return self.mapping_df.copy()
+
+
+class _Processor:
+    def __init__(self, processed_data, gs_connection):
+        self.processed_data = processed_data
+        self.gs_connection = gs_connection
+
+
+def _naive_categorisation(data, mapping_df):
+    """Reference implementation of the original nested keyword loop"""
+    notes, subcategories = {}, {}
+    for index, row in data.iterrows():
+        transaction = str(row['Transaction']).upper()
+        found_keywords, found_subcategories = [], []
+        for _, mapping in mapping_df.iterrows():
+            if str(mapping['Keyword']).upper() in transaction:
+                found_keywords.append(mapping['Keyword'])
+                if mapping['Subcategory'] not in found_subcategories:
+                    found_subcategories.append(mapping['Subcategory'])
+        if found_keywords:
+            notes[index] = ', '.join(found_keywords)
+            subcategories[index] = ', '.join(found_subcategories)
+    return notes, subcategories
+
+
+class TestKeywordMatcher:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.mapping_df = pd.DataFrame({
+            'Keyword': ['tesco', 'amazon', 'amazon prime', 'shell', 'he', 'deposit'],
+            'Subcategory': ['Groceries', 'Shopping', 'Entertainment', 'Fuel', 'Other', 'Deposit']
+        })
+        self.data = pd.read_csv(project_root / 'test_data' / 'test_data_controlled.csv')
+        self.data['Source_Sheet'] = 'Test_Data_Controlled'
+
+    def test_find_overlapping_keywords(self):
+        matcher = KeywordMatcher(['he', 'she', 'his', 'hers'])
+        assert matcher.find('ushers') == [0, 1, 3]
+        assert matcher.find('USHERS') == [0, 1, 3]
+        assert matcher.find('nothing here') == [0]
+        assert matcher.find('xyz') == []
+
+    def test_find_reports_each_keyword_once(self):
+        matcher = KeywordMatcher(['ab', 'b'])
+        assert matcher.find('ababab') == [0, 1]
+
+    def test_empty_keyword_matches_everything(self):
+        matcher = KeywordMatcher(['', 'tesco'])
+        assert matcher.find('SHELL') == [0]
+        assert matcher.find('TESCO') == [0, 1]
+
+    def test_match_series_matches_naive_scan(self):
+        matcher = KeywordMatcher.from_mapping(self.mapping_df)
+        matches = matcher.match_series(self.data['Transaction'])
+
+        for index, transaction in self.data['Transaction'].items():
+            expected = [
+                i for i, keyword in enumerate(self.mapping_df['Keyword'])
+                if keyword.upper() in str(transaction).upper()
+            ]
+            assert matches[index] == expected
+
+    def test_apply_categorization_matches_original_output(self):
+        processor = _Processor(self.data, _MappingConnection(self.mapping_df))
+        categorizer = Categorisation(processor)
+        result = categorizer.apply_categorization(None, 'Keyword Mapping')
+
+        notes, subcategories = _naive_categorisation(self.data, self.mapping_df)
+        for index in result.index:
+            if index in notes:
+                assert result.at[index, 'Notes'] == notes[index]
+                assert result.at[index, 'Subcategory'] == subcategories[index]
+            else:
+                # Unmatched rows are cleared rather than keeping earlier categorization
+                assert result.at[index, 'Notes'] == ''
+                assert result.at[index, 'Subcategory'] == ''
+
+        multiple = [i for i, s in subcategories.items() if ',' in s]
+        assert [issue['Row'] for issue in categorizer.categorization_issues] == [i + 2 for i in multiple]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,96 @@
+import sys
+from pathlib import Path
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+pytest.importorskip('pyarrow')
+
+from src.bank_statement_processor import BankStatementProcessor
+from src.deposit_categorizer import DepositCategorizer
+from src.parquet_export import write_parquet
+
+HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+
+class TestParquetExport:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.output_dir = tmp_path / 'parquet'
+        self.processor = BankStatementProcessor(None)
+        jan = self.processor.process_sheet([
+            HEADERS,
+            ['02 Jan 23', 'DEPOSIT ROOM 7', '50.00', '', '100.00', '', ''],
+            ['15 Jan 23', 'TESCO STORE', '', '10.00', '90.00', '', 'Groceries'],
+            ['16 Jan 23', 'Balance brought forward', '', '', '90.00', '', ''],
+        ], 'Sheet_Jan')
+        feb = self.processor.process_sheet([
+            HEADERS,
+            ['01 Feb 23', 'DEPOSIT RETURN ROOM 7', '', '50.00', '40.00', '', ''],
+        ], 'Sheet_Feb')
+        self.processor.combine_sheets([jan, feb])
+
+    def test_schema_and_round_trip(self):
+        written = self.processor.export_to_parquet(self.output_dir)
+        assert set(written) == {'processed_data', 'removed_rows'}
+        assert sorted(p.name for p in (self.output_dir / 'processed_data').iterdir()) == [
+            'Source_Sheet=Sheet_Feb', 'Source_Sheet=Sheet_Jan'
+        ]
+
+        data = pd.read_parquet(self.output_dir / 'processed_data')
+        assert str(data['Date'].dtype) == 'datetime64[ns]'
+        assert all(str(data[col].dtype) == 'float64' for col in ['Paid In (£)', 'Withdrawn (£)', 'Balance (£)'])
+        assert isinstance(data['Subcategory'].dtype, pd.CategoricalDtype)
+
+        expected = self.processor.processed_data.sort_values(['Source_Sheet', 'Date']).reset_index(drop=True)
+        data = data.sort_values(['Source_Sheet', 'Date']).reset_index(drop=True)
+        assert data['Transaction'].tolist() == expected['Transaction'].tolist()
+        assert data['Source_Sheet'].astype(str).tolist() == expected['Source_Sheet'].tolist()
+        # processed_data holds pence, the export pounds
+        assert data['Paid In (£)'].tolist() == (expected['Paid In (£)'] / 100).tolist()
+
+    def test_month_partitions_replace_previous_output(self):
+        self.processor.export_to_parquet(self.output_dir)
+        self.processor.export_to_parquet(self.output_dir, partition_by='month')
+
+        assert sorted(p.name for p in (self.output_dir / 'processed_data').iterdir()) == [
+            'Month=2023-01', 'Month=2023-02'
+        ]
+        assert len(pd.read_parquet(self.output_dir / 'processed_data')) == 3
+
+    def test_deposit_tables(self):
+        categorizer = DepositCategorizer(self.processor)
+        categorizer.categorize_deposits()
+        written = categorizer.export_deposit_parquet(self.output_dir / 'deposits')
+
+        matched = pd.read_parquet(written['Matched_Deposits'])
+        assert len(matched) == 1
+        assert str(matched['Deposit_Date'].dtype) == 'datetime64[ns]'
+        assert str(matched['Deposit_Amount'].dtype) == 'float64'
+
+    def test_formatted_removed_amounts(self):
+        processor = BankStatementProcessor(None)
+        sheet = processor.process_sheet([
+            HEADERS,
+            ['02 Jan 23', 'TESCO STORE', '', '£12.50', '1,087.50', '', ''],
+            ['03 Jan 23', 'Balance brought forward', '', '', '£1,087.50', '', ''],
+            ['not a date', 'RENT', '1,000.00', '', '2,087.50', '', ''],
+        ], 'Sheet_Jan')
+        processor.combine_sheets([sheet])
+        written = processor.export_to_parquet(self.output_dir)
+
+        removed = pd.read_parquet(written['removed_rows']).sort_values('Source_Row')
+        assert removed['Balance (£)'].tolist() == [1087.50, 2087.50]
+        assert removed['Paid In (£)'].tolist()[1] == 1000.00
+        assert pd.isna(removed['Paid In (£)'].tolist()[0])
+
+    def test_unknown_partitioning(self):
+        with pytest.raises(ValueError):
+            write_parquet(self.processor.processed_data, self.output_dir / 'x', partition_by='year')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -96,8 +96,8 @@ class TestProcessor:
             
             # Test data types
             assert pd.api.types.is_datetime64_dtype(processed_data['Date']), "Date column is not datetime"
-            assert processed_data['Paid In (£)'].dtype == float, "Paid In column is not float"
-            assert processed_data['Withdrawn (£)'].dtype == float, "Withdrawn column is not float"
+            assert processed_data['Paid In (£)'].dtype == 'int64', "Paid In column is not integer pence"
+            assert processed_data['Withdrawn (£)'].dtype == 'int64', "Withdrawn column is not integer pence"
             
         except Exception as e:
             pytest.fail(f"Bank statement processing test failed: {str(e)}")
@@ -147,7 +147,7 @@ class TestProcessor:
             deposits = deposit_handler.data[
                 deposit_handler.data['Deposit_Status'] == 'Deposit Collected'
             ]
-            assert all(amount in [50.0, 100.0] for amount in deposits['Paid In (£)']), \
+            assert all(amount in [5000, 10000] for amount in deposits['Paid In (£)']), \
                 "Invalid deposit amounts found"
             
             # Test deposit matching
@@ -0,0 +1,90 @@
+import sys
+from pathlib import Path
+import pytest
+from openpyxl import load_workbook
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.bank_statement_processor import BankStatementProcessor
+from src.reconciliation import reconcile_balances
+
+HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+
+class TestBalanceReconciliation:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.jan = [
+            HEADERS,
+            ['01 Jan 23', 'RENT', '', '10.00', '90.00', '', ''],
+            ['02 Jan 23', 'AIRBNB PAYOUT', '20.00', '', '110.00', '', ''],
+            ['03 Jan 23', 'TESCO STORE', '', '5.00', '105.00', '', ''],
+        ]
+        # Listed newest first, as some statements are
+        self.feb = [
+            HEADERS,
+            ['03 Feb 23', 'SHELL FUELS', '', '1.00', '103.00', '', ''],
+            ['01 Feb 23', 'TESCO STORE', '', '1.00', '104.00', '', ''],
+        ]
+
+    def _breaks(self, *sheets):
+        processor = BankStatementProcessor(None)
+        processor.combine_sheets([
+            processor.process_sheet(rows, name) for name, rows in sheets
+        ])
+        return processor, processor.balance_breaks
+
+    def test_clean_statements(self):
+        processor, breaks = self._breaks(('Jan', self.jan), ('Feb', self.feb))
+        assert breaks.empty
+
+        output_file = self.tmp_path / 'processed.xlsx'
+        processor.export_to_excel(output_file)
+        workbook = load_workbook(output_file, read_only=True)
+        assert 'Balance_Breaks' in workbook.sheetnames
+        workbook.close()
+
+    def test_break_types(self):
+        self.jan[3][4] = '115.00'                                         # balance went up on a payment
+        self.jan.append(['04 Jan 23', 'TESCO STORE', '', '5.00', '110.00', '', ''])   # booked fine
+        self.jan.append(['05 Jan 23', 'TESCO STORE', '', '5.00', '110.00', '', ''])   # balance unchanged
+        self.jan.append(['06 Jan 23', 'SHELL FUELS', '', '5.00', '80.00', '', ''])    # £25 unexplained
+        self.feb[2][4] = '70.00'                                          # Feb opens at 71.00, Jan closed at 80.00
+        self.feb[1][4] = '69.00'
+        _, breaks = self._breaks(('Jan', self.jan), ('Feb', self.feb))
+
+        assert breaks['Break_Type'].tolist() == ['Wrong Sign', 'Duplicated Row', 'Missing Rows', 'Sheet Gap']
+        assert breaks['Source_Row'].tolist() == [4, 6, 7, 3]
+        assert breaks['Difference (£)'].tolist() == [1000, 500, -2500, -900]
+        assert breaks['Expected Balance (£)'].tolist() == [10500, 10500, 10500, 7900]
+        assert breaks['Previous_Sheet'].tolist() == ['', '', '', 'Jan']
+
+    def test_removed_direct_debit_is_not_a_break(self):
+        # The removal rule drops the direct debit, but the balance still moved by it
+        self.jan = [
+            HEADERS,
+            ['01 Jan 23', 'RENT', '', '10.00', '90.00', '', ''],
+            ['02 Jan 23', 'AIRBNB PAYOUT', '20.00', '', '110.00', '', ''],
+            ['02 Jan 23', 'DIRECT DEBIT METRO BANK', '', '100.00', '10.00', '', ''],
+            ['03 Jan 23', 'DEPOSIT ROOM 7', '50.00', '', '60.00', '', ''],
+            ['03 Jan 23', 'TESCO STORE', '', '5.00', '55.00', '', ''],
+        ]
+        self.feb[1][4] = '53.00'
+        self.feb[2][4] = '54.00'
+        processor, breaks = self._breaks(('Jan', self.jan), ('Feb', self.feb))
+
+        assert processor.removed_rows['Removal_Reason'].tolist() == ['Metro Bank DD']
+        assert breaks.empty
+
+    def test_can_be_turned_off(self):
+        processor = BankStatementProcessor(None, reconcile=False)
+        processor.combine_sheets([processor.process_sheet(self.jan, 'Jan')])
+        assert processor.balance_breaks is None
+        assert reconcile_balances(processor.processed_data.iloc[0:0]).empty
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,81 @@
+import sys
+import json
+from pathlib import Path
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.removal_rules import RemovalRules
+from src.bank_statement_processor import BankStatementProcessor
+
+HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+
+class TestRemovalRules:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.worksheet_data = [
+            HEADERS,
+            ['03 Apr 23', 'Balance brought forward', '', '', '1,000.00', '', ''],
+            ['03 Apr 23', 'TESCO SUPERSTORE', '', '45.67', '954.33', '', ''],
+            ['', '', '', '', '', '', ''],
+            ['04 Apr 23', 'Direct Debit METRO BANK Y65YS7P', '', '10.00', '944.33', '', ''],
+            ['04 Apr 23', 'DEPOSIT ROOM 7', '50.00', '', '994.33', '', ''],
+            ['05 Apr 23', 'Closing balance', '', '', '994.33', '', ''],
+            ['not a date', 'SHELL FUELS', '', '20.00', '974.33', '', ''],
+        ]
+
+    def test_label_first_matching_reason(self):
+        df = pd.DataFrame(self.worksheet_data[1:], columns=self.worksheet_data[0])
+        labels = RemovalRules().label(df)
+        assert labels.tolist() == [
+            'Balance Forward', None, 'Empty Row', 'Metro Bank DD', None, 'Balance Forward', None
+        ]
+
+    def test_process_sheet_splits_rows(self):
+        processor = BankStatementProcessor(None)
+        df = processor.process_sheet(self.worksheet_data, 'Sheet_1')
+
+        assert df['Transaction'].tolist() == ['TESCO SUPERSTORE', 'DEPOSIT ROOM 7']
+        removed = processor.removed_rows
+        assert removed['Removal_Reason'].tolist() == [
+            'Balance Forward', 'Balance Forward', 'Metro Bank DD', 'Empty Row', 'Invalid Date'
+        ]
+        assert (removed['Source_Sheet'] == 'Sheet_1').all()
+
+    def test_removed_rows_accumulate_across_sheets(self):
+        processor = BankStatementProcessor(None)
+        processor.process_sheet(self.worksheet_data, 'Sheet_1')
+        processor.process_sheet(self.worksheet_data, 'Sheet_2')
+        assert len(processor.removed_rows) == 10
+        assert processor.removed_rows['Source_Sheet'].value_counts().to_dict() == {'Sheet_1': 5, 'Sheet_2': 5}
+
+    def test_rules_loaded_from_file(self, tmp_path):
+        rules_file = tmp_path / 'removal_patterns.json'
+        rules_file.write_text(json.dumps({'Supermarket': ['tesco', 'sainsbury']}))
+
+        processor = BankStatementProcessor(None, str(rules_file))
+        df = processor.process_sheet(self.worksheet_data, 'Sheet_1')
+
+        assert 'TESCO SUPERSTORE' not in df['Transaction'].tolist()
+        assert 'Balance brought forward' in df['Transaction'].tolist()
+        assert set(processor.removed_rows['Removal_Reason']) == {'Supermarket', 'Empty Row', 'Invalid Date'}
+
+    def test_bundled_rules_file_matches_defaults(self):
+        rules = RemovalRules.from_file(project_root / 'Text_files' / 'removal_patterns.json')
+        defaults = RemovalRules()
+        assert rules.reasons == defaults.reasons
+        assert [p.pattern for p in rules.rules.values()] == [p.pattern for p in defaults.rules.values()]
+
+    def test_invalid_pattern_rejected(self, tmp_path):
+        rules_file = tmp_path / 'removal_patterns.json'
+        rules_file.write_text(json.dumps({'Broken': ['(unclosed']}))
+        with pytest.raises(Exception, match='Invalid removal pattern'):
+            RemovalRules.from_file(rules_file)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
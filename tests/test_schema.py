@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.bank_statement_processor import BankStatementProcessor
+from src.deposit_categorizer import DepositCategorizer
+from src.schema import STRING_DTYPE, apply_compact_schema, editable_schema, memory_report, parse_pence, pounds_frame
+
+HEADERS = ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)', 'Balance (£)', 'Notes', 'Subcategory']
+
+
+class TestCompactSchema:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.processor = BankStatementProcessor(None)
+        jan = self.processor.process_sheet([
+            HEADERS,
+            ['01 Jan 23', 'ROOM DEPOSIT 7', '50.00', '', '150.00', '', ''],
+            ['02 Jan 23', 'TESCO STORE', '', '10.00', '140.00', '', ''],
+        ], 'Sheet_Jan')
+        feb = self.processor.process_sheet([
+            HEADERS,
+            ['01 Feb 23', 'DEPOSIT RETURN ROOM 7', '', '50.00', '90.00', '', ''],
+        ], 'Sheet_Feb')
+        self.processor.combine_sheets([jan, feb])
+
+        # Labelled by the keyword categorizer earlier in the run
+        data = editable_schema(self.processor.processed_data)
+        data.loc[data['Transaction'] == 'TESCO STORE', ['Notes', 'Subcategory']] = ['tesco', 'Groceries']
+        self.processor.processed_data = apply_compact_schema(data)
+
+    def test_processed_data_dtypes(self):
+        dtypes = self.processor.processed_data.dtypes
+        assert dtypes['Transaction'] == STRING_DTYPE
+        assert dtypes['Notes'] == STRING_DTYPE
+        assert isinstance(dtypes['Source_Sheet'], pd.CategoricalDtype)
+        assert list(dtypes['Source_Sheet'].categories) == ['Sheet_Feb', 'Sheet_Jan']
+        assert list(dtypes['Subcategory'].categories) == ['', 'Groceries']
+
+    def test_categorizer_adds_labels(self):
+        data = DepositCategorizer(self.processor).categorize_deposits()
+
+        assert isinstance(data['Subcategory'].dtype, pd.CategoricalDtype)
+        assert data['Subcategory'].tolist() == ['Deposit', 'Groceries', 'Deposit Return']
+        assert data['Notes'].tolist() == ['DEPOSIT (Matched)', 'tesco', 'DEPOSIT RETURN (Matched)']
+        pd.testing.assert_frame_equal(data, apply_compact_schema(data))
+
+    def test_money_in_pence(self):
+        data = self.processor.processed_data
+        assert data['Paid In (£)'].dtype == 'int64'
+        assert data['Paid In (£)'].tolist() == [5000, 0, 0]
+        assert data['Balance (£)'].tolist() == [15000, 14000, 9000]
+
+        pounds = pounds_frame(data)
+        assert pounds['Balance (£)'].tolist() == [150.0, 140.0, 90.0]
+        assert data['Balance (£)'].dtype == 'int64'
+
+    def test_parse_pence(self):
+        values = pd.Series(['£1,234.50', '', '50', '-12.3', '.05', '0.10', '1e3', 'n/a', None])
+        assert parse_pence(values).tolist() == [123450, 0, 5000, -1230, 5, 10, 100000, 0, 0]
+
+    def test_memory_report(self):
+        frame = pd.DataFrame({
+            'Transaction': [f'Card Purchase {i}' for i in range(1000)],
+            'Source_Sheet': ['Sheet_Jan', 'Sheet_Feb'] * 500
+        })
+        before = memory_report(frame)
+        after = memory_report(apply_compact_schema(frame))
+
+        assert before['Total'] == before.drop('Total').sum()
+        assert after['Source_Sheet'] < before['Source_Sheet'] / 4
+        assert after['Total'] < before['Total']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,145 @@
+import sys
+from pathlib import Path
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.sheet_cache import SheetCache
+from src.google_sheets_connection import GoogleSheetsConnection
+from src.fake_sheets import FakeSheetsClient
+from tests.test_batch_fetch import HEADERS, _FakeValuesSpreadsheet, _statement
+
+
+class _FakeDriveResponse:
+    def __init__(self, body):
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class _FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self.modified_time = '2024-12-31T10:00:00.000Z'
+        self.drive_calls = 0
+
+    def open_by_key(self, spreadsheet_id):
+        return self.spreadsheet
+
+    def request(self, method, endpoint, params=None, **kwargs):
+        self.drive_calls += 1
+        return _FakeDriveResponse({'modifiedTime': self.modified_time})
+
+
+class _CachedConnection(GoogleSheetsConnection):
+    def __init__(self, sheets, cache_dir, offline=False):
+        self._sheets = sheets
+        super().__init__('unused.json', requests_per_minute=6000, burst=50,
+                         cache_dir=cache_dir, offline=offline)
+
+    def _setup_connection(self):
+        return _FakeClient(_FakeValuesSpreadsheet(self._sheets))
+
+
+class TestSheetCache:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.cache_dir = tmp_path / 'cache'
+        self.sheets = {f'Sheet_{month}': _statement(month) for month in ['Jan', 'Feb', 'Mar']}
+        self.sheets['Keyword Mapping'] = [['Keyword', 'Subcategory'], ['TESCO', 'Groceries']]
+
+    def test_put_and_get(self):
+        cache = SheetCache(self.cache_dir)
+        assert cache.put('sheet-id', 'Sheet_Jan', self.sheets['Sheet_Jan'], 'T1') is True
+        assert cache.put('sheet-id', 'Sheet_Jan', self.sheets['Sheet_Jan'], 'T2') is False
+
+        reopened = SheetCache(self.cache_dir)
+        assert reopened.get('sheet-id', 'Sheet_Jan') == self.sheets['Sheet_Jan']
+        assert reopened.get('sheet-id', 'Sheet_Jan', modified_time='T2') == self.sheets['Sheet_Jan']
+        assert reopened.get('sheet-id', 'Sheet_Jan', modified_time='T1') is None
+        assert reopened.get('other-id', 'Sheet_Jan') is None
+        assert reopened.content_hash('sheet-id', 'Sheet_Jan') == SheetCache.hash_rows(self.sheets['Sheet_Jan'])
+
+    def test_skips_download_when_unchanged(self):
+        names = list(self.sheets)[:3]
+        connection = _CachedConnection(self.sheets, self.cache_dir)
+        first, _ = connection.fetch_sheets('sheet-id', names)
+        assert len(connection.client.spreadsheet.batch_get_calls) == 1
+
+        # New run, same modifiedTime: no values calls at all
+        connection = _CachedConnection(self.sheets, self.cache_dir)
+        second, errors = connection.fetch_sheets('sheet-id', names)
+        assert second == first
+        assert errors == {}
+        assert connection.client.spreadsheet.batch_get_calls == []
+
+        # Spreadsheet modified: sheets are downloaded again
+        connection = _CachedConnection(self.sheets, self.cache_dir)
+        connection.client.modified_time = '2025-01-01T09:00:00.000Z'
+        connection.fetch_sheets('sheet-id', names)
+        assert len(connection.client.spreadsheet.batch_get_calls) == 1
+
+    def test_own_writes_keep_cache_valid(self):
+        names = ['Sheet_Jan', 'Sheet_Feb', 'Sheet_Mar']
+        client = FakeSheetsClient({'sheet-id': self.sheets})
+
+        def connect(cache_dir=self.cache_dir):
+            return GoogleSheetsConnection('unused.json', requests_per_minute=600_000, burst=1_000,
+                                          cache_dir=cache_dir, client=client)
+
+        def values_calls():
+            return client.calls['values_batch_get'] + client.calls['get_all_values']
+
+        connection = connect()
+        connection.fetch_sheets('sheet-id', names)
+        categorized = pd.DataFrame({'Source_Sheet': ['Sheet_Jan'], 'Source_Row': [2],
+                                    'Notes': ['tesco'], 'Subcategory': ['Groceries']})
+        connection.write_categorization_back('sheet-id', categorized, {'Sheet_Jan': {'headers': HEADERS, 'rows': 3}})
+
+        # Next run: the write-back changed modifiedTime, yet nothing is downloaded again
+        calls = values_calls()
+        cached, _ = connect().fetch_sheets('sheet-id', names)
+        assert values_calls() == calls
+        fresh, _ = connect(cache_dir=None).fetch_sheets('sheet-id', names)
+        assert cached == fresh
+        assert cached['Sheet_Jan'][1][5:] == ['tesco', 'Groceries']
+
+        # A sheet rewritten in full is fetched again, the others still come from the cache
+        connection = connect()
+        worksheet = client.open_by_key('sheet-id').worksheet('Sheet_Feb')
+        connection.write_dataframe('sheet-id', worksheet, pd.DataFrame([['x', 'y']], columns=['A', 'B']))
+        calls = dict(client.calls)
+        results, _ = connect().fetch_sheets('sheet-id', names)
+        assert results['Sheet_Feb'] == [['A', 'B'], ['x', 'y']]
+        assert client.calls['values_batch_get'] == calls.get('values_batch_get', 0) + 1
+
+        # Someone else's edit still invalidates everything
+        client.open_by_key('sheet-id').touch()
+        calls = values_calls()
+        connect().fetch_sheets('sheet-id', names)
+        assert values_calls() > calls
+
+    def test_offline_mode_reads_cache_only(self):
+        names = list(self.sheets)
+        _CachedConnection(self.sheets, self.cache_dir).fetch_sheets('sheet-id', names)
+
+        offline = _CachedConnection({}, self.cache_dir, offline=True)
+        assert offline.client is None
+        results, errors = offline.fetch_sheets('sheet-id', names + ['Sheet_Apr'])
+        assert list(results) == names
+        assert list(errors) == ['Sheet_Apr']
+
+        mapping = offline.load_keyword_mapping('sheet-id', 'Keyword Mapping')
+        assert mapping['Keyword'].tolist() == ['tesco']
+
+    def test_offline_requires_cache_dir(self):
+        with pytest.raises(ValueError):
+            GoogleSheetsConnection('unused.json', offline=True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,131 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from gspread.utils import a1_range_to_grid_range
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.sheet_writeback import diff_ranges, to_sheet_values, write_dataframe
+
+
+class _FakeSpreadsheet:
+    """Local fake of values get/batchUpdate holding one sheet's unformatted values"""
+    def __init__(self, values):
+        self.values = [list(row) for row in values]
+        self.get_calls = 0
+        self.update_bodies = []
+
+    def values_get(self, range_name, params=None):
+        self.get_calls += 1
+        return {'range': range_name, 'values': [list(row) for row in self.values]}
+
+    def values_batch_update(self, body=None):
+        self.update_bodies.append(body)
+        for entry in body['data']:
+            grid = a1_range_to_grid_range(entry['range'].split('!')[1])
+            for row_offset, row in enumerate(entry['values']):
+                row_index = grid['startRowIndex'] + row_offset
+                while len(self.values) <= row_index:
+                    self.values.append([])
+                target = self.values[row_index]
+                for col_offset, value in enumerate(row):
+                    col_index = grid['startColumnIndex'] + col_offset
+                    target.extend([''] * (col_index + 1 - len(target)))
+                    target[col_index] = value
+        # Drop trailing blanks like the real API does on read
+        self.values = [self._trim(row) for row in self.values]
+        while self.values and not self.values[-1]:
+            self.values.pop()
+
+    @staticmethod
+    def _trim(row):
+        row = list(row)
+        while row and row[-1] == '':
+            row.pop()
+        return row
+
+
+class _FakeWorksheet:
+    def __init__(self, values, rows=1000, cols=26):
+        self.title = 'Level_1'
+        self.spreadsheet = _FakeSpreadsheet(values)
+        self.row_count = rows
+        self.col_count = cols
+        self.resizes = []
+
+    def resize(self, rows=None, cols=None):
+        self.resizes.append((rows, cols))
+        self.row_count, self.col_count = rows, cols
+
+
+class TestSheetWriteback:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.df = pd.DataFrame({
+            'Date': ['10 Jun 23', '11 Jun 23', '12 Jun 23'],
+            'Transaction': ['TESCO', 'DEPOSIT ROOM 7', 'SHELL'],
+            'Paid In (£)': [np.nan, 50.0, np.nan],
+            'Withdrawn (£)': [20.0, np.nan, 15.5],
+            'Notes': ['', '', '']
+        })
+
+    def test_cell_values(self):
+        rows = to_sheet_values(self.df.assign(When=pd.to_datetime(['2023-06-10', '2023-06-11', None])))
+        assert rows[0][-1] == 'When'
+        assert rows[1] == ['10 Jun 23', 'TESCO', '', 20.0, '', '2023-06-10']
+        assert rows[3][-1] == ''
+
+    def test_unchanged_sheet_sends_nothing(self):
+        worksheet = _FakeWorksheet(to_sheet_values(self.df))
+        stats = write_dataframe(worksheet, self.df)
+
+        assert stats['ranges'] == 0
+        assert worksheet.spreadsheet.update_bodies == []
+        assert worksheet.spreadsheet.get_calls == 1
+
+    def test_only_changed_blocks_are_sent(self):
+        worksheet = _FakeWorksheet(to_sheet_values(self.df))
+        # Sheet reads numbers back as ints when they are whole
+        worksheet.spreadsheet.values[1][3] = 20
+        changed = self.df.copy()
+        changed.loc[1, 'Notes'] = 'DEPOSIT'
+        changed.loc[2, 'Notes'] = 'FUEL'
+
+        stats = write_dataframe(worksheet, changed)
+
+        assert len(worksheet.spreadsheet.update_bodies) == 1
+        assert worksheet.spreadsheet.update_bodies[0]['data'] == [
+            {'range': "'Level_1'!E3:E4", 'values': [['DEPOSIT'], ['FUEL']]}
+        ]
+        assert stats == {'total_cells': 20, 'changed_cells': 2, 'ranges': 1}
+
+    def test_result_matches_full_rewrite(self):
+        old = pd.concat([self.df] * 4, ignore_index=True)
+        worksheet = _FakeWorksheet(to_sheet_values(old), rows=13, cols=5)
+        new = self.df.copy()
+        new['Subcategory'] = ['Groceries', 'Deposit', 'Fuel']
+        new.loc[0, 'Transaction'] = 'TESCO EXTRA'
+
+        write_dataframe(worksheet, new)
+
+        # Rows and columns beyond the new frame are blanked, the grid grows for the new column
+        assert worksheet.spreadsheet.values == [
+            _FakeSpreadsheet._trim(row) for row in to_sheet_values(new)
+        ]
+        assert worksheet.resizes == [(13, 6)]
+
+    def test_diff_merges_rows_with_same_span(self):
+        current = [['a', 'b', 'c']] * 4
+        new = [['a', 'b', 'c'], ['a', 'x', 'y'], ['a', 'x', 'y'], ['a', 'b', 'z']]
+        assert diff_ranges('S', current, new) == [
+            {'range': "'S'!B2:C3", 'values': [['x', 'y'], ['x', 'y']]},
+            {'range': "'S'!C4:C4", 'values': [['z']]},
+        ]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
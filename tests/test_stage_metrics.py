@@ -0,0 +1,74 @@
+import sys
+import json
+from pathlib import Path
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.bank_statement_processor import BankStatementProcessor
+from src.stage_metrics import StageMetrics
+from tests.test_batch_fetch import HEADERS, _FakeConnection
+
+
+class TestStageMetrics:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.tmp_path = tmp_path
+
+    def test_repeated_stages_accumulate(self):
+        metrics = StageMetrics()
+        for rows in (10, 30):
+            with metrics.stage('process_sheet') as stage:
+                stage['rows'] = rows
+        with metrics.stage('export'):
+            pass
+
+        metrics_file = metrics.write(self.tmp_path)
+        summary = json.loads(metrics_file.read_text())
+        assert [stage['stage'] for stage in summary['stages']] == ['process_sheet', 'export']
+        process_sheet = summary['stages'][0]
+        assert process_sheet['calls'] == 2
+        assert process_sheet['rows'] == 40
+        assert process_sheet['rows_per_second'] > 0
+        assert process_sheet['cpu_seconds'] >= 0
+        assert summary['stages'][1]['rows_per_second'] is None
+
+    def test_stage_recorded_on_error(self):
+        metrics = StageMetrics()
+        with pytest.raises(ValueError):
+            with metrics.stage('fetch'):
+                raise ValueError("boom")
+        assert metrics.stages['fetch']['calls'] == 1
+
+    def test_profile_dumps_per_stage(self):
+        metrics = StageMetrics(profile_dir=self.tmp_path / 'profile')
+        with metrics.stage('outer'):
+            with metrics.stage('inner'):
+                sum(range(1000))
+        metrics.write(self.tmp_path)
+
+        # Nested stages are timed, but profiled as part of the outer stage
+        assert sorted(p.name for p in (self.tmp_path / 'profile').iterdir()) == ['outer.prof', 'outer.txt']
+        assert set(metrics.stages) == {'outer', 'inner'}
+
+    def test_processor_stages(self):
+        sheets = {
+            'Sheet_Jan': [HEADERS, ['01 Jan 23', 'TESCO STORE', '', '10.00', '90.00', '', '']],
+            'Sheet_Feb': [HEADERS, ['01 Feb 23', 'SHELL FUELS', '', '20.00', '70.00', '', '']],
+        }
+        sheets_file = self.tmp_path / 'sheets.txt'
+        sheets_file.write_text('Sheet_Jan\nSheet_Feb')
+        metrics = StageMetrics()
+        processor = BankStatementProcessor(_FakeConnection(sheets), metrics=metrics)
+        processor.process_all_statements('sheet-id', str(sheets_file))
+
+        assert list(metrics.stages) == ['fetch', 'process_sheet', 'combine_sheets']
+        assert metrics.stages['fetch']['rows'] == 2
+        assert metrics.stages['process_sheet']['calls'] == 2
+        assert metrics.stages['combine_sheets']['rows'] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
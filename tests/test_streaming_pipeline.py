@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+import pandas as pd
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.bank_statement_processor import BankStatementProcessor
+from src.categorisation import Categorisation
+from src.fake_sheets import FakeSheetsClient
+from src.google_sheets_connection import GoogleSheetsConnection
+from src.streaming_pipeline import StreamingPipeline
+from tests.test_incremental import _statement
+
+
+class TestStreamingPipeline:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.months = ['Jan', 'Feb', 'Mar', 'Apr']
+        self.sheets = {f'Sheet_{month}': _statement(month) for month in self.months}
+        self.sheets['Keyword Mapping'] = [
+            ['Keyword', 'Subcategory'], ['TESCO', 'Groceries'], ['SHELL', 'Fuel'], ['DEPOSIT', 'Deposits']
+        ]
+        self.sheets_file = tmp_path / 'sheets.txt'
+        self.sheets_file.write_text('\n'.join(f'Sheet_{month}' for month in self.months))
+
+    def _processor(self):
+        client = FakeSheetsClient({'sheet-id': self.sheets}, latency=0.01)
+        connection = GoogleSheetsConnection('unused.json', requests_per_minute=600_000, burst=1_000, client=client)
+        return BankStatementProcessor(connection)
+
+    def _run_streaming(self, **options):
+        processor = self._processor()
+        categorizer = Categorisation(processor)
+        data = StreamingPipeline(processor, categorizer, **options).run(
+            'sheet-id', str(self.sheets_file), 'Keyword Mapping'
+        )
+        return processor, categorizer, data
+
+    def _run_sequential(self):
+        processor = self._processor()
+        processor.process_all_statements('sheet-id', str(self.sheets_file))
+        categorizer = Categorisation(processor)
+        data = categorizer.apply_categorization('sheet-id', 'Keyword Mapping')
+        return processor, categorizer, data
+
+    def test_result_matches_sequential_run(self):
+        processor, categorizer, data = self._run_streaming(max_workers=3, process_workers=2)
+        full_processor, full_categorizer, full_data = self._run_sequential()
+
+        pd.testing.assert_frame_equal(processor.processed_data, full_processor.processed_data)
+        pd.testing.assert_frame_equal(data, full_data)
+        pd.testing.assert_frame_equal(processor.removed_rows, full_processor.removed_rows)
+        assert categorizer.categorization_issues == full_categorizer.categorization_issues
+        assert processor.date_formats == full_processor.date_formats
+        assert processor.sheet_layouts == full_processor.sheet_layouts
+        assert processor.metrics.stages['stream_sheets']['rows'] == 4 * len(self.months)
+
+    def test_missing_sheets_are_reported(self):
+        self.sheets_file.write_text('Sheet_Jan\nMissing\nSheet_Feb')
+        processor, _, data = self._run_streaming()
+
+        assert list(processor.failed_sheets) == ['Missing']
+        assert set(data['Source_Sheet']) == {'Sheet_Jan', 'Sheet_Feb'}
+
+        self.sheets_file.write_text('Missing')
+        with pytest.raises(Exception, match="No sheets could be fetched"):
+            self._run_streaming()
+
+    def test_rejects_invalid_worker_counts(self):
+        with pytest.raises(ValueError):
+            StreamingPipeline(None, None, max_workers=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, '-v'])
@@ -4,6 +4,8 @@ import code
 import gspread
 import pandas as pd
 from src.google_sheets_connection import GoogleSheetsConnection
+from src.sheet_writeback import write_dataframe
+from src.duplicates import DUPLICATE_REASON, find_duplicates
 
 
 print("hello world!")
@@ -14,7 +16,8 @@ spreadsheet_id = "1SpBtGBfcFwTJaXfj1_6A48ffKZXSRMLAHHn0fvqrWHo"
 processed_data_spreadsheet_id = "1RZMKy1Z3xdZ9INBnbBvMXMjj7jh_JITbU91gOZNBLEo"
 
 # print("🔄 Initializing Google Sheets connection...")
-gs_connection = GoogleSheetsConnection(credentials_file)
+# Share the pipeline's sheet cache so writes here keep it valid for the next run
+gs_connection = GoogleSheetsConnection(credentials_file, cache_dir=str(Path(__file__).parent / '.cache' / 'sheets'))
 
 # # Get all sheet names
 # spreadsheet = gs_connection.client.open_by_key(spreadsheet_id)
@@ -96,19 +99,18 @@ def create_or_update_sheet(gs_connection_creds, data_frame, sheet_name, spreadsh
         try:
             # Try to get the existing sheet
             sheet = spreadsheet.worksheet(sheet_name)
-            print(f"📌 Sheet '{sheet_name}' already exists. Clearing and updating...")
-            sheet.clear()  # Clear existing data
+            print(f"📌 Sheet '{sheet_name}' already exists. Updating changed cells...")
+            current = None  # Read once and diffed by write_dataframe
         except gspread.exceptions.WorksheetNotFound:
             # If the sheet doesn't exist, create a new one
             print(f"➕ Creating new sheet: {sheet_name}")
             sheet = spreadsheet.add_worksheet(title=sheet_name, rows=data_frame.shape[0] + 10, cols=data_frame.shape[1] + 10)
+            current = []
 
-        # Convert DataFrame to list of lists (Google Sheets format)
-        data_to_update = [data_frame.columns.tolist()] + data_frame.values.tolist()
-
-        # Update the sheet with the new data
-        sheet.update(data_to_update)
-        print(f"✅ Successfully updated sheet: {sheet_name}")
+        # Send only the changed ranges in one batch update
+        stats = write_dataframe(sheet, data_frame, current=current)
+        print(f"✅ Successfully updated sheet: {sheet_name} "
+              f"({stats['changed_cells']}/{stats['total_cells']} cells in {stats['ranges']} ranges)")
 
     except Exception as e:
         print(f"❌ Error updating/creating sheet '{sheet_name}': {str(e)}")
@@ -396,13 +398,20 @@ def apply_subcategory_rules(data_frame):
                     data_frame.at[idx, 'Subcategory'] = 'Miscellaneous'
                     data_frame.at[idx, 'Notes'] = 'Flagged Deposit - Invalid Amount'
 
-        # 3. ✅ Detect Duplicate Transactions (NEW FUNCTIONALITY)
-        # Detect duplicate transactions (excluding the first occurrence)
-        duplicate_mask = data_frame.duplicated(subset=['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)'],
-                                               keep='first')
-
-        # Mark only duplicate rows (excluding the first occurrence)
-        data_frame.loc[duplicate_mask, 'Notes'] = 'Duplicate Transaction'
+        # 3. ✅ Detect Duplicate Transactions
+        # Hash the key columns once; each duplicate points at its first occurrence
+        duplicates = find_duplicates(data_frame, ['Date', 'Transaction', 'Paid In (£)', 'Withdrawn (£)'])
+        duplicate_mask = duplicates['Duplicate_Of'].notna()
+
+        # Mark only duplicate rows (excluding the first occurrence); point at the sheet row they
+        # repeat only when the frame still carries Source_Row, as the index no longer matches the sheet
+        if 'Source_Row' in data_frame.columns:
+            original_rows = 'row ' + duplicates.loc[duplicate_mask, 'Duplicate_Of_Row'].astype(int).astype(str)
+            if 'Source_Sheet' in data_frame.columns:
+                original_rows = duplicates.loc[duplicate_mask, 'Duplicate_Of_Sheet'].astype(str) + ' ' + original_rows
+            data_frame.loc[duplicate_mask, 'Notes'] = DUPLICATE_REASON + ' of ' + original_rows
+        else:
+            data_frame.loc[duplicate_mask, 'Notes'] = DUPLICATE_REASON
         data_frame.loc[duplicate_mask, 'Subcategory'] = 'Ignore These'
 
         # Print summary
@@ -486,9 +495,9 @@ def split_and_analyze_dataframe(data_frame, gs_connection_creds, spreadsheet_id_
             try:
                 worksheet = gs_connection_creds.get_worksheet(spreadsheet_id_, "Excluded Transactions")
                 if worksheet:
-                    worksheet.clear()
-                    worksheet.update([excluded_df.columns.tolist()] + excluded_df.values.tolist())
-                    print("✅ Excluded transactions saved in 'Excluded Transactions' sheet.")
+                    stats = gs_connection_creds.write_dataframe(spreadsheet_id_, worksheet, excluded_df)
+                    print("✅ Excluded transactions saved in 'Excluded Transactions' sheet "
+                          f"({stats['changed_cells']} cells changed).")
             except Exception as e:
                 print(f"⚠️ Error saving excluded transactions: {e}")
 